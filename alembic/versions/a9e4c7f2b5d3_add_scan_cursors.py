@@ -0,0 +1,37 @@
+"""Add scan_cursors for incremental discovery scans
+
+Revision ID: a9e4c7f2b5d3
+Revises: f3c9d8b2a6e1
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4c7f2b5d3'
+down_revision: Union[str, Sequence[str], None] = 'f3c9d8b2a6e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scan_cursors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scanner', sa.String(), nullable=False),
+        sa.Column('niche', sa.String(), nullable=False),
+        sa.Column('high_water_mark', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scanner', 'niche', name='uq_scan_cursors_scanner_niche')
+    )
+    op.create_index(op.f('ix_scan_cursors_id'), 'scan_cursors', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scan_cursors_id'), table_name='scan_cursors')
+    op.drop_table('scan_cursors')
@@ -0,0 +1,41 @@
+"""Add candidate_stats_history for batched stats refreshes
+
+Revision ID: b7d2f5a8c1e4
+Revises: a9e4c7f2b5d3
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5a8c1e4'
+down_revision: Union[str, Sequence[str], None] = 'a9e4c7f2b5d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'candidate_stats_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('candidate_id', sa.String(), nullable=False),
+        sa.Column('sampled_at', sa.DateTime(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=True),
+        sa.Column('engagement_score', sa.Float(), nullable=True),
+        sa.Column('viral_score', sa.Integer(), nullable=True),
+        sa.Column('velocity', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['candidate_id'], ['content_candidates.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_candidate_stats_history_id'), 'candidate_stats_history', ['id'], unique=False)
+    op.create_index('ix_candidate_stats_history_candidate_sampled', 'candidate_stats_history', ['candidate_id', 'sampled_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_candidate_stats_history_candidate_sampled', table_name='candidate_stats_history')
+    op.drop_index(op.f('ix_candidate_stats_history_id'), table_name='candidate_stats_history')
+    op.drop_table('candidate_stats_history')
@@ -0,0 +1,26 @@
+"""Add monitored_niches.last_dispatched_at for sentinel sweep claims
+
+Revision ID: c5e8a1d4f7b9
+Revises: b7d2f5a8c1e4
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a1d4f7b9'
+down_revision: Union[str, Sequence[str], None] = 'b7d2f5a8c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('monitored_niches', sa.Column('last_dispatched_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('monitored_niches', 'last_dispatched_at')
@@ -0,0 +1,32 @@
+"""Add composite indexes for candidate, job and post listings
+
+Revision ID: d4f1a9c3e7b2
+Revises: 65439aa3c71f
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f1a9c3e7b2'
+down_revision: Union[str, Sequence[str], None] = '65439aa3c71f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Discovery DB fallback: WHERE niche = ? ORDER BY views DESC
+    op.create_index('ix_content_candidates_niche_views', 'content_candidates', ['niche', sa.text('views DESC')])
+    # Keyset pagination for /video/jobs, /publish/history and /analytics/posts
+    op.create_index('ix_video_jobs_user_created_at', 'video_jobs', ['user_id', sa.text('created_at DESC')])
+    op.create_index('ix_published_content_user_published_at', 'published_content', ['user_id', sa.text('published_at DESC')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_published_content_user_published_at', table_name='published_content')
+    op.drop_index('ix_video_jobs_user_created_at', table_name='video_jobs')
+    op.drop_index('ix_content_candidates_niche_views', table_name='content_candidates')
@@ -0,0 +1,42 @@
+"""Add full-text search vector to content_candidates
+
+Revision ID: e7a2b6d1f4c9
+Revises: d4f1a9c3e7b2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2b6d1f4c9'
+down_revision: Union[str, Sequence[str], None] = 'd4f1a9c3e7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Postgres only: SQLite builds its FTS5 index lazily (services/discovery/search_index.py)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("""
+        ALTER TABLE content_candidates ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(niche, '')), 'B') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.create_index(
+        'ix_content_candidates_search_vector', 'content_candidates', ['search_vector'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_content_candidates_search_vector', table_name='content_candidates')
+    op.drop_column('content_candidates', 'search_vector')
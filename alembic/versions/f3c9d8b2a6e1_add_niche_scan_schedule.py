@@ -0,0 +1,35 @@
+"""Add learned scan schedule columns to monitored_niches
+
+Revision ID: f3c9d8b2a6e1
+Revises: e7a2b6d1f4c9
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9d8b2a6e1'
+down_revision: Union[str, Sequence[str], None] = 'e7a2b6d1f4c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('monitored_niches', sa.Column('next_scan_at', sa.DateTime(), nullable=True))
+    op.add_column('monitored_niches', sa.Column('scan_interval_minutes', sa.Float(), nullable=True))
+    op.add_column('monitored_niches', sa.Column('yield_ewma', sa.Float(), nullable=True))
+    op.add_column('monitored_niches', sa.Column('avg_viral_score', sa.Float(), nullable=True))
+    # Sentinel tick: WHERE is_active AND (next_scan_at IS NULL OR next_scan_at <= now)
+    op.create_index('ix_monitored_niches_next_scan_at', 'monitored_niches', ['next_scan_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monitored_niches_next_scan_at', table_name='monitored_niches')
+    op.drop_column('monitored_niches', 'avg_viral_score')
+    op.drop_column('monitored_niches', 'yield_ewma')
+    op.drop_column('monitored_niches', 'scan_interval_minutes')
+    op.drop_column('monitored_niches', 'next_scan_at')
@@ -10,10 +10,20 @@ class Settings(BaseSettings):
     SECRET_KEY: Optional[str] = None  # Must be set via environment variable
     ALGORITHM: str = "HS256"
     INTERNAL_API_TOKEN: Optional[str] = None # Master token for internal services
+    VAULT_CACHE_TTL: float = 60.0  # Seconds a resolved DB setting is reused in-process
+    VAULT_NEGATIVE_CACHE_TTL: float = 30.0  # Seconds a 'not set in DB' result is reused
+    SETTINGS_SNAPSHOT_TTL: float = 30.0  # Max age of the system settings snapshot when Redis is unreachable
 
     # AI Settings
     GROQ_API_KEY: str = ""
     USE_OS_MODELS: bool = True
+    WHISPER_MODEL_SIZE: str = "base"
+    WHISPER_POOL_SIZE: int = 2  # Concurrent transcriptions per worker process
+    WHISPER_BATCH_SIZE: int = 8  # Batched inference chunk count; 1 = sequential decoding
+    WHISPER_BEAM_SIZE: int = 5
+    WHISPER_CACHE_TTL: int = 30 * 86400  # Seconds transcripts stay cached by audio hash
+    WHISPER_MEMORY_CACHE_SIZE: int = 128  # Transcripts kept in-process (LRU) in front of Redis
+    WHISPER_PRELOAD: bool = False  # Load the model when a Celery worker process starts
     
     # Neural Asset Keys
     ELEVENLABS_API_KEY: str = ""
@@ -28,10 +38,51 @@ class Settings(BaseSettings):
     
     # Video Generation
     FONT_PATH: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+    RENDER_BACKEND: str = "remotion"  # Options: remotion (title/subtitle/voiceover), ffmpeg (opt-in single-pass filtergraph), moviepy
+    SEGMENT_PARALLEL_WORKERS: int = 0  # 0 = one per CPU core, 1 = disabled
+    SEGMENT_PARALLEL_MIN_DURATION: float = 120.0  # Seconds; shorter sources render in one pass
+    OCR_DETECT_HEIGHT: int = 480  # Frame height for fast caption-placement text detection
+    OCR_BATCH_SIZE: int = 8  # Frames per EasyOCR detector batch
+    DOWNLOAD_CACHE_MAX_GB: float = 20.0  # LRU budget for cached source downloads
+    PARTIAL_DOWNLOAD_MIN_DURATION: float = 600.0  # Sources longer than this fetch only their hook sections
+    PARTIAL_DOWNLOAD_HOOKS: int = 3
+    PARTIAL_DOWNLOAD_WINDOW: float = 30.0  # Seconds per hook section
+    PROGRESS_PUBLISH_INTERVAL: float = 1.0  # Min seconds between WebSocket progress deltas (stage changes skip the wait)
+    PROGRESS_DB_FLUSH_INTERVAL: float = 30.0  # Max seconds job progress lives only in Redis before hitting the DB
+    WS_SEND_QUEUE_SIZE: int = 100  # Pending messages per WebSocket before a slow client is dropped
+    WS_SEND_TIMEOUT: float = 10.0  # Max seconds a single WebSocket send may block
+
+    # Telemetry (/ws/telemetry)
+    TELEMETRY_SAMPLE_INTERVAL: float = 15.0  # Seconds between queue/latency/disk samples (Celery beat)
+    TELEMETRY_STORAGE_INTERVAL: float = 600.0  # Seconds between output-tree size samples (walks every file)
+    TELEMETRY_PUSH_INTERVAL: float = 1.0  # Seconds between deltas streamed to dashboards
+    TELEMETRY_HISTORY: int = 360  # Samples kept per metric ring buffer
+    TELEMETRY_QUEUES: str = "celery"  # Comma-separated broker queues to report depth for
+    TELEMETRY_RENDER_MAX_AGE: float = 10800.0  # Renders older than this are assumed dead (crashed worker)
     
     # Social API Keys
     YOUTUBE_API_KEY: str = ""
     TIKTOK_API_KEY: str = ""
+
+    # Discovery
+    DISCOVERY_SCANNER_TIMEOUT: float = 20.0  # Per-scanner deadline (seconds)
+    DISCOVERY_LATENCY_BUDGET: float = 8.0  # Interactive scans return what arrived by then; <= 0 waits for all
+    DISCOVERY_UPSERT_CHUNK_SIZE: int = 500  # Rows per INSERT ... ON CONFLICT statement
+    DISCOVERY_CURSOR_OVERLAP_MINUTES: int = 60  # Incremental scans re-request this much before each scanner's cursor
+    DISCOVERY_REFRESH_LIMIT: int = 200  # Stored candidates per scanner whose stats an incremental scan refreshes
+    DISCOVERY_DEDUP_THRESHOLD: float = 0.6  # Title shingle similarity that marks two candidates as the same clip; <= 0 disables
+    DISCOVERY_DEDUP_THUMBNAILS: bool = False  # Also fetch thumbnails and match them by perceptual hash (needs Pillow)
+    SENTINEL_TICK_INTERVAL: float = 900.0  # Seconds between sentinel runs (each scans only the niches that are due)
+    SENTINEL_SWEEP_WINDOW: float = 840.0  # Seconds a tick's batches are spread over (inside the tick)
+    SENTINEL_SWEEP_CONCURRENCY: int = 4  # Niches scanned concurrently per sweep batch
+    SENTINEL_SCAN_BUDGET_PER_HOUR: int = 20  # Max niche scans started per hour across all niches
+    SENTINEL_BASE_INTERVAL_MINUTES: float = 240.0  # Interval for new niches and for niches yielding exactly the target
+    SENTINEL_MIN_INTERVAL_MINUTES: float = 30.0  # Hottest niches are never rescanned more often than this
+    SENTINEL_MAX_INTERVAL_MINUTES: float = 1440.0  # Stagnant niches back off to at most this
+    SENTINEL_TARGET_YIELD: float = 5.0  # New candidates a scan should find; drives each niche's interval
+    STATS_REFRESH_INTERVAL: float = 3600.0  # Seconds between bulk stats refreshes of stored candidates
+    STATS_REFRESH_WINDOW_DAYS: int = 7  # Candidates discovered within this many days are refreshed (and keep history)
+    STATS_REFRESH_MAX_CANDIDATES: int = 2000  # Newest candidates refreshed per run
     
     # Payment Processing
     STRIPE_SECRET_KEY: str = ""
@@ -130,6 +181,9 @@ class Settings(BaseSettings):
     # Database & Redis
     DATABASE_URL: str = "sqlite:///./ettametta.db"
     REDIS_URL: str = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50  # Per pool, per process
+    REDIS_SOCKET_TIMEOUT: float = 5.0  # Connect/read timeout for pooled clients
+    REDIS_REWRITE_LOCALHOST: Optional[bool] = None  # localhost -> redis host rewrite; unset = only inside docker
     
     # Validation Warning
     def validate_critical_config(self):
@@ -5,6 +5,8 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from api.routes import discovery, video, publish, analytics, auth, settings as settings_router, ws, no_face, monetization, nexus, ab_testing, security, billing, remotion, admin
 from services.security.service import base_security_sentinel
 from api.config import settings
+from api.utils.settings_snapshot import settings_scope
+from api.utils.redis_client import redis_pools
 import os
 import time
 import logging
@@ -58,6 +60,14 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
 app.add_middleware(RequestLoggingMiddleware)
 
+# System settings are resolved at most once per request
+class SettingsScopeMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        with settings_scope():
+            return await call_next(request)
+
+app.add_middleware(SettingsScopeMiddleware)
+
 from api.utils.models import SystemSettings, ContentCandidateDB
 from api.utils.database import engine, Base
 
@@ -91,6 +101,15 @@ async def seed_monitored_niches():
     finally:
         db.close()
 
+@app.on_event("shutdown")
+async def close_shared_http_clients():
+    """
+    Closes the keep-alive pools shared by the discovery scanners and the async Redis pools.
+    """
+    from services.discovery.http_client import http_registry
+    await http_registry.close()
+    await redis_pools.aclose()
+
 # Rate Limiter setup
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
@@ -105,6 +124,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paginated listings return their next-page cursor in this header
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -145,7 +166,8 @@ async def health_check():
             "ai_video": settings.AI_VIDEO_PROVIDER,
             "langchain": settings.ENABLE_LANGCHAIN,
             "crewai": settings.ENABLE_CREWAI
-        }
+        },
+        "redis": redis_pools.stats()
     }
 
 if __name__ == "__main__":
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from services.analytics.service import base_analytics_service
 from services.analytics.models import ContentPerformance
 from api.routes.auth import get_current_user
 from api.utils.user_models import UserDB
-from typing import List
+from api.utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import List, Optional
 import datetime
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 @router.get("/posts")
-async def list_analytics_posts(current_user: UserDB = Depends(get_current_user)):
+async def list_analytics_posts(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserDB = Depends(get_current_user)
+):
     from api.utils.database import SessionLocal
     from api.utils.models import PublishedContentDB
     db = SessionLocal()
@@ -18,8 +24,7 @@ async def list_analytics_posts(current_user: UserDB = Depends(get_current_user))
         if current_user.role != "admin":
             query = query.filter(PublishedContentDB.user_id == current_user.id)
             
-        posts = query.order_by(PublishedContentDB.published_at.desc()).all()
-        return posts
+        return paginate(response, query, PublishedContentDB.published_at, PublishedContentDB.id, cursor, limit)
     finally:
         db.close()
 
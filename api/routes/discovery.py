@@ -1,6 +1,9 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from services.discovery.service import base_discovery_service
 from services.discovery.models import ContentCandidate, ViralPattern
 from typing import List
@@ -14,24 +17,45 @@ DISCOVERY_GO_URL = os.getenv("DISCOVERY_GO_URL", "http://discovery-go:8080")
 
 from api.routes.auth import get_current_user
 from api.utils.user_models import UserDB
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 
 @router.get("/trends", response_model=List[ContentCandidate])
-async def get_trends(niche: str = "Motivation", horizon: str = "30d", user: UserDB = Depends(get_current_user)):
+async def get_trends(niche: str = "Motivation", horizon: str = "30d", stream: bool = False, user: UserDB = Depends(get_current_user)):
+    tier = user.subscription.value if hasattr(user.subscription, 'value') else "free"
+    if stream:
+        # NDJSON: one line per scanner as it finishes, then a final {"done": true}
+        async def ndjson_batches():
+            count = 0
+            try:
+                async for scanner, candidates in base_discovery_service.stream_trending_content(niche, horizon=horizon, tier=tier):
+                    count += len(candidates)
+                    yield json.dumps({"scanner": scanner, "candidates": jsonable_encoder(candidates)}) + "\n"
+            except Exception as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+            yield json.dumps({"done": True, "count": count}) + "\n"
+
+        return StreamingResponse(ndjson_batches(), media_type="application/x-ndjson")
+
     try:
         trends = await base_discovery_service.find_trending_content(
             niche, 
             horizon=horizon, 
-            tier=user.subscription.value if hasattr(user.subscription, 'value') else "free"
+            tier=tier
         )
         return trends
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/search", response_model=List[ContentCandidate])
-async def search_discovery(q: str, user: UserDB = Depends(get_current_user)):
+async def search_discovery(
+    q: str,
+    niche: Optional[str] = None,
+    platform: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    user: UserDB = Depends(get_current_user)
+):
     try:
-        results = await base_discovery_service.search_content(q)
+        results = await base_discovery_service.search_content(q, limit=limit, niche=niche, platform=platform)
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -30,7 +30,7 @@ async def run_nexus_composition(job_id: int, request: NexusComposeRequest, db: S
         job.status = "COMPOSING"
         db.commit()
         from api.routes.ws import notify_nexus_job_update_sync
-        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 10, "niche": job.niche})
+        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 10, "niche": job.niche}, user_id=job.user_id)
         
         output_path = None
         
@@ -70,14 +70,14 @@ async def run_nexus_composition(job_id: int, request: NexusComposeRequest, db: S
         job.output_path = output_path
         job.progress = 100
         from api.routes.ws import notify_nexus_job_update_sync
-        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 100, "niche": job.niche})
+        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 100, "niche": job.niche}, user_id=job.user_id)
     except Exception as e:
         import traceback
         logging.error(f"[Nexus] Error: {e}\n{traceback.format_exc()}")
         job.status = "FAILED"
         job.error_log = str(e)
         from api.routes.ws import notify_nexus_job_update_sync
-        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 0, "niche": job.niche, "error": str(e)})
+        notify_nexus_job_update_sync({"id": str(job.id), "status": job.status, "progress": 0, "niche": job.niche, "error": str(e)}, user_id=job.user_id)
     finally:
         db.commit()
 
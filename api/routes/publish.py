@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Request, Depends, status
+from fastapi import APIRouter, HTTPException, Request, Depends, Query, Response, status
 from fastapi.responses import RedirectResponse
 from typing import List, Optional
 from services.optimization.service import base_optimization_service
@@ -14,6 +14,7 @@ from api.utils.user_models import UserDB
 # from api.utils.user_models import UserDB # Deprecated import
 from api.utils.database import SessionLocal
 from api.utils.models import SocialAccount, PublishedContentDB
+from api.utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 import datetime
 import uuid
 
@@ -209,15 +210,19 @@ async def generate_package(niche: str, platform: str = "YouTube Shorts"):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/history")
-async def get_publish_history(current_user: UserDB = Depends(get_current_user)):
+async def get_publish_history(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserDB = Depends(get_current_user)
+):
     db = SessionLocal()
     try:
         query = db.query(PublishedContentDB)
         if current_user.role != "admin":
             query = query.filter(PublishedContentDB.user_id == current_user.id)
             
-        history = query.order_by(PublishedContentDB.published_at.desc()).all()
-        return history
+        return paginate(response, query, PublishedContentDB.published_at, PublishedContentDB.id, cursor, limit)
     finally:
         db.close()
 
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from api.utils.database import get_db
 from api.utils.models import SystemSettings
+from api.utils.vault import invalidate_secret, invalidate_secrets
+from api.utils.settings_snapshot import settings_store
 from api.routes.auth import get_current_user
 from api.utils.user_models import UserDB
 from pydantic import BaseModel
@@ -97,6 +99,7 @@ async def update_setting(request: SettingUpdateRequest, db: Session = Depends(ge
     
     db.commit()
     db.refresh(setting)
+    invalidate_secret(setting.key, user_id=current_user.id)
     return {"status": "success", "key": setting.key, "scope": "user"}
 
 @router.get("/monetization/strategies")
@@ -171,6 +174,8 @@ async def bulk_update_settings(settings_list: List[SettingUpdateRequest], db: Se
             db.add(setting)
     
     db.commit()
+    invalidate_secrets([req.key for req in settings_list])
+    settings_store.bump_version()
     return {"status": "success"}
 
 @router.post("/filters/{filter_id}/toggle")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 from typing import Optional
 from api.utils.database import SessionLocal
@@ -6,8 +6,10 @@ from api.utils.models import VideoJobDB
 from api.routes.auth import get_current_user
 from api.utils.user_models import UserDB, SubscriptionTier
 from api.utils.subscription import subscription_required, check_daily_limit
+from api.utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.video_engine.tasks import download_and_process_task, generate_video_task, generate_story_task
 from services.video_engine.synthesis_service import generative_service
+from services.video_engine.progress import overlay_live_progress
 import logging
 
 router = APIRouter(prefix="/video", tags=["Video Engine"])
@@ -46,7 +48,8 @@ async def start_transformation(request: TransformationRequest, current_user: Use
             niche=request.niche,
             platform=request.platform,
             style=request.style,
-            quality_tier=request.quality_tier
+            quality_tier=request.quality_tier,
+            user_id=current_user.id
         )
         
         # Create Job Entry in Database
@@ -72,9 +75,15 @@ async def start_transformation(request: TransformationRequest, current_user: Use
         db.close()
 
 @router.get("/jobs")
-async def list_jobs(current_user: UserDB = Depends(get_current_user)):
+async def list_jobs(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: UserDB = Depends(get_current_user)
+):
     """
-    Lists all video processing jobs from the database for the current user.
+    Lists video processing jobs for the current user, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page.
     """
     db = SessionLocal()
     try:
@@ -83,8 +92,9 @@ async def list_jobs(current_user: UserDB = Depends(get_current_user)):
         if current_user.role != "admin":
             query = query.filter(VideoJobDB.user_id == current_user.id)
             
-        jobs = query.order_by(VideoJobDB.created_at.desc()).all()
-        return jobs
+        jobs = paginate(response, query, VideoJobDB.created_at, VideoJobDB.id, cursor, limit)
+        # Running jobs report progress to Redis; rows are only written at terminal states
+        return overlay_live_progress(jobs)
     finally:
         db.close()
 @router.post("/jobs/{job_id}/abort")
@@ -115,7 +125,7 @@ async def abort_job(job_id: str, current_user: UserDB = Depends(get_current_user
             "status": "Aborted",
             "progress": job.progress,
             "output_path": job.output_path
-        })
+        }, user_id=job.user_id)
 
         return {"status": "Aborted", "message": f"Job {job_id} revocation signal transmitted."}
     except Exception as e:
@@ -173,7 +183,8 @@ async def test_drive(request: TestDriveRequest, current_user: UserDB = Depends(g
             niche=request.niche,
             platform="YouTube Shorts", # Default format for test drive
             preview_only=True,
-            style=request.style
+            style=request.style,
+            user_id=current_user.id
         )
 
         # 3. Create Job Entry
@@ -1,142 +1,424 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Iterable, Optional, Set, Tuple
 import json
+import time
 import asyncio
 import logging
-import redis.asyncio as redis
 from api.config import settings
+from api.utils.redis_client import get_redis, get_async_redis
 
 router = APIRouter(prefix="/ws", tags=["websockets"])
 
+JOB_UPDATES_CHANNEL = "job_updates"
+ADMIN_TOPIC = "all"
+
+
+def user_topic(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def job_topic(job_id) -> str:
+    return f"job:{job_id}"
+
+
+def job_topics(job_id, user_id=None) -> List[str]:
+    """Who sees a job update: its owner, anyone watching the job, and admins."""
+    topics = [job_topic(job_id), ADMIN_TOPIC]
+    if user_id is not None:
+        topics.append(user_topic(user_id))
+    return topics
+
+
+class Connection:
+    """
+    One socket with its own bounded outbox and sender task, so a slow client only
+    ever delays itself. Messages that update the same thing (same type and id) are
+    merged while waiting; a client whose outbox still fills up is disconnected.
+    """
+
+    def __init__(self, websocket: WebSocket, user=None, max_pending: int = None, send_timeout: float = None):
+        self.websocket = websocket
+        self.user = user
+        self.topics: Set[str] = set()
+        self.max_pending = max_pending or settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.closed = False
+        self._pending: "OrderedDict[Tuple, dict]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+        self._on_close = None
+        self._seq = 0
+
+    def start(self, on_close):
+        self._on_close = on_close
+        self._sender = asyncio.create_task(self._send_loop())
+
+    @staticmethod
+    def _coalesce_key(message: dict) -> Optional[Tuple]:
+        if message.get("type") == "telemetry_delta":
+            return ("telemetry_delta",)
+        data = message.get("data")
+        if isinstance(data, dict) and data.get("id") is not None:
+            return (message.get("type"), str(data["id"]))
+        return None
+
+    @staticmethod
+    def _merge(queued: dict, message: dict):
+        if message.get("type") == "telemetry_delta":
+            unset = (set(queued.get("unset", ())) - set(message["set"])) | set(message.get("unset", ()))
+            queued["set"] = {k: v for k, v in {**queued["set"], **message["set"]}.items() if k not in unset}
+            queued["timestamp"] = message["timestamp"]
+            if unset:
+                queued["unset"] = sorted(unset)
+            else:
+                queued.pop("unset", None)
+        else:
+            queued["data"] = {**queued["data"], **message["data"]}
+
+    def send(self, message: dict) -> bool:
+        """Queues a message without waiting. False if the client had to be dropped."""
+        if self.closed:
+            return False
+        key = self._coalesce_key(message)
+        if key is not None and key in self._pending:
+            # Job updates and telemetry are deltas: merge so nothing set earlier is lost
+            self._merge(self._pending[key], message)
+            return True
+        if len(self._pending) >= self.max_pending:
+            logging.warning(f"[WS] Dropping slow client ({len(self._pending)} messages pending)")
+            self.close()
+            return False
+        if key is None:
+            self._seq += 1
+            key = ("_", self._seq)
+        self._pending[key] = dict(message)
+        self._wakeup.set()
+        return True
+
+    async def _send_loop(self):
+        try:
+            while not self.closed:
+                if not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                _, message = self._pending.popitem(last=False)
+                await asyncio.wait_for(self.websocket.send_text(json.dumps(message)), self.send_timeout)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.info(f"[WS] Send failed, closing connection: {e}")
+        finally:
+            self.close(notify_client=False)
+
+    def close(self, notify_client: bool = True):
+        """Stops sending and unregisters; idempotent. notify_client also closes the socket."""
+        if not self.closed:
+            self.closed = True
+            self._pending.clear()
+            if self._sender is not None and self._sender is not asyncio.current_task():
+                self._sender.cancel()
+            if notify_client:
+                asyncio.create_task(self._close_socket())
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close(self)
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+
+
 class ConnectionManager:
+    """
+    Topic-based fan-out. Publishers (API and Celery processes) publish one message
+    with its topics to Redis; every API process has one subscriber and delivers it
+    to its own connections subscribed to any of those topics.
+    """
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.redis_client = redis.from_url(settings.REDIS_URL)
+        self.active_connections: Dict[WebSocket, Connection] = {}
+        self.topics: Dict[str, Set[Connection]] = defaultdict(set)
         self.pubsub_task = None
 
-    async def city_connect(self, websocket: WebSocket):
+    async def city_connect(self, websocket: WebSocket, user=None, topics: Iterable[str] = ()) -> Connection:
         await websocket.accept()
-        self.active_connections.append(websocket)
+        connection = Connection(websocket, user)
+        self.active_connections[websocket] = connection
+        self.subscribe(connection, topics)
+        connection.start(self._forget)
         logging.info(f"Client connected. Total connections: {len(self.active_connections)}")
-        
+
         # Start pubsub listener if not already running
         if not self.pubsub_task:
             self.pubsub_task = asyncio.create_task(self._listen_to_redis())
+        return connection
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+    def subscribe(self, connection: Connection, topics: Iterable[str]):
+        for topic in topics:
+            connection.topics.add(topic)
+            self.topics[topic].add(connection)
+
+    def unsubscribe(self, connection: Connection, topics: Iterable[str]):
+        for topic in topics:
+            connection.topics.discard(topic)
+            members = self.topics.get(topic)
+            if members is not None:
+                members.discard(connection)
+                if not members:
+                    del self.topics[topic]
+
+    def _forget(self, connection: Connection):
+        if self.active_connections.get(connection.websocket) is connection:
+            del self.active_connections[connection.websocket]
+            self.unsubscribe(connection, list(connection.topics))
             logging.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
 
+    def disconnect(self, websocket: WebSocket):
+        connection = self.active_connections.get(websocket)
+        if connection is not None:
+            connection.close(notify_client=False)
+
     async def _listen_to_redis(self):
         """
-        Listens to a Redis channel and broadcasts messages to all connected clients.
+        Listens to the Redis channel and fans messages out to local subscribers.
         """
-        pubsub = self.redis_client.pubsub()
-        await pubsub.subscribe("job_updates")
-        logging.info("Subscribed to Redis channel: job_updates")
-        
+        pubsub = get_async_redis(subscriber=True).pubsub()
+        await pubsub.subscribe(JOB_UPDATES_CHANNEL)
+        logging.info(f"Subscribed to Redis channel: {JOB_UPDATES_CHANNEL}")
+
         try:
             async for message in pubsub.listen():
                 if message["type"] == "message":
-                    data = message["data"].decode("utf-8")
-                    await self.broadcast(data)
+                    envelope = json.loads(message["data"])
+                    if "topics" in envelope:
+                        self.broadcast(envelope["message"], envelope["topics"])
+                    else:
+                        # Publisher without topics (older worker); only admins see it
+                        self.broadcast(envelope, [ADMIN_TOPIC])
         except Exception as e:
             logging.error(f"Redis pubsub error: {e}")
         finally:
-            await pubsub.unsubscribe("job_updates")
+            await pubsub.unsubscribe(JOB_UPDATES_CHANNEL)
             self.pubsub_task = None
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                # Silently handle disconnected clients; they will be removed by the endpoint
-                pass
+    def broadcast(self, message: dict, topics: Iterable[str]) -> int:
+        """Queues the message for every local connection on any of the topics (no awaits)."""
+        recipients: Set[Connection] = set()
+        for topic in topics:
+            recipients.update(self.topics.get(topic, ()))
+        delivered = 0
+        for connection in recipients:
+            if connection.send(message):
+                delivered += 1
+        return delivered
 
 manager = ConnectionManager()
 
+
+def _authenticate(token: Optional[str]):
+    """Resolves the dashboard's bearer token (sent as ?token=) to a user, or None."""
+    if not token:
+        return None
+    from api.utils.database import SessionLocal
+    from api.utils.security import decode_access_token
+    from api.utils.user_models import UserDB, UserRole
+
+    db = SessionLocal()
+    try:
+        if settings.INTERNAL_API_TOKEN and token == settings.INTERNAL_API_TOKEN:
+            return db.query(UserDB).filter(UserDB.role == UserRole.ADMIN).first()
+        payload = decode_access_token(token)
+        if not payload or not payload.get("sub"):
+            return None
+        return db.query(UserDB).filter(UserDB.username == payload["sub"]).first()
+    finally:
+        db.close()
+
+
+def _is_admin(user) -> bool:
+    return user is not None and getattr(user.role, "value", user.role) == "admin"
+
+
+def _default_topics(user) -> List[str]:
+    if user is None:
+        return []
+    topics = [user_topic(user.id)]
+    if _is_admin(user):
+        topics.append(ADMIN_TOPIC)
+    return topics
+
+
+def _watchable_jobs(user, job_ids: List[str]) -> Set[str]:
+    """
+    Which of `job_ids` the user may watch: their own video/nexus jobs (admins: any).
+    Blocking (one IN query per job table); call it through asyncio.to_thread.
+    """
+    if user is None or not job_ids:
+        return set()
+    if _is_admin(user):
+        return set(job_ids)
+    from api.utils.database import SessionLocal
+    from api.utils.models import VideoJobDB, NexusJobDB
+
+    db = SessionLocal()
+    try:
+        allowed = {
+            job_id for (job_id,) in db.query(VideoJobDB.id).filter(
+                VideoJobDB.id.in_(job_ids), VideoJobDB.user_id == user.id
+            )
+        }
+        nexus_ids = [int(j) for j in job_ids if j not in allowed and j.isdigit()]
+        if nexus_ids:
+            allowed.update(
+                str(job_id) for (job_id,) in db.query(NexusJobDB.id).filter(
+                    NexusJobDB.id.in_(nexus_ids), NexusJobDB.user_id == user.id
+                )
+            )
+        return allowed
+    finally:
+        db.close()
+
+
+async def _handle_client_message(connection: Connection, raw: str):
+    """Clients may (un)subscribe to individual jobs: {"action": "subscribe", "jobs": [id, ...]}."""
+    try:
+        request = json.loads(raw)
+    except ValueError:
+        return
+    if not isinstance(request, dict):
+        return
+    jobs = [str(j) for j in request.get("jobs") or []]
+    if request.get("action") == "subscribe":
+        allowed = await asyncio.to_thread(_watchable_jobs, connection.user, jobs)
+        manager.subscribe(connection, [job_topic(j) for j in jobs if j in allowed])
+        connection.send({"type": "subscribed", "topics": sorted(connection.topics)})
+    elif request.get("action") == "unsubscribe":
+        manager.unsubscribe(connection, [job_topic(j) for j in jobs])
+
+
 @router.websocket("/jobs")
-async def websocket_jobs_endpoint(websocket: WebSocket):
+async def websocket_jobs_endpoint(websocket: WebSocket, token: Optional[str] = None, job: Optional[str] = None):
     logging.info("[WS] Jobs Handshake Attempt Received")
-    await manager.city_connect(websocket)
+    # Auth and ownership lookups are blocking DB calls; keep them off the event loop
+    user = await asyncio.to_thread(_authenticate, token)
+    topics = _default_topics(user)
+    if job and job in await asyncio.to_thread(_watchable_jobs, user, [job]):
+        topics.append(job_topic(job))
+    connection = await manager.city_connect(websocket, user, topics)
     logging.info("[WS] Jobs Connection Accepted")
     try:
-        while True:
-            # Send keep-alive ping every 30 seconds
-            await websocket.send_text(json.dumps({"type": "ping", "timestamp": asyncio.get_event_loop().time()}))
-            await asyncio.sleep(30)
+        while not connection.closed:
+            try:
+                raw = await asyncio.wait_for(websocket.receive_text(), timeout=30)
+                await _handle_client_message(connection, raw)
+            except asyncio.TimeoutError:
+                # Keep-alive ping every 30 seconds of silence
+                connection.send({"type": "ping", "timestamp": asyncio.get_event_loop().time()})
     except WebSocketDisconnect:
         logging.info("[WS] Jobs Disconnected (Client Closed)")
-        manager.disconnect(websocket)
     except Exception as e:
         logging.error(f"[WS] Jobs Error: {e}")
+    finally:
         manager.disconnect(websocket)
 
-import random
+TELEMETRY_TOPIC = "telemetry"
+
+
+class TelemetryFeed:
+    """
+    One reader per API process: polls the metrics workers push into Redis every
+    TELEMETRY_PUSH_INTERVAL and broadcasts only what changed to telemetry sockets.
+    New sockets get the full state (plus recent history) once, then deltas.
+    """
+
+    def __init__(self):
+        self.state: Dict[str, float] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def ensure_running(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def snapshot(self, history: int = 60) -> Dict:
+        from services.monitoring.telemetry import read_latest, read_history
+        r = get_redis()
+        if not self.state:
+            self.state = await asyncio.to_thread(read_latest, r)
+        series = await asyncio.to_thread(read_history, r, list(self.state), history)
+        return {
+            "type": "telemetry_snapshot",
+            "timestamp": time.time(),
+            "metrics": dict(self.state),
+            "history": series,
+        }
+
+    async def tick(self) -> Optional[Dict]:
+        """Reads the latest metrics and broadcasts the delta; returns it (None if unchanged)."""
+        from services.monitoring.telemetry import read_latest, diff
+        current = await asyncio.to_thread(read_latest, get_redis())
+        changed, removed = diff(self.state, current)
+        self.state = current
+        if not changed and not removed:
+            return None
+        delta = {"type": "telemetry_delta", "timestamp": time.time(), "set": changed}
+        if removed:
+            delta["unset"] = removed
+        manager.broadcast(delta, [TELEMETRY_TOPIC])
+        return delta
+
+    async def _run(self):
+        while manager.topics.get(TELEMETRY_TOPIC):
+            try:
+                await self.tick()
+            except Exception as e:
+                logging.warning(f"[WS] Telemetry read failed: {e}")
+            await asyncio.sleep(settings.TELEMETRY_PUSH_INTERVAL)
+        # Nobody is watching; the next telemetry socket restarts the loop with a fresh snapshot
+        self.state = {}
+
+
+telemetry_feed = TelemetryFeed()
+
 
 @router.websocket("/telemetry")
-async def websocket_telemetry_endpoint(websocket: WebSocket):
+async def websocket_telemetry_endpoint(websocket: WebSocket, token: Optional[str] = None):
     logging.info("[WS] Telemetry Handshake Attempt Received")
-    await manager.city_connect(websocket)
+    # Pages on this socket also follow their own job updates
+    user = await asyncio.to_thread(_authenticate, token)
+    connection = await manager.city_connect(websocket, user, _default_topics(user))
     logging.info("[WS] Telemetry Connection Accepted")
     try:
-        while True:
-            # Generate high-velocity pulse telemetry
-            pulse_data = {
-                "type": "telemetry_pulse",
-                "timestamp": asyncio.get_event_loop().time(),
-                "metrics": {
-                    "bitrate": round(random.uniform(450, 980), 2),
-                    "latency": round(random.uniform(12, 45), 1),
-                    "signal_strength": round(random.uniform(0.85, 0.99), 3),
-                    "active_nodes": random.randint(1240, 5600),
-                    "global_velocity": round(random.uniform(1.2, 5.8), 2)
-                },
-                "active_segments": [
-                    {"label": "US-EAST", "load": random.randint(20, 95)},
-                    {"label": "EU-WEST", "load": random.randint(30, 85)},
-                    {"label": "ASIA-PAC", "load": random.randint(10, 60)},
-                    {"label": "AFRICA-NORTH", "load": random.randint(40, 90)}
-                ],
-                "geo_activity": [
-                    {
-                        "lat": round(random.uniform(-50, 70), 4),
-                        "lng": round(random.uniform(-120, 140), 4),
-                        "intensity": round(random.uniform(0.3, 1.0), 2)
-                    } for _ in range(random.randint(1, 4))
-                ]
-            }
-            await websocket.send_text(json.dumps(pulse_data))
-            await asyncio.sleep(1.0) # Balanced frequency pulse
+        connection.send(await telemetry_feed.snapshot())
+        manager.subscribe(connection, [TELEMETRY_TOPIC])
+        telemetry_feed.ensure_running()
+        while not connection.closed:
+            await websocket.receive_text()
     except WebSocketDisconnect:
         logging.info("[WS] Telemetry Disconnected (Client Closed)")
-        manager.disconnect(websocket)
     except Exception as e:
         logging.error(f"[WS] Telemetry Error: {e}")
+    finally:
         manager.disconnect(websocket)
 
-def notify_job_update_sync(job_data: Dict):
+def publish_event(message: Dict, topics: Iterable[str]):
+    """
+    Publishes a message for the given topics to every API process (sync; Celery-safe).
+    """
+    get_redis().publish(JOB_UPDATES_CHANNEL, json.dumps({"topics": list(topics), "message": message}))
+
+def notify_job_update_sync(job_data: Dict, user_id: Optional[int] = None):
     """
     Synchronous utility (for Celery) to publish job updates to Redis.
+    Delivered to the job's owner, the job's watchers and admins.
     """
-    import redis as redis_sync
-    r = redis_sync.from_url(settings.REDIS_URL)
-    message = json.dumps({
-        "type": "job_update",
-        "data": job_data
-    })
-    r.publish("job_updates", message)
-
-def notify_nexus_job_update_sync(job_data: Dict):
+    publish_event({"type": "job_update", "data": job_data}, job_topics(job_data["id"], user_id))
+
+def notify_nexus_job_update_sync(job_data: Dict, user_id: Optional[int] = None):
     """
     Synchronous utility to publish Nexus specific job updates to Redis.
     """
-    import redis as redis_sync
-    r = redis_sync.from_url(settings.REDIS_URL)
-    message = json.dumps({
-        "type": "nexus_job_update",
-        "data": job_data
-    })
-    r.publish("job_updates", message)
+    publish_event({"type": "nexus_job_update", "data": job_data}, job_topics(job_data["id"], user_id))
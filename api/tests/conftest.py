@@ -54,6 +54,56 @@ def auth_headers(client):
     return {}
 
 
+@pytest.fixture
+def sqlite_engine():
+    """
+    Fresh in-memory SQLite database with every table. One shared connection
+    (StaticPool), so sessions opened from worker threads see the same data.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+    from api.utils.database import Base
+    import api.utils.models  # noqa: F401 (registers the tables)
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    """sessionmaker bound to sqlite_engine; patch it in for SessionLocal."""
+    from sqlalchemy.orm import sessionmaker
+    return sessionmaker(bind=sqlite_engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    """A session on sqlite_engine, closed after the test."""
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def make_candidate():
+    """
+    Builds discovery candidates: make_candidate(id, platform="Test", title=None, **fields).
+    `published_at` and keywords that aren't ContentCandidate fields go into metadata.
+    """
+    from services.discovery.models import ContentCandidate
+
+    def build(cid, platform="Test", title=None, published_at=None, **fields):
+        metadata = {key: fields.pop(key) for key in list(fields) if key not in ContentCandidate.model_fields}
+        if published_at is not None:
+            metadata["published_at"] = published_at
+        fields.setdefault("url", f"https://example.com/{cid}")
+        return ContentCandidate(id=cid, platform=platform, title=title, metadata=metadata, **fields)
+
+    return build
+
+
 @pytest.fixture
 def mock_groq():
     """Mock Groq API responses."""
@@ -0,0 +1,663 @@
+"""
+Test Suite for Discovery Engine Helpers
+=======================================
+Unit tests for services/discovery internals (no network)
+"""
+
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from services.discovery.http_client import HTTPClientRegistry
+
+
+class TestHTTPClientRegistry:
+    """Test the shared scanner HTTP client registry"""
+
+    @pytest.mark.asyncio
+    async def test_session_is_shared_per_loop(self):
+        """Test that scanners reuse one pooled session and client per event loop"""
+        registry = HTTPClientRegistry(max_per_host=4)
+
+        session = registry.session()
+        client = registry.client()
+        try:
+            assert registry.session() is session
+            assert registry.client() is client
+            assert session.connector.limit_per_host == 4
+        finally:
+            await registry.close()
+
+        assert session.closed
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_get_text_caches_successful_responses(self):
+        """Test that cache_ttl serves repeat requests without another round trip"""
+        registry = HTTPClientRegistry()
+
+        response = MagicMock(status=200)
+        response.text = AsyncMock(return_value="payload")
+        request = MagicMock()
+        request.__aenter__ = AsyncMock(return_value=response)
+        request.__aexit__ = AsyncMock(return_value=False)
+        session = MagicMock()
+        session.get.return_value = request
+
+        with patch.object(registry, "session", return_value=session):
+            first = await registry.get_text("https://example.com/trends", params={"geo": "US"}, cache_ttl=60)
+            second = await registry.get_text("https://example.com/trends", params={"geo": "US"}, cache_ttl=60)
+            uncached = await registry.get_text("https://example.com/trends", params={"geo": "US"})
+
+        assert first == second == uncached == (200, "payload")
+        assert session.get.call_count == 2
+
+
+class TestYouTubeBatching:
+    """Test batched YouTube Data API statistics lookups"""
+
+    def test_fetch_video_details_chunks_at_50(self):
+        """Test that ids are de-duplicated and sent 50 per videos().list call"""
+        from services.discovery.youtube_api import fetch_video_details
+
+        youtube = MagicMock()
+        youtube.videos.return_value.list.side_effect = lambda id, part: MagicMock(
+            execute=MagicMock(return_value={"items": [{"id": v} for v in id.split(",")]})
+        )
+        ids = [f"vid{i}" for i in range(120)] + ["vid0"]
+
+        details = fetch_video_details(youtube, ids)
+
+        calls = youtube.videos.return_value.list.call_args_list
+        assert [len(c.kwargs["id"].split(",")) for c in calls] == [50, 50, 20]
+        assert len(details) == 120
+
+    @pytest.mark.asyncio
+    async def test_shorts_scan_uses_one_stats_call(self):
+        """Test that a Shorts scan makes one search and one batched stats call off the loop"""
+        pytest.importorskip("googleapiclient")
+        from services.discovery.youtube_scanner import YouTubeShortsScanner
+
+        youtube = MagicMock()
+        youtube.search.return_value.list.return_value.execute.return_value = {
+            "items": [
+                {"id": {"videoId": "a"}, "snippet": {"title": "A", "channelTitle": "ch"}},
+                {"id": {"videoId": "b"}, "snippet": {"title": "B", "channelTitle": "ch"}},
+            ]
+        }
+        youtube.videos.return_value.list.return_value.execute.return_value = {
+            "items": [
+                {"id": "a", "statistics": {"viewCount": "100"}, "contentDetails": {"duration": "PT30S"}},
+                {"id": "b", "statistics": {"viewCount": "50"}, "contentDetails": {"duration": "PT45S"}},
+            ]
+        }
+
+        with patch("services.discovery.youtube_scanner.get_secret", return_value="key"), \
+             patch("services.discovery.youtube_scanner.build", return_value=youtube):
+            candidates = await YouTubeShortsScanner().scan_trends("fitness")
+
+        youtube.videos.return_value.list.assert_called_once()
+        assert youtube.videos.return_value.list.call_args.kwargs["id"] == "a,b"
+        assert [c.views for c in candidates] == [100, 50]
+        assert candidates[1].duration_seconds == 45.0
+
+
+class _StubScanner:
+    def __init__(self, name, delay, results, scan_timeout=None):
+        self.name = name
+        self.delay = delay
+        self.results = results
+        self.scan_timeout = scan_timeout
+
+    async def scan_trends(self, niche, published_after=None):
+        await asyncio.sleep(self.delay)
+        if isinstance(self.results, Exception):
+            raise self.results
+        return self.results
+
+
+class TestStreamingFanOut:
+    """Test the deadline-bounded scanner scatter/gather"""
+
+    @pytest.fixture
+    def service(self):
+        from services.discovery.service import DiscoveryService
+        service = DiscoveryService()
+        service.global_scanners = []
+        return service
+
+    @pytest.mark.asyncio
+    async def test_streams_in_completion_order_and_persists_late_results(self, service, make_candidate):
+        """Test that fast scanners stream first and a slow one is persisted after the budget"""
+        service.scanners = [
+            _StubScanner("slow", 0.5, [make_candidate("late")]),
+            _StubScanner("fast", 0.0, [make_candidate("early")]),
+            _StubScanner("hung", 5.0, [make_candidate("never")], scan_timeout=0.3),
+            _StubScanner("broken", 0.0, RuntimeError("blocked")),
+        ]
+        persisted = []
+
+        with patch.object(service, "_cached_trends", return_value=None), \
+             patch.object(service, "_selective_threshold", return_value=None), \
+             patch.object(service, "_persist_candidates", side_effect=lambda niche, c: persisted.extend(x.id for x in c)):
+            batches = [(name, [c.id for c in cands]) async for name, cands in
+                       service.stream_trending_content("AI", latency_budget=0.1)]
+            assert batches == [("_StubScanner", ["early"])]
+
+            await asyncio.sleep(0.8)
+
+        assert sorted(persisted) == ["early", "late"]
+
+    @pytest.mark.asyncio
+    async def test_find_trending_content_applies_threshold_and_waits_for_persistence(self, service, make_candidate):
+        """Test that the list API filters selective mode and persists before returning"""
+        service.scanners = [_StubScanner("a", 0.0, [make_candidate("hot", viral_score=90), make_candidate("cold", viral_score=10)])]
+        persist = MagicMock()
+
+        with patch.object(service, "_cached_trends", return_value=None), \
+             patch.object(service, "_selective_threshold", return_value=65), \
+             patch.object(service, "_persist_candidates", persist), \
+             patch.object(service, "_trigger_recursive_expansion", new=AsyncMock()):
+            results = await service.find_trending_content("AI", latency_budget=0)
+
+        assert [c.id for c in results] == ["hot"]
+        persist.assert_called_once()
+        assert [c.id for c in persist.call_args.args[1]] == ["hot"]
+
+
+    @pytest.mark.asyncio
+    async def test_scanner_latency_is_recorded_off_the_event_loop(self, service, make_candidate):
+        """Test that the blocking telemetry write runs in a worker thread"""
+        import threading
+        service.scanners = [_StubScanner("a", 0.0, [make_candidate("x")])]
+        recorded = []
+
+        def record(metrics):
+            recorded.append((threading.current_thread() is threading.main_thread(), list(metrics)))
+
+        with patch("services.discovery.service.record_telemetry", side_effect=record), \
+             patch.object(service, "_cached_trends", return_value=None), \
+             patch.object(service, "_selective_threshold", return_value=None), \
+             patch.object(service, "_persist_candidates"):
+            [batch async for batch in service.stream_trending_content("AI", latency_budget=0, persist=False)]
+            await asyncio.sleep(0.05)
+
+        assert recorded == [(False, ["scanner._StubScanner.latency_ms"])]
+
+
+class TestBulkUpsert:
+    """Test the chunked INSERT ... ON CONFLICT persistence path"""
+
+    def test_classifies_inserts_and_updates_across_chunks(self, db, make_candidate):
+        """Test that new and existing rows are reported separately and refreshed in place"""
+        from services.discovery.persistence import upsert_candidates
+        from api.utils.models import ContentCandidateDB
+
+        first = upsert_candidates(db, "AI", [make_candidate("a"), make_candidate("b")], chunk_size=1)
+        db.commit()
+        assert sorted(first.inserted) == ["a", "b"] and first.updated == []
+
+        second = upsert_candidates(db, "AI", [make_candidate("b", views=500), make_candidate("c")], chunk_size=1)
+        db.commit()
+        assert second.inserted == ["c"]
+        assert second.updated == ["b"]
+        assert db.get(ContentCandidateDB, "b").views == 500
+        assert db.query(ContentCandidateDB).count() == 3
+
+    def test_duplicate_ids_keep_latest_sighting(self, db, make_candidate):
+        """Test that a batch repeating an id writes it once with the last values"""
+        from services.discovery.persistence import upsert_candidates
+        from api.utils.models import ContentCandidateDB
+
+        result = upsert_candidates(db, "AI", [make_candidate("a", views=1), make_candidate("a", views=2)])
+        db.commit()
+        assert result.total == 1
+        assert db.get(ContentCandidateDB, "a").views == 2
+
+    def test_generic_backend_path(self, db, make_candidate):
+        """Test the lookup + executemany fallback used when ON CONFLICT is unavailable"""
+        from services.discovery import persistence
+        from api.utils.models import ContentCandidateDB
+
+        persistence.upsert_candidates(db, "AI", [make_candidate("a")])
+        result = persistence.UpsertResult()
+        rows = [persistence.candidate_row(make_candidate("a", views=9), "AI"), persistence.candidate_row(make_candidate("z"), "AI")]
+        persistence._upsert_generic(db, rows, result)
+        db.commit()
+        assert result.inserted == ["z"] and result.updated == ["a"]
+        assert db.get(ContentCandidateDB, "a").views == 9
+
+
+class TestContentSearchIndex:
+    """Test ranked, prefix-matching candidate search (SQLite FTS5 backend)"""
+
+    @pytest.fixture
+    def db(self, db, make_candidate):
+        from services.discovery.persistence import upsert_candidates
+
+        # Rows stored before the index exists must be picked up by the initial rebuild
+        upsert_candidates(db, "AI", [
+            make_candidate("t1", "YouTube Shorts", "AI editing workflow", views=10),
+            make_candidate("t2", "TikTok", "Daily vlog", description="quick ai editing tips", views=999),
+        ])
+        upsert_candidates(db, "Fitness", [
+            make_candidate("t3", "TikTok", "Editing gym reels", views=50),
+        ])
+        db.commit()
+        return db
+
+    def test_prefix_match_and_title_ranks_first(self, db):
+        """Test that 'edit' matches 'editing' and title hits outrank description hits"""
+        from services.discovery.search_index import ContentSearchIndex
+        index = ContentSearchIndex()
+
+        assert [r.id for r in index.search(db, "ai edit")] == ["t1", "t2"]
+        assert {r.id for r in index.search(db, "edit")} == {"t1", "t2", "t3"}
+
+    def test_niche_and_platform_filters(self, db):
+        """Test per-niche and per-platform narrowing"""
+        from services.discovery.search_index import ContentSearchIndex
+        index = ContentSearchIndex()
+
+        assert [r.id for r in index.search(db, "editing", niche="Fitness")] == ["t3"]
+        assert [r.id for r in index.search(db, "editing", platform="TikTok", niche="AI")] == ["t2"]
+
+    def test_index_follows_upserts(self, db):
+        """Test that triggers keep the index in sync with later writes"""
+        from services.discovery.search_index import ContentSearchIndex
+        from services.discovery.persistence import upsert_candidates
+        from services.discovery.models import ContentCandidate
+        index = ContentSearchIndex()
+        index.search(db, "warmup")
+
+        upsert_candidates(db, "AI", [ContentCandidate(id="t1", platform="YouTube Shorts", url="u", title="Robotics roundup")])
+        db.commit()
+
+        assert [r.id for r in index.search(db, "robot")] == ["t1"]
+        assert "t1" not in [r.id for r in index.search(db, "workflow")]
+        assert index.search(db, "!!!") == []
+
+
+class TestSentinelSweep:
+    """Test sweep planning, learned scan intervals and batched niche scans"""
+
+    def test_plan_ranks_by_staleness_and_yield_and_spreads_batches(self, db):
+        """Test that stale and productive niches lead and batches span the window"""
+        import datetime
+        from services.discovery.sweep import SweepPlanner
+        from api.utils.models import ContentCandidateDB, MonitoredNiche
+
+        now = datetime.datetime(2026, 1, 10, 12, 0)
+        niches = [
+            MonitoredNiche(niche="fresh", last_scanned_at=now - datetime.timedelta(hours=1)),
+            MonitoredNiche(niche="quiet", last_scanned_at=now - datetime.timedelta(hours=8)),
+            MonitoredNiche(niche="busy", last_scanned_at=now - datetime.timedelta(hours=8)),
+            MonitoredNiche(niche="new", last_scanned_at=None),
+            MonitoredNiche(niche="idle", last_scanned_at=now - datetime.timedelta(hours=4)),
+        ]
+        db.add_all(niches)
+        db.add_all([
+            ContentCandidateDB(id=f"b{i}", niche="busy", discovery_date=now - datetime.timedelta(days=1))
+            for i in range(20)
+        ] + [ContentCandidateDB(id="old", niche="quiet", discovery_date=now - datetime.timedelta(days=30))])
+        db.commit()
+
+        batches = SweepPlanner(window=3600, concurrency=2).plan(db, niches, now=now, limit=10)
+
+        assert [b.niches for b in batches] == [["new", "busy"], ["quiet", "idle"], ["fresh"]]
+        assert [b.countdown for b in batches] == [0.0, 1200.0, 2400.0]
+
+    def test_tick_takes_due_niches_within_hourly_budget(self, db):
+        """Test that only due niches are planned and the hourly budget caps them"""
+        import datetime
+        from services.discovery.sweep import SweepPlanner
+        from api.utils.models import MonitoredNiche
+
+        now = datetime.datetime(2026, 1, 10, 12, 0)
+        db.add_all(
+            [MonitoredNiche(niche=f"due{i}", next_scan_at=now - datetime.timedelta(minutes=i + 1),
+                            last_scanned_at=now - datetime.timedelta(hours=5)) for i in range(6)]
+            + [MonitoredNiche(niche="later", next_scan_at=now + datetime.timedelta(hours=1),
+                              last_scanned_at=now - datetime.timedelta(minutes=30))]
+        )
+        db.commit()
+
+        # 8/hour with 15-minute ticks -> 2 per tick; "later" already used 1 of this hour's 8
+        planner = SweepPlanner(window=0, concurrency=4, budget_per_hour=8, tick_interval=900)
+        batches = planner.plan(db, now=now)
+        assert sum(len(b.niches) for b in batches) == 2
+        assert all(n.startswith("due") for b in batches for n in b.niches)
+
+        planner.budget_per_hour = 1
+        assert planner.plan(db, now=now) == []
+
+    def test_dispatched_niches_are_leased_and_count_against_budget(self, db):
+        """Test that a claimed niche isn't re-dispatched while its batch waits and uses up budget"""
+        import datetime
+        from services.discovery.sweep import SweepPlanner
+        from api.utils.models import MonitoredNiche
+
+        now = datetime.datetime(2026, 1, 10, 12, 0)
+        db.add_all([MonitoredNiche(niche=f"n{i}") for i in range(4)])
+        db.commit()
+
+        planner = SweepPlanner(window=840, concurrency=1, budget_per_hour=8, tick_interval=900)
+        batches = planner.plan(db, now=now)
+        planner.claim(db, batches, now)
+        db.commit()
+
+        assert [b.niches for b in batches] == [["n0"], ["n1"]]
+        first = db.query(MonitoredNiche).filter_by(niche="n0").one()
+        assert first.next_scan_at == now + datetime.timedelta(seconds=840 + 900)
+        # Next tick: neither batch has finished, so only the unclaimed niches are due,
+        # and the two in-flight scans already count against this hour's 8
+        later = now + datetime.timedelta(seconds=900)
+        assert sorted(n.niche for n in planner.due_niches(db, later)) == ["n2", "n3"]
+        planner.budget_per_hour = 3
+        assert [b.niches for b in planner.plan(db, now=later)] == [["n2"]]
+
+    def test_interval_adapts_to_yield(self):
+        """Test that hot niches are rescanned sooner and dead ones back off"""
+        import datetime
+        from services.discovery.sweep import ScanIntervalModel
+        from api.utils.models import MonitoredNiche
+
+        model = ScanIntervalModel(base_minutes=240, min_minutes=30, max_minutes=1440, target_yield=5)
+        now = datetime.datetime(2026, 1, 10, 12, 0)
+
+        hot, dead = MonitoredNiche(niche="hot"), MonitoredNiche(niche="dead")
+        assert model.observe(hot, 20, 70.0, now) == 60
+        assert model.observe(dead, 0, None, now) == 1440
+        assert hot.next_scan_at == now + datetime.timedelta(minutes=60)
+
+        # A hot niche cooling off drifts back towards the base interval
+        intervals = [model.observe(hot, 5, 70.0, now) for _ in range(10)]
+        assert intervals == sorted(intervals) and 60 < intervals[-1] < 240
+        # Score movement counts as yield even without new candidates
+        moving = MonitoredNiche(niche="moving", avg_viral_score=40.0, yield_ewma=0.0)
+        assert model.observe(moving, 0, 90.0, now) < 1440
+
+    @pytest.fixture
+    def viral_loop(self):
+        """Stands in for services.optimization.viral_loop, whose import pulls in the video engine (easyocr)"""
+        import sys
+        import types
+        module = types.ModuleType("services.optimization.viral_loop")
+        module.base_viral_loop = MagicMock(execute_autonomous_cycle=AsyncMock())
+        with patch.dict(sys.modules, {"services.optimization.viral_loop": module}):
+            yield module
+
+    def test_batch_scans_concurrently_and_learns_intervals(self, session_factory, viral_loop):
+        """Test that a batch overlaps its scans, learns from successes and defers failures"""
+        import datetime
+        from services.discovery import tasks
+        from services.discovery.models import ContentCandidate
+        from api.utils.models import ContentCandidateDB, MonitoredNiche
+
+        with session_factory() as db:
+            db.add_all([MonitoredNiche(niche=n) for n in ("ai", "broken", "fitness")])
+            db.commit()
+
+        active = {"now": 0, "peak": 0}
+
+        async def fake_scan(niche, latency_budget=None, use_cache=True, incremental=False):
+            assert use_cache is False and incremental is True
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            if niche == "broken":
+                raise RuntimeError("scanner down")
+            found = [ContentCandidate(id=f"{niche}{i}", platform="Test", url="u", viral_score=60) for i in range(3)]
+            if niche == "ai":
+                with session_factory() as db:
+                    db.add_all([ContentCandidateDB(id=c.id, niche=niche, discovery_date=datetime.datetime.utcnow()) for c in found])
+                    db.commit()
+            return found
+
+        with patch.object(tasks.base_discovery_service, "find_trending_content", side_effect=fake_scan), \
+             patch.object(tasks, "SessionLocal", session_factory):
+            result = tasks.scan_niche_batch_task.run(["ai", "broken", "fitness"])
+
+        assert active["peak"] == 3
+        assert result["scanned"] == ["ai", "fitness"]
+        assert result["failed"] == ["broken"]
+        assert result["new_counts"] == {"ai": 3, "fitness": 0}
+        assert result["next_interval_minutes"]["ai"] < result["next_interval_minutes"]["fitness"]
+        with session_factory() as db:
+            broken = db.query(MonitoredNiche).filter_by(niche="broken").one()
+            assert broken.last_scanned_at is None and broken.next_scan_at is not None
+
+    def test_auto_pilot_sweep_scans_uncached_without_budget(self, session_factory, viral_loop):
+        """Test that auto-pilot niches are measured from a full, uncached scan too"""
+        from services.discovery import tasks
+        from api.utils.models import MonitoredNiche
+
+        with session_factory() as db:
+            db.add(MonitoredNiche(niche="ai"))
+            db.commit()
+
+        with patch.object(tasks, "SessionLocal", session_factory):
+            result = tasks.scan_niche_batch_task.run(["ai"], True)
+
+        assert result["scanned"] == ["ai"]
+        viral_loop.base_viral_loop.execute_autonomous_cycle.assert_awaited_once_with("ai", latency_budget=0, use_cache=False, incremental=True)
+
+
+class TestIncrementalScan:
+    """Test per-(scanner, niche) cursors and batched stats refresh"""
+
+    def test_cursor_only_moves_forward_and_overlaps(self, session_factory, make_candidate):
+        """Test that the cursor tracks the newest publish time and scans start just before it"""
+        import datetime
+        from services.discovery import cursors
+
+        store = cursors.ScanCursorStore(overlap_minutes=60)
+        horizon = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+        with patch.object(cursors, "SessionLocal", session_factory):
+            assert store.since(store.load("ai", ["S"]).get("S"), horizon) == horizon
+            store.advance("ai", "S", [make_candidate("a", published_at="2026-01-10T08:00:00Z"), make_candidate("b")])
+            store.advance("ai", "S", [make_candidate("c", published_at="2026-01-09T00:00:00Z")])
+            marks = store.load("ai", ["S", "Other"])
+
+        assert marks == {"S": datetime.datetime(2026, 1, 10, 8, 0)}
+        assert store.since(marks["S"], horizon) == datetime.datetime(2026, 1, 10, 7, 0, tzinfo=datetime.timezone.utc)
+        # A cursor older than the horizon never widens the scan
+        assert store.since(datetime.datetime(2025, 6, 1), horizon) == horizon
+
+    @pytest.mark.asyncio
+    async def test_incremental_scan_requests_past_cursor_and_refreshes_stored(self, session_factory, make_candidate):
+        """Test that scanners get their cursor as published_after and old finds come back re-statted"""
+        import datetime
+        from services.discovery import cursors
+        from services.discovery.service import DiscoveryService
+        from api.utils.models import ContentCandidateDB, ScanCursorDB
+
+        now = datetime.datetime.utcnow()
+        with session_factory() as db:
+            db.add(ScanCursorDB(scanner="_RefreshingScanner", niche="ai", high_water_mark=now - datetime.timedelta(hours=3)))
+            db.add_all([
+                ContentCandidateDB(id="old", niche="ai", platform="Stub", url="u", views=10, discovery_date=now - datetime.timedelta(days=2)),
+                ContentCandidateDB(id="stale", niche="ai", platform="Stub", url="u", views=5, discovery_date=now - datetime.timedelta(days=90)),
+                ContentCandidateDB(id="other", niche="ai", platform="Elsewhere", url="u", discovery_date=now),
+            ])
+            db.commit()
+
+        newest = (now - datetime.timedelta(minutes=30)).isoformat() + "Z"
+
+        class _RefreshingScanner:
+            platform_name = "Stub"
+            requested = None
+            refreshed_ids = None
+
+            async def scan_trends(self, niche, published_after=None):
+                self.requested = published_after
+                return [make_candidate("new", "Stub", published_at=newest)]
+
+            async def refresh_stats(self, candidates):
+                self.refreshed_ids = sorted(c.id for c in candidates)
+                return [c.model_copy(update={"views": c.views * 100}) for c in candidates]
+
+        scanner = _RefreshingScanner()
+        service = DiscoveryService()
+        service.scanners, service.global_scanners = [scanner], []
+
+        with patch.object(cursors, "SessionLocal", session_factory), \
+             patch("services.discovery.service.SessionLocal", session_factory), \
+             patch.object(service, "_selective_threshold", return_value=None), \
+             patch.object(service, "_persist_candidates"), \
+             patch.object(service, "_trigger_recursive_expansion", new=AsyncMock()):
+            results = await service.find_trending_content("ai", latency_budget=0, use_cache=False, incremental=True)
+
+        expected_since = now - datetime.timedelta(hours=3) - cursors.scan_cursors.overlap
+        assert scanner.requested.replace(tzinfo=None) == expected_since
+        # Only rows of this scanner's platform within the horizon are refreshed, in one batch
+        assert scanner.refreshed_ids == ["old"]
+        assert {c.id: c.views for c in results} == {"new": 0, "old": 1000}
+        with session_factory() as db:
+            mark = db.query(ScanCursorDB).filter_by(scanner="_RefreshingScanner", niche="ai").one().high_water_mark
+        assert mark == datetime.datetime.fromisoformat(newest[:-1])
+
+    def test_youtube_refresh_uses_statistics_only(self, make_candidate):
+        """Test that stored Shorts are re-scored from one statistics-only videos().list call"""
+        from services.discovery.youtube_scanner import YouTubeShortsScanner
+
+        youtube = MagicMock()
+        youtube.videos.return_value.list.return_value.execute.return_value = {"items": [
+            {"id": "abc", "statistics": {"viewCount": "5000", "likeCount": "500"}},
+        ]}
+        stored = [make_candidate("yt_abc", "YouTube Shorts", published_at="2026-01-10T00:00:00Z", views=10),
+                  make_candidate("yt_gone", "YouTube Shorts", published_at="2026-01-10T00:00:00Z", views=10)]
+
+        with patch("services.discovery.youtube_scanner.build", return_value=youtube):
+            refreshed = YouTubeShortsScanner()._refresh_sync("key", stored)
+
+        youtube.videos.return_value.list.assert_called_once_with(id="abc,gone", part="statistics")
+        assert [(c.id, c.views, c.view_count) for c in refreshed] == [("yt_abc", 5000, 5000)]
+        assert refreshed[0].engagement_score == 0.1
+        assert refreshed[0].metadata["published_at"] == "2026-01-10T00:00:00Z"
+
+
+class TestNearDuplicateClustering:
+    """Test MinHash/LSH clustering of cross-platform copies"""
+
+    def test_cross_platform_copies_merge_into_canonical(self, make_candidate):
+        """Test that retitled copies collapse onto the strongest one and unrelated clips stay apart"""
+        from services.discovery.dedup import NearDuplicateClusterer
+
+        candidates = [
+            make_candidate("tt1", "TikTok", "ROBOT DOG does a backflip!! #fyp", views=3000, viral_score=70),
+            make_candidate("yt1", "YouTube Shorts", "Robot dog does a backflip #shorts", views=1000, viral_score=90),
+            make_candidate("pasta", "YouTube Shorts", "Cooking pasta in sixty seconds", views=500),
+            make_candidate("ddg1", "DuckDuckGo", "Robot Dog Does A Backflip - YouTube", views=0, viral_score=10),
+            make_candidate("ai1", "Reddit", "AI"),
+            make_candidate("ai2", "X", "AI"),
+        ]
+
+        merged = NearDuplicateClusterer(threshold=0.6).dedupe(candidates)
+
+        assert [c.id for c in merged] == ["yt1", "pasta", "ai1", "ai2"]
+        cluster = merged[0].metadata["cluster"]
+        assert cluster["size"] == 3 and cluster["total_views"] == 4000
+        assert cluster["platforms"] == ["DuckDuckGo", "TikTok", "YouTube Shorts"]
+        assert [m["id"] for m in cluster["members"]] == ["tt1", "ddg1"]
+        # The canonical keeps its own platform stats
+        assert merged[0].views == 1000 and "cluster" not in merged[1].metadata
+
+    def test_templated_titles_on_one_platform_stay_separate(self, make_candidate):
+        """Test that same-platform uploads need a title and thumbnail match (or the same URL)"""
+        from services.discovery.dedup import NearDuplicateClusterer
+
+        candidates = [
+            make_candidate("m24", "YouTube Shorts", "How to make money online in 2024"),
+            make_candidate("m25", "YouTube Shorts", "How to make money online in 2025"),
+            make_candidate("pc24", "YouTube Shorts", "Best budget gaming PC build 2024", thumbnail_hash="00ff00ff00ff00ff"),
+            make_candidate("pc25", "YouTube Shorts", "Best budget gaming PC build 2025", thumbnail_hash="f0f0f0f0f0f0f0f0"),
+            make_candidate("re1", "TikTok", "Reuploaded clip", thumbnail_hash="0123456789abcdef"),
+            make_candidate("re2", "TikTok", "Different caption entirely", thumbnail_hash="0123456789abcdef"),
+            make_candidate("rt1", "TikTok", "Robot dog does a backflip", thumbnail_hash="fedcba9876543210"),
+            make_candidate("rt2", "TikTok", "robot dog does a backflip!!", thumbnail_hash="fedcba9876543211"),
+        ]
+
+        clusters = NearDuplicateClusterer(threshold=0.6).cluster(candidates)
+
+        assert clusters == [[0], [1], [2], [3], [4], [5], [6, 7]]
+
+    def test_thumbnail_hashes_link_differently_titled_copies(self, make_candidate):
+        """Test that near-identical thumbnails cluster even when titles share nothing"""
+        import io
+        from PIL import Image
+        from services.discovery.dedup import NearDuplicateClusterer, dhash
+
+        def png(shift):
+            image = Image.new("L", (90, 80))
+            image.putdata([(x * 3 + y + shift) % 256 for y in range(80) for x in range(90)])
+            out = io.BytesIO()
+            image.save(out, format="PNG")
+            return out.getvalue()
+
+        original, recompressed = dhash(png(0)), dhash(png(2))
+        assert bin(original ^ recompressed).count("1") <= 6
+        candidates = [
+            make_candidate("a", "TikTok", "watch till the end", thumbnail_hash=f"{original:016x}"),
+            make_candidate("b", "Instagram", "no way this happened", thumbnail_hash=f"{recompressed:016x}"),
+            make_candidate("c", "X", "something else entirely", thumbnail_hash=f"{original ^ 0xFFFF0000FFFF:016x}"),
+        ]
+
+        assert NearDuplicateClusterer(threshold=0.6).cluster(candidates) == [[0, 1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_streamed_and_late_copies_fold_into_stored_candidate(self, make_candidate):
+        """Test that the persisting stream stores one row per clip, including late scanners"""
+        from services.discovery.service import DiscoveryService
+
+        service = DiscoveryService()
+        service.global_scanners = []
+        service.scanners = [
+            _StubScanner("yt", 0.0, [make_candidate("yt1", "YouTube Shorts", "Robot dog does a backflip", viral_score=60)]),
+            _StubScanner("tt", 0.05, [
+                make_candidate("tt1", "TikTok", "robot dog does a backflip #fyp", viral_score=90),
+                make_candidate("tt2", "TikTok", "Cooking pasta in sixty seconds"),
+            ]),
+            _StubScanner("rd", 0.3, [make_candidate("rd1", "Reddit", "Robot dog does a backflip!!")]),
+        ]
+        persisted = []
+
+        with patch.object(service, "_cached_trends", return_value=None), \
+             patch.object(service, "_selective_threshold", return_value=None), \
+             patch.object(service, "_persist_candidates", side_effect=lambda niche, c: persisted.append(c)):
+            batches = [(name, [c.id for c in cands]) async for name, cands in
+                       service.stream_trending_content("robots", latency_budget=0.15)]
+            await asyncio.sleep(0.4)
+
+        # The first sighting stays canonical; later copies only grow its cluster
+        assert batches == [("_StubScanner", ["yt1"]), ("_StubScanner", ["tt2"])]
+        stored_ids = [[c.id for c in batch] for batch in persisted]
+        assert stored_ids == [["yt1"], ["tt2", "yt1"], ["yt1"]]
+        final = persisted[-1][0].metadata["cluster"]
+        assert [m["id"] for m in final["members"]] == ["tt1", "rd1"]
+
+    @pytest.mark.asyncio
+    async def test_find_trending_content_persists_one_row_per_clip(self, make_candidate):
+        """Test that the list API stores and returns only canonical candidates"""
+        from services.discovery.service import DiscoveryService
+
+        service = DiscoveryService()
+        service.global_scanners = []
+        service.scanners = [
+            _StubScanner("yt", 0.0, [make_candidate("yt1", "YouTube Shorts", "Robot dog does a backflip", viral_score=90)]),
+            _StubScanner("tt", 0.0, [make_candidate("tt1", "TikTok", "robot dog does a backflip #fyp", viral_score=60)]),
+        ]
+        persist = MagicMock()
+
+        with patch.object(service, "_cached_trends", return_value=None), \
+             patch.object(service, "_selective_threshold", return_value=None), \
+             patch.object(service, "_persist_candidates", persist), \
+             patch.object(service, "_trigger_recursive_expansion", new=AsyncMock()):
+            results = await service.find_trending_content("robots", latency_budget=0)
+
+        assert [c.id for c in results] == ["yt1"]
+        assert [c.id for c in persist.call_args.args[1]] == ["yt1"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -226,7 +226,54 @@ class TestVideoJobs:
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
-    
+
+    def test_list_jobs_keyset_pagination(self, client: TestClient, auth_token):
+        """Test that job listing pages newest-first through X-Next-Cursor."""
+        import datetime
+        from api.utils.database import SessionLocal
+        from api.utils.models import VideoJobDB
+        from api.utils.user_models import UserDB
+
+        db = SessionLocal()
+        try:
+            user = db.query(UserDB).filter(UserDB.username == "jobuser").first()
+            db.query(VideoJobDB).filter(VideoJobDB.user_id == user.id).delete()
+            base = datetime.datetime(2026, 1, 1)
+            for i in range(5):
+                # Two jobs share a timestamp to exercise the id tie-breaker
+                db.add(VideoJobDB(id=f"page-job-{i}", title="Job", status="Queued",
+                                  user_id=user.id, created_at=base + datetime.timedelta(minutes=min(i, 3))))
+            # Legacy rows may have no timestamp; they page last instead of breaking the cursor
+            db.add(VideoJobDB(id="page-job-legacy", title="Job", status="Queued", user_id=user.id))
+            db.flush()
+            db.query(VideoJobDB).filter(VideoJobDB.id == "page-job-legacy").update({"created_at": None})
+            db.commit()
+        finally:
+            db.close()
+
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        seen, cursor = [], None
+        for _ in range(6):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/video/jobs", headers=headers, params=params)
+            assert response.status_code == 200
+            seen.extend(job["id"] for job in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert seen == ["page-job-4", "page-job-3", "page-job-2", "page-job-1", "page-job-0", "page-job-legacy"]
+
+    def test_list_jobs_rejects_bad_cursor(self, client: TestClient, auth_token):
+        """Test that a malformed cursor is a client error."""
+        response = client.get(
+            "/video/jobs",
+            headers={"Authorization": f"Bearer {auth_token}"},
+            params={"cursor": "not-a-cursor"}
+        )
+
+        assert response.status_code == 400
+
     def test_get_job_status(self, client: TestClient, auth_token):
         """Test getting specific job status."""
         response = client.get(
@@ -0,0 +1,163 @@
+"""
+WebSocket Broadcaster Tests
+===========================
+Unit tests for topic fan-out and per-connection send queues
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from api.routes.ws import Connection, ConnectionManager, job_topics, notify_job_update_sync
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+class TestConnectionManager:
+    """Test topic routing and slow-consumer handling."""
+
+    @pytest.fixture
+    def manager(self):
+        manager = ConnectionManager()
+        # Keep the Redis subscriber out of unit tests
+        manager.pubsub_task = MagicMock()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_updates_only_reach_subscribed_users(self, manager):
+        """Test that a job update goes to its owner and admins, not other users."""
+        owner, other, admin = FakeSocket(), FakeSocket(), FakeSocket()
+        await manager.city_connect(owner, topics=["user:1"])
+        await manager.city_connect(other, topics=["user:2"])
+        await manager.city_connect(admin, topics=["user:3", "all"])
+
+        delivered = manager.broadcast({"type": "job_update", "data": {"id": "j1"}}, job_topics("j1", 1))
+        await asyncio.sleep(0.01)
+
+        assert delivered == 2
+        assert owner.sent == admin.sent == [{"type": "job_update", "data": {"id": "j1"}}]
+        assert other.sent == []
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_stall_others(self, manager):
+        """Test that broadcast returns immediately and fast clients are served first."""
+        slow, fast = FakeSocket(delay=0.5), FakeSocket()
+        await manager.city_connect(slow, topics=["all"])
+        await manager.city_connect(fast, topics=["all"])
+
+        manager.broadcast({"type": "ping"}, ["all"])
+        await asyncio.sleep(0.01)
+
+        assert fast.sent == [{"type": "ping"}]
+        assert slow.sent == []
+
+    @pytest.mark.asyncio
+    async def test_pending_job_deltas_are_merged(self):
+        """Test that queued deltas for the same job collapse into one message."""
+        connection = Connection(FakeSocket(), max_pending=10, send_timeout=1)
+        connection.send({"type": "job_update", "data": {"id": "j1", "status": "Rendering", "progress": 40}})
+        connection.send({"type": "job_update", "data": {"id": "j1", "progress": 60}})
+        connection.send({"type": "job_update", "data": {"id": "j2", "progress": 5}})
+
+        assert list(connection._pending.values()) == [
+            {"type": "job_update", "data": {"id": "j1", "status": "Rendering", "progress": 60}},
+            {"type": "job_update", "data": {"id": "j2", "progress": 5}},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_overflowing_client_is_dropped(self, manager):
+        """Test that a client whose queue fills up is disconnected and unsubscribed."""
+        stuck = FakeSocket(delay=10)
+        connection = await manager.city_connect(stuck, topics=["all"])
+        connection.max_pending = 2
+
+        for i in range(4):
+            manager.broadcast({"type": "job_update", "data": {"id": f"j{i}"}}, ["all"])
+        await asyncio.sleep(0.01)
+
+        assert connection.closed
+        assert stuck.closed_with == 1013
+        assert stuck not in manager.active_connections
+        assert "all" not in manager.topics
+
+    def test_telemetry_deltas_are_merged(self):
+        """Test that a slow telemetry client gets one combined delta."""
+        connection = Connection(FakeSocket(), max_pending=10, send_timeout=1)
+        connection.send({"type": "telemetry_delta", "timestamp": 1, "set": {"a": 1, "b": 1}})
+        connection.send({"type": "telemetry_delta", "timestamp": 2, "set": {"a": 2}, "unset": ["b"]})
+
+        assert list(connection._pending.values()) == [
+            {"type": "telemetry_delta", "timestamp": 2, "set": {"a": 2}, "unset": ["b"]}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_telemetry_feed_broadcasts_only_changes(self):
+        """Test that the feed sends a delta only when metrics moved."""
+        from api.routes import ws
+
+        snapshots = iter([{"queue.celery.depth": 3}, {"queue.celery.depth": 3}, {"queue.celery.depth": 5}])
+        feed = ws.TelemetryFeed()
+        with patch("api.routes.ws.get_redis"), \
+             patch("services.monitoring.telemetry.read_latest", side_effect=lambda r: next(snapshots)), \
+             patch.object(ws.manager, "broadcast") as broadcast:
+            first = await feed.tick()
+            unchanged = await feed.tick()
+            moved = await feed.tick()
+
+        assert first["set"] == {"queue.celery.depth": 3}
+        assert unchanged is None
+        assert moved["set"] == {"queue.celery.depth": 5}
+        assert broadcast.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_subscribe_resolves_ownership_in_one_threaded_lookup(self, manager):
+        """Test that a subscribe checks all job ids in one call made off the event loop."""
+        import threading
+        from api.routes import ws
+
+        calls = []
+
+        def watchable(user, job_ids):
+            calls.append((threading.current_thread() is threading.main_thread(), job_ids))
+            return {"j1"}
+
+        socket = FakeSocket()
+        connection = await manager.city_connect(socket, MagicMock(id=1))
+        with patch.object(ws, "manager", manager), patch.object(ws, "_watchable_jobs", side_effect=watchable):
+            await ws._handle_client_message(connection, json.dumps({"action": "subscribe", "jobs": ["j1", "j2"]}))
+
+        assert calls == [(False, ["j1", "j2"])]
+        assert connection.topics == {"job:j1"}
+
+    def test_notify_publishes_topics_once(self):
+        """Test that publishers send one Redis message carrying the audience."""
+        redis_client = MagicMock()
+        with patch("api.routes.ws.get_redis", return_value=redis_client):
+            notify_job_update_sync({"id": "j1", "progress": 10}, user_id=7)
+
+        channel, payload = redis_client.publish.call_args.args
+        assert channel == "job_updates"
+        assert json.loads(payload) == {
+            "topics": ["job:j1", "all", "user:7"],
+            "message": {"type": "job_update", "data": {"id": "j1", "progress": 10}},
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
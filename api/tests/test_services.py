@@ -1,7 +1,7 @@
 """
 Test Suite for Services
 =======================
-Tests for LangChain, CrewAI, Affiliate, Trading, Interpreter services
+Tests for LangChain, CrewAI, Affiliate, Trading, Interpreter, Whisper services
 """
 
 import os
@@ -164,6 +164,365 @@ class TestInterpreterService:
             asyncio.run(service.execute_code("print('test')"))
 
 
+class TestWhisperEngine:
+    """Test the pooled Whisper transcription engine"""
+
+    def test_transcripts_cached_by_audio_hash(self):
+        """Test that identical audio is only run through the model once"""
+        np = pytest.importorskip("numpy")
+        from api.utils.whisper_engine import WhisperEngine
+
+        engine = WhisperEngine()
+        audio = np.ones(16000, dtype=np.float32)
+        segments = [{"text": "hello", "start": 0.0, "end": 1.0, "words": []}]
+
+        with patch.object(WhisperEngine, "extract_audio", return_value=audio), \
+             patch.object(engine, "_run_model", return_value=segments) as mock_run, \
+             patch("api.utils.redis_client.RedisPools.client", side_effect=Exception("no redis")):
+            first = engine.transcribe_sync("a.mp4")
+            second = engine.transcribe_sync("copy_of_a.mp4")
+
+        assert first == second == segments
+        mock_run.assert_called_once()
+
+    def test_memory_cache_is_lru_bounded(self):
+        """Test that the in-process transcript cache keeps only the most recently used entries"""
+        from api.utils.whisper_engine import WhisperEngine
+
+        engine = WhisperEngine()
+        engine.memory_cache_size = 2
+        with patch("api.utils.redis_client.RedisPools.client", side_effect=Exception("no redis")):
+            engine._cache_set("a", [])
+            engine._cache_set("b", [])
+            assert engine._cache_get("a") == []
+            engine._cache_set("c", [])
+
+            assert list(engine._memory_cache) == ["a", "c"]
+            assert engine._cache_get("b") is None
+
+    @pytest.mark.asyncio
+    async def test_async_transcribe_runs_in_pool(self):
+        """Test that the async API delegates to the blocking path on the executor"""
+        from api.utils.whisper_engine import WhisperEngine
+
+        engine = WhisperEngine()
+        with patch.object(engine, "transcribe_sync", return_value=[]) as mock_sync:
+            assert await engine.transcribe("clip.mp4") == []
+        mock_sync.assert_called_once_with("clip.mp4")
+
+
+class TestSecretCache:
+    """Test the cached get_secret/get_secrets layer"""
+
+    @pytest.fixture
+    def vault(self, tmp_path):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from api.utils.database import Base
+        from api.utils.models import SystemSettings, UserSetting
+        from api.utils import vault
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'vault.db'}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        db.add_all([
+            SystemSettings(key="storage_bucket", value="system-bucket"),
+            UserSetting(user_id=7, key="storage_bucket", value="user-bucket"),
+        ])
+        db.commit()
+        db.close()
+
+        with patch.object(vault, "SessionLocal", Session), \
+             patch.object(vault, "secret_cache", vault.SecretCache(ttl=60, negative_ttl=60)), \
+             patch.object(vault.SecretCache, "ensure_listener"), \
+             patch("api.utils.redis_client.RedisPools.client", side_effect=Exception("no redis")):
+            yield vault, Session
+        engine.dispose()
+
+    def test_repeated_lookups_hit_db_once(self, vault):
+        """Test that hits and misses (negative entries) are both served from memory"""
+        vault, _ = vault
+        with patch.object(vault, "_load_from_db", wraps=vault._load_from_db) as load:
+            assert vault.get_secret("storage_bucket") == "system-bucket"
+            assert vault.get_secret("STORAGE_BUCKET") == "system-bucket"
+            assert vault.get_secret("unset_key", "fallback") == "fallback"
+            assert vault.get_secret("unset_key", "fallback") == "fallback"
+        assert load.call_count == 2
+
+    def test_user_override_and_invalidation(self, vault):
+        """Test that writes become visible immediately after invalidation"""
+        vault, Session = vault
+        from api.utils.models import SystemSettings
+        assert vault.get_secret("storage_bucket", user_id=7) == "user-bucket"
+        assert vault.get_secret("storage_bucket") == "system-bucket"
+
+        db = Session()
+        db.query(SystemSettings).filter(SystemSettings.key == "storage_bucket").update({"value": "new-bucket"})
+        db.commit()
+        db.close()
+        assert vault.get_secret("storage_bucket") == "system-bucket"
+
+        vault.invalidate_secret("storage_bucket")
+        assert vault.get_secret("storage_bucket") == "new-bucket"
+        # System-wide invalidation also drops per-user entries for the key
+        assert vault.secret_cache.get("storage_bucket", 7) == (False, None)
+
+    def test_bulk_lookup_single_load(self, vault):
+        """Test that get_secrets resolves several keys with one load and applies fallbacks"""
+        vault, _ = vault
+        with patch.object(vault, "_load_from_db", wraps=vault._load_from_db) as load:
+            result = vault.get_secrets(
+                ["storage_bucket", "storage_region", "app_name"], user_id=7,
+                defaults={"storage_region": "us-east-1"}
+            )
+            vault.get_secrets(["storage_bucket", "storage_region"], user_id=7)
+
+        assert result["storage_bucket"] == "user-bucket"
+        assert result["storage_region"] == "us-east-1"
+        assert result["app_name"]  # falls through to api.config
+        load.assert_called_once()
+
+
+class TestSettingsSnapshot:
+    """Test the versioned system settings snapshot"""
+
+    @pytest.fixture
+    def store(self):
+        from api.utils.settings_snapshot import SettingsStore, SettingsSnapshot
+        store = SettingsStore(ttl=60)
+        store.remote = 1
+        loads = []
+
+        def load(version):
+            loads.append(version)
+            return SettingsSnapshot({"auto_pilot": "True", "monetization_aggression": "40"}, version)
+
+        with patch.object(store, "_remote_version", side_effect=lambda: store.remote), \
+             patch.object(store, "_load", side_effect=load):
+            yield store, loads
+
+    def test_reloads_only_when_version_moves(self, store):
+        """Test that the table is read once per version"""
+        store, loads = store
+        first = store.current()
+        assert store.current() is first
+        assert first.get_bool("auto_pilot") and first.get_int("monetization_aggression") == 40
+
+        store.remote = 2
+        assert store.current() is not first
+        assert loads == [1, 2]
+
+    def test_ttl_fallback_without_redis(self, store):
+        """Test that an unreachable version counter falls back to the TTL"""
+        store, loads = store
+        store.remote = None
+        snapshot = store.current()
+        assert store.current() is snapshot
+        store.ttl = 0
+        store.current()
+        assert loads == [None, None]
+
+    def test_scope_pins_one_snapshot(self, store):
+        """Test that a request/task sees a single snapshot even if settings change mid-way"""
+        from api.utils import settings_snapshot
+        store, loads = store
+
+        with patch.object(settings_snapshot, "settings_store", store):
+            with settings_snapshot.settings_scope():
+                first = settings_snapshot.current_settings()
+                store.remote = 2
+                assert settings_snapshot.current_settings() is first
+            assert settings_snapshot.current_settings() is not first
+
+    def test_snapshot_is_read_only(self, store):
+        """Test that callers cannot mutate the shared snapshot"""
+        store, _ = store
+        with pytest.raises(TypeError):
+            store.current().values["auto_pilot"] = "false"
+
+
+class TestRedisPools:
+    """Test the shared Redis client factory"""
+
+    def test_clients_share_one_pool(self):
+        """Test that repeated lookups reuse a pool instead of reconnecting"""
+        from api.utils.redis_client import RedisPools
+        pools = RedisPools()
+
+        first, second = pools.client(), pools.client()
+        assert first.connection_pool is second.connection_pool
+        assert pools.client(decode_responses=True).connection_pool is not first.connection_pool
+        # Subscribers block on reads, so they never share the request/response pool
+        subscriber = pools.client(subscriber=True).connection_pool
+        assert subscriber is not first.connection_pool
+        assert subscriber.connection_kwargs["socket_timeout"] is None
+
+        stats = pools.stats()
+        assert stats["sync_pools"] == 3
+        assert stats["connections"]["raw"]["in_use"] == 0
+
+    def test_localhost_rewrite(self):
+        """Test the docker hostname rewrite is applied in one place"""
+        from api.utils.redis_client import resolve_redis_url
+        from api.config import settings
+
+        with patch.object(settings, "REDIS_REWRITE_LOCALHOST", True):
+            assert resolve_redis_url("redis://localhost:6379/1") == "redis://redis:6379/1"
+        with patch.object(settings, "REDIS_REWRITE_LOCALHOST", False):
+            assert resolve_redis_url("redis://localhost:6379/1") == "redis://localhost:6379/1"
+
+    @pytest.mark.asyncio
+    async def test_async_pool_per_loop(self):
+        """Test that async clients reuse the running loop's pool"""
+        from api.utils.redis_client import RedisPools
+        pools = RedisPools()
+
+        assert pools.async_client().connection_pool is pools.async_client().connection_pool
+        await pools.aclose()
+        assert pools.stats()["async_pools"] == 0
+
+
+class TestTelemetry:
+    """Test worker telemetry storage and the delta encoding"""
+
+    def test_read_latest_counts_renders_per_node(self):
+        """Test that the snapshot flattens metrics and active renders per node"""
+        from services.monitoring.telemetry import read_latest
+
+        r = MagicMock()
+        r.pipeline.return_value.execute.return_value = [
+            {b"queue.celery.depth": b"7", b"redis.latency_ms": b"0.42"},
+            0,
+            [b"gpu-1|a", b"gpu-1|b", b"cpu-2|c"],
+        ]
+        assert read_latest(r) == {
+            "queue.celery.depth": 7,
+            "redis.latency_ms": 0.42,
+            "renders.gpu-1": 2,
+            "renders.cpu-2": 1,
+            "renders.total": 3,
+        }
+
+    def test_history_is_oldest_first(self):
+        """Test that ring buffer samples come back in chart order"""
+        from services.monitoring.telemetry import read_history
+
+        r = MagicMock()
+        r.pipeline.return_value.execute.return_value = [[b"20.0:5", b"10.0:3"], []]
+        assert read_history(r, ["queue.celery.depth", "disk.used_pct"], 10) == {
+            "queue.celery.depth": [(10.0, 3), (20.0, 5)]
+        }
+
+    def test_diff_reports_changes_and_removals(self):
+        """Test the delta between two snapshots"""
+        from services.monitoring.telemetry import diff
+
+        changed, removed = diff({"a": 1, "b": 2, "renders.gpu-1": 1}, {"a": 1, "b": 3, "c": 4})
+        assert changed == {"b": 3, "c": 4}
+        assert removed == ["renders.gpu-1"]
+
+    def test_output_tree_is_sized_only_when_the_storage_lease_is_free(self):
+        """Test that the 15s sample skips the full outputs walk unless this worker wins the storage lease"""
+        from collections import namedtuple
+        from services.monitoring import telemetry
+
+        r = MagicMock()
+        r.pipeline.return_value.execute.return_value = [3]
+        storage = MagicMock(output_dir="outputs", threshold_bytes=10 * 1024 ** 3)
+        storage.get_output_dir_size.return_value = 1024 ** 3
+        usage = namedtuple("usage", "total used free")(100, 40, 60)
+
+        with patch.object(telemetry, "get_redis", return_value=r), \
+             patch.object(telemetry, "_postgres_ping"), \
+             patch.object(telemetry.shutil, "disk_usage", return_value=usage), \
+             patch("services.storage.manager.storage_manager", storage):
+            r.set.return_value = True
+            first = telemetry.sample_system()
+            r.set.return_value = None
+            second = telemetry.sample_system()
+
+        assert first["storage.outputs_gb"] == 1.0 and first["storage.threshold_pct"] == 10.0
+        assert "storage.outputs_gb" not in second and second["disk.used_pct"] == 40.0
+        assert storage.get_output_dir_size.call_count == 1
+        assert r.set.call_args.kwargs == {"nx": True, "ex": 600}
+
+    def test_record_never_raises(self):
+        """Test that telemetry failures never reach the measured code"""
+        from services.monitoring.telemetry import record, track_render
+
+        with patch("services.monitoring.telemetry.get_redis", side_effect=Exception("down")):
+            record({"render.encode_fps": 42})
+            with track_render():
+                pass
+
+
+class TestCandidateStatsRefresh:
+    """Test batched stats refresh and velocity history of stored candidates"""
+
+    class _Scanner:
+        platform_name = "YouTube Shorts"
+
+        def __init__(self):
+            self.batches = []
+
+        async def refresh_stats(self, candidates):
+            self.batches.append(sorted(c.id for c in candidates))
+            return [c.model_copy(update={"views": c.views + 1200, "engagement_score": 0.2}) for c in candidates]
+
+    @pytest.mark.asyncio
+    async def test_refreshes_window_by_platform_and_records_velocity(self, db):
+        """Test that in-window candidates are refreshed per platform in one batch and get history"""
+        import datetime
+        from services.analytics.stats_refresh import CandidateStatsRefresher
+        from api.utils.models import CandidateStatsSampleDB, ContentCandidateDB
+
+        now = datetime.datetime(2026, 1, 10, 12, 0)
+        published = (now - datetime.timedelta(hours=10)).isoformat() + "Z"
+        db.add_all([
+            ContentCandidateDB(id="yt_a", platform="YouTube Shorts", url="u", views=800, discovery_date=now - datetime.timedelta(days=1),
+                               metadata_json={"published_at": published}),
+            ContentCandidateDB(id="yt_b", platform="YouTube Shorts", url="u", views=100, discovery_date=now - datetime.timedelta(days=2)),
+            ContentCandidateDB(id="yt_old", platform="YouTube Shorts", url="u", views=5, discovery_date=now - datetime.timedelta(days=30)),
+            ContentCandidateDB(id="rd_1", platform="Reddit", url="u", views=7, discovery_date=now),
+        ])
+        db.add(CandidateStatsSampleDB(candidate_id="yt_b", sampled_at=now - datetime.timedelta(hours=2), views=100))
+        db.add(CandidateStatsSampleDB(candidate_id="yt_b", sampled_at=now - datetime.timedelta(days=9), views=1))
+        db.commit()
+
+        scanner = self._Scanner()
+        refresher = CandidateStatsRefresher(scanners=[scanner], window_days=7, max_candidates=100)
+        result = await refresher.refresh(db, now=now)
+        db.commit()
+
+        assert scanner.batches == [["yt_a", "yt_b"]]
+        assert (result.selected, result.refreshed, result.skipped, result.pruned) == (3, 2, {"Reddit": 1}, 1)
+        rows = {r.id: r for r in db.query(ContentCandidateDB)}
+        assert (rows["yt_a"].views, rows["yt_a"].view_count, rows["yt_a"].engagement_score) == (2000, 2000, 0.2)
+        assert rows["yt_old"].views == 5 and rows["rd_1"].views == 7
+
+        velocity = {s.candidate_id: s.velocity for s in db.query(CandidateStatsSampleDB).filter_by(sampled_at=now)}
+        # First sample: lifetime views/hour since publish; later ones: views gained since the last sample
+        assert velocity == {"yt_a": 200.0, "yt_b": 600.0}
+
+    @pytest.mark.asyncio
+    async def test_failed_platform_leaves_rows_untouched(self, db):
+        """Test that a lookup error is reported without writing stats or history"""
+        import datetime
+        from services.analytics.stats_refresh import CandidateStatsRefresher
+        from api.utils.models import CandidateStatsSampleDB, ContentCandidateDB
+
+        scanner = self._Scanner()
+        scanner.refresh_stats = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+        db.add(ContentCandidateDB(id="yt_a", platform="YouTube Shorts", url="u", views=10, discovery_date=datetime.datetime.utcnow()))
+        db.commit()
+
+        result = await CandidateStatsRefresher(scanners=[scanner]).refresh(db)
+
+        assert result.failed == ["YouTube Shorts"] and result.refreshed == 0
+        assert db.query(CandidateStatsSampleDB).count() == 0
+
+
 import sys
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,455 @@
+"""
+Test Suite for Video Engine Helpers
+===================================
+Unit tests for the pure-logic pieces of services/video_engine
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+import pytest
+from unittest.mock import patch, MagicMock
+from services.video_engine.filtergraph import FilterGraphCompiler
+from services.video_engine.probe import MediaProbeService, MediaMetadata, _parse_rate
+from services.video_engine.frame_sampler import FrameSampler
+
+
+class TestFilterGraphCompiler:
+    """Test ffmpeg filtergraph compilation"""
+
+    def test_empty_filters_still_normalizes_output(self):
+        """Test that no filters yields a passthrough graph with encoder-safe output"""
+        graph = FilterGraphCompiler().compile([], {}, has_audio=False)
+
+        assert graph.filter_complex.startswith("[0:v]null,")
+        assert "format=yuv420p[vout]" in graph.filter_complex
+        assert graph.audio_label is None
+        assert graph.applied_filters == []
+
+    def test_dashboard_and_strategy_filters_are_merged(self):
+        """Test that AI-recommended filters are added to dashboard filters once"""
+        compiler = FilterGraphCompiler()
+        merged = compiler.resolve_filters(["f1", "f11"], {"recommended_filters": ["f11", "f10"]})
+
+        assert merged == ["f1", "f11", "f10"]
+
+    def test_speed_ramp_applies_to_video_and_audio(self):
+        """Test that speed ramping retimes both streams by the same factor"""
+        graph = FilterGraphCompiler().compile(["f6"], {"speed_range": [1.05, 1.05]}, has_audio=True)
+
+        assert graph.speed == 1.05
+        assert "setpts=PTS/1.05" in graph.filter_complex
+        assert "[0:a]atempo=1.05[aout]" in graph.filter_complex
+
+    def test_seed_makes_compilation_deterministic(self):
+        """Test that a fixed seed reproduces identical random parameters"""
+        compiler = FilterGraphCompiler()
+        strategy = {"speed_range": [0.9, 1.1], "recommended_filters": ["f2", "f6", "f7"]}
+
+        first = compiler.compile([], strategy, duration=30.0, seed=42)
+        second = compiler.compile([], strategy, duration=30.0, seed=42)
+
+        assert first.filter_complex == second.filter_complex
+
+    def test_glow_branches_and_rejoins(self):
+        """Test that the glow filter splits the stream and blends it back"""
+        graph = FilterGraphCompiler().compile(["f9", "f11"], {}, has_audio=False)
+
+        assert "split[base][halo]" in graph.filter_complex
+        assert "blend=all_mode=screen" in graph.filter_complex
+        assert graph.filter_complex.index("hue=s=0") < graph.filter_complex.index("split")
+
+    def test_time_offset_keeps_overlays_on_global_timeline(self):
+        """Test that segment renders shift timed overlays by the segment start"""
+        compiler = FilterGraphCompiler()
+        strategy = {"speed_range": [1.0, 1.0]}
+
+        whole = compiler.compile(["f7"], strategy, duration=300.0, seed=7, has_audio=False)
+        segment = compiler.compile(["f7"], strategy, duration=300.0, seed=7, has_audio=False, time_offset=60.0)
+
+        assert "between(t," in whole.filter_complex
+        assert "between((t+60.000)," in segment.filter_complex
+
+    def test_pattern_interrupts_require_font(self):
+        """Test that drawtext is only emitted when a font is available"""
+        without_font = FilterGraphCompiler().compile(["f4"], {}, has_audio=False)
+        with_font = FilterGraphCompiler(font_path="/fonts/Bold.ttf").compile(["f4"], {}, has_audio=False)
+
+        assert "drawtext" not in without_font.filter_complex
+        assert "drawtext=fontfile='/fonts/Bold.ttf'" in with_font.filter_complex
+
+
+class TestMediaProbeService:
+    """Test the cached ffprobe metadata service"""
+
+    FFPROBE_OUTPUT = json.dumps({
+        "format": {"duration": "12.5", "bit_rate": "800000", "format_name": "mov,mp4"},
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264", "width": 1080, "height": 1920,
+             "avg_frame_rate": "30000/1001", "nb_frames": "375"},
+            {"codec_type": "audio", "codec_name": "aac", "sample_rate": "44100"}
+        ]
+    })
+
+    def test_parse_rate(self):
+        """Test ffprobe rational parsing"""
+        assert _parse_rate("30/1") == 30.0
+        assert round(_parse_rate("30000/1001"), 2) == 29.97
+        assert _parse_rate("0/0") == 0.0
+        assert _parse_rate(None) == 0.0
+
+    def test_probe_parses_and_caches(self, sample_video_path):
+        """Test that one ffprobe call serves repeated lookups of an unchanged file"""
+        service = MediaProbeService()
+        completed = MagicMock(returncode=0, stdout=self.FFPROBE_OUTPUT, stderr="")
+
+        with patch("services.video_engine.probe.subprocess.run", return_value=completed) as mock_run:
+            first = service.probe(sample_video_path)
+            second = service.probe(sample_video_path)
+
+        assert mock_run.call_count == 1
+        assert first is second
+        assert first.size == (1080, 1920)
+        assert first.frame_count == 375
+        assert first.has_audio is True
+        assert first.audio_codec == "aac"
+
+    def test_missing_file_returns_none(self, tmp_path):
+        """Test that unreadable paths are not probed"""
+        service = MediaProbeService()
+        with patch("services.video_engine.probe.subprocess.run") as mock_run:
+            assert service.probe(str(tmp_path / "missing.mp4")) is None
+        mock_run.assert_not_called()
+
+
+
+class TestFrameSampler:
+    """Test the sequential frame sampler"""
+
+    def test_index_helpers(self):
+        """Test evenly spaced and every-n index generation"""
+        assert FrameSampler.evenly_spaced(100, 5) == [0, 20, 40, 60, 80]
+        assert FrameSampler.evenly_spaced(0, 5) == []
+        assert FrameSampler.every_n(95, 30) == [0, 30, 60, 90]
+
+    def test_decodes_sequentially_without_seeking(self):
+        """Test that unrequested frames are grabbed, not retrieved, and nothing seeks"""
+        pytest.importorskip("cv2")
+        meta = MediaMetadata(path="clip.mp4", width=64, height=64, fps=10.0, frame_count=50, has_video=True)
+        cap = MagicMock()
+        cap.grab.return_value = True
+        cap.retrieve.return_value = (True, MagicMock(shape=(64, 64, 3)))
+
+        with patch("services.video_engine.frame_sampler.probe_service.probe", return_value=meta), \
+             patch("services.video_engine.frame_sampler.cv2.VideoCapture", return_value=cap):
+            results = FrameSampler().sample_many("clip.mp4", {"ocr": [0, 20], "vlm": [20, 30]})
+
+        assert [f.index for f in results["ocr"]] == [0, 20]
+        assert [f.index for f in results["vlm"]] == [20, 30]
+        assert cap.grab.call_count == 31
+        assert cap.retrieve.call_count == 3
+        cap.set.assert_not_called()
+
+    def test_sparse_indices_seek_instead_of_decoding_the_gap(self):
+        """Test that keyframes far apart are reached by seeking, not by grabbing every frame"""
+        cv2 = pytest.importorskip("cv2")
+        meta = MediaMetadata(path="long.mp4", width=64, height=64, fps=10.0, frame_count=10000, has_video=True)
+        cap = MagicMock()
+        cap.grab.return_value = True
+        cap.retrieve.return_value = (True, MagicMock(shape=(64, 64, 3)))
+
+        with patch("services.video_engine.frame_sampler.probe_service.probe", return_value=meta), \
+             patch("services.video_engine.frame_sampler.cv2.VideoCapture", return_value=cap):
+            frames = list(FrameSampler(seek_gap_seconds=10).iter_frames("long.mp4", frame_indices=[0, 50, 2000, 4000]))
+
+        assert [f.index for f in frames] == [0, 50, 2000, 4000]
+        assert [c.args for c in cap.set.call_args_list] == [(cv2.CAP_PROP_POS_FRAMES, 2000), (cv2.CAP_PROP_POS_FRAMES, 4000)]
+        assert cap.grab.call_count == 51 + 1 + 1
+
+
+class TestOCRZoneDensity:
+    """Test the fast detection-only caption placement path"""
+
+    @pytest.fixture
+    def service(self):
+        ocr_module = pytest.importorskip("services.video_engine.ocr_service")
+        service = ocr_module.OCRService.__new__(ocr_module.OCRService)
+        service.reader = MagicMock()
+        service.detect_height = 480
+        service.batch_size = 2
+        service.max_cached_zones = 2
+        service._zone_cache = OrderedDict()
+        service._zone_lock = threading.Lock()
+        return service
+
+    def test_batches_detection_and_caches_by_fingerprint(self, service, tmp_path):
+        """Test that frames are batched, boxes binned by height, and repeat calls hit the cache"""
+        import numpy as np
+        from services.video_engine.frame_sampler import SampledFrame
+
+        video = tmp_path / "clip.mp4"
+        video.write_bytes(b"\x00" * 1024)
+        meta = MediaMetadata(path=str(video), width=270, height=480, fps=30.0, frame_count=90, has_video=True)
+        frames = [SampledFrame(i, i / 30, np.zeros((480, 270, 3), dtype=np.uint8), 1.0) for i in (0, 30, 60)]
+
+        # One caption box near the bottom of every frame: [x_min, x_max, y_min, y_max]
+        service.reader.detect.side_effect = lambda batch, reformat=False: (
+            [[[10, 200, 430, 470]] for _ in batch], [[] for _ in batch]
+        )
+
+        with patch("services.video_engine.ocr_service.probe_service.probe", return_value=meta), \
+             patch("services.video_engine.ocr_service.frame_sampler.iter_frames", return_value=iter(frames)) as mock_iter, \
+             patch.object(service, "_store_zones", wraps=service._store_zones), \
+             patch("api.utils.redis_client.RedisPools.client", side_effect=Exception("no redis")):
+            first = service.detect_zone_density(str(video))
+            second = service.detect_zone_density(str(video))
+
+        assert first == [0, 0, 0, 0, 3]
+        assert second == first
+        assert service.reader.detect.call_count == 2  # batches of 2 + 1
+        assert mock_iter.call_count == 1
+        assert mock_iter.call_args.kwargs["max_height"] == 480
+        service.reader.readtext.assert_not_called()
+
+    def test_zone_cache_evicts_least_recently_used(self, service):
+        """Test that the in-process zone cache stays within its size cap"""
+        with patch("api.utils.redis_client.RedisPools.client", side_effect=Exception("no redis")):
+            service._store_zones("a", [1, 0, 0, 0, 0])
+            service._store_zones("b", [0, 1, 0, 0, 0])
+            assert service._cached_zones("a") == [1, 0, 0, 0, 0]
+            service._store_zones("c", [0, 0, 1, 0, 0])
+
+            assert list(service._zone_cache) == ["a", "c"]
+            assert service._cached_zones("b") is None
+
+    def test_crowded_bottom_moves_captions_to_top(self, service):
+        """Test that the placement rules read the zone map"""
+        with patch.object(service, "detect_zone_density", return_value=[0, 0, 1, 2, 5]):
+            assert service.get_caption_strategy("clip.mp4") == "top"
+
+
+class TestVideoDownloaderCache:
+    """Test the content-addressed download cache"""
+
+    def test_canonical_id(self):
+        """Test that URL variants of one video share a cache key"""
+        from services.video_engine.downloader import VideoDownloader
+
+        assert VideoDownloader.canonical_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=5") == "youtube_dQw4w9WgXcQ"
+        assert VideoDownloader.canonical_id("https://youtu.be/dQw4w9WgXcQ") == "youtube_dQw4w9WgXcQ"
+        assert VideoDownloader.canonical_id("https://youtube.com/shorts/dQw4w9WgXcQ") == "youtube_dQw4w9WgXcQ"
+        assert VideoDownloader.canonical_id("https://www.tiktok.com/@user/video/7301234567890") == "tiktok_7301234567890"
+        assert VideoDownloader.canonical_id("https://x.com/v", {"id": "42", "extractor_key": "Twitter"}) == "twitter_42"
+
+    @pytest.mark.asyncio
+    async def test_single_extraction_and_cache_hit(self, tmp_path):
+        """Test that verify + download share one extraction and repeats skip yt-dlp"""
+        pytest.importorskip("yt_dlp")
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+        ydl = MagicMock()
+        ydl.__enter__.return_value = ydl
+        ydl.extract_info.return_value = {"id": "dQw4w9WgXcQ", "formats": [{"format_id": "18"}]}
+
+        def fake_download(info, download=True):
+            path = tmp_path / "cache" / "youtube_dQw4w9WgXcQ.mp4"
+            path.write_bytes(b"video")
+            return {"requested_downloads": [{"filepath": str(path)}]}
+        ydl.process_ie_result.side_effect = fake_download
+
+        with patch("services.video_engine.downloader.yt_dlp.YoutubeDL", return_value=ydl):
+            assert await downloader.verify_video_asset(url) is True
+            first = await downloader.download_video(url)
+            second = await downloader.download_video("https://youtu.be/dQw4w9WgXcQ")
+
+        assert ydl.extract_info.call_count == 1
+        assert ydl.process_ie_result.call_count == 1
+        assert first != second
+        with open(first, "rb") as a, open(second, "rb") as b:
+            assert a.read() == b.read() == b"video"
+
+        # Per-job cleanup must leave the cached source intact
+        os.remove(first)
+        assert downloader._find_cached("youtube_dQw4w9WgXcQ") is not None
+
+    def test_lru_eviction_respects_budget(self, tmp_path):
+        """Test that the oldest cached sources are evicted first"""
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        downloader.cache_max_bytes = 10
+        for i, name in enumerate(["old.mp4", "mid.mp4", "new.mp4"]):
+            path = tmp_path / "cache" / name
+            path.write_bytes(b"x" * 5)
+            os.utime(path, (1000 + i, 1000 + i))
+
+        downloader._evict(keep=str(tmp_path / "cache" / "new.mp4"))
+
+        assert sorted(os.listdir(tmp_path / "cache")) == ["mid.mp4", "new.mp4"]
+
+    def test_eviction_removes_lock_files_and_skips_held_entries(self, tmp_path):
+        """Test that evicted entries and failed fetches leave no lock files, and locked entries survive"""
+        import fcntl
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        downloader.cache_max_bytes = 5
+        cache = tmp_path / "cache"
+        for i, name in enumerate(["busy", "old", "new"]):
+            path = cache / f"{name}.mp4"
+            path.write_bytes(b"x" * 5)
+            os.utime(path, (1000 + i, 1000 + i))
+            (cache / f"{name}.lock").touch()
+        (cache / "failed.lock").touch()
+
+        with open(cache / "busy.lock", "a") as held:
+            fcntl.flock(held, fcntl.LOCK_EX)
+            downloader._evict(keep=str(cache / "new.mp4"))
+
+        assert sorted(os.listdir(cache)) == ["busy.lock", "busy.mp4", "new.lock", "new.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_failed_download_drops_its_lock_file(self, tmp_path):
+        """Test that a fetch that caches nothing doesn't leave its lock behind"""
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        with patch.object(downloader, "_extract_info", return_value={"id": "dQw4w9WgXcQ"}), \
+             patch.object(downloader, "_download_to_cache", return_value=None):
+            assert await downloader.download_video("https://youtu.be/dQw4w9WgXcQ") is None
+
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_info_cache_is_bounded(self, tmp_path):
+        """Test that extractions expire and the cache keeps only the most recent entries"""
+        from services.video_engine import downloader as module
+
+        downloader = module.VideoDownloader(download_dir=str(tmp_path))
+        with patch.object(module, "INFO_CACHE_MAX", 2), patch.object(module.time, "time", return_value=1000.0):
+            downloader._remember_info("a", {})
+            downloader._remember_info("b", {})
+            downloader._remember_info("c", {})
+        assert list(downloader._info_cache) == ["b", "c"]
+
+        with patch.object(module.time, "time", return_value=1000.0 + module.INFO_TTL):
+            downloader._remember_info("d", {})
+        assert list(downloader._info_cache) == ["d"]
+
+    def test_merge_ranges_pads_and_joins(self):
+        """Test that hook windows are sorted, padded and merged"""
+        from services.video_engine.downloader import VideoDownloader
+
+        merged = VideoDownloader.merge_ranges([[30, 40], [2, 7], [6, 12], [50, 50]], duration=40.2)
+        assert merged == [(2.0, 12.5), (30.0, 40.2)]
+
+    def test_hook_ranges_from_heatmap(self, tmp_path):
+        """Test that long sources pick non-overlapping windows around replay peaks"""
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        heatmap = [
+            {"start_time": 100.0, "end_time": 110.0, "value": 0.9},
+            {"start_time": 110.0, "end_time": 120.0, "value": 0.8},  # overlaps the top peak
+            {"start_time": 900.0, "end_time": 910.0, "value": 0.7},
+            {"start_time": 400.0, "end_time": 410.0, "value": 0.6},
+            {"start_time": 10.0, "end_time": 20.0, "value": 0.1},
+        ]
+        long_info = {"id": "abc", "duration": 1200, "heatmap": heatmap}
+        short_info = {"id": "abc", "duration": 60, "heatmap": heatmap}
+
+        with patch.object(downloader, "_extract_info", return_value=long_info):
+            assert downloader.hook_ranges("https://youtu.be/abcdefghijk") == [[90.0, 120.0], [390.0, 420.0], [890.0, 920.0]]
+        with patch.object(downloader, "_extract_info", return_value=short_info):
+            assert downloader.hook_ranges("https://youtu.be/abcdefghijk") == []
+
+    @pytest.mark.asyncio
+    async def test_ranged_download_uses_its_own_cache_entry(self, tmp_path):
+        """Test that section downloads never satisfy (or shadow) full-source requests"""
+        from services.video_engine.downloader import VideoDownloader
+
+        downloader = VideoDownloader(download_dir=str(tmp_path))
+        info = {"id": "dQw4w9WgXcQ"}
+        seen_keys = []
+
+        def fake_sections(url, info, key, windows):
+            seen_keys.append((key, windows))
+            path = tmp_path / "cache" / f"{key}.mp4"
+            path.write_bytes(b"sections")
+            return str(path)
+
+        with patch.object(downloader, "_extract_info", return_value=info), \
+             patch.object(downloader, "_download_sections_to_cache", side_effect=fake_sections), \
+             patch.object(downloader, "_download_to_cache") as mock_full:
+            path = await downloader.download_video("https://youtu.be/dQw4w9WgXcQ", ranges=[[10, 20]])
+
+        mock_full.assert_not_called()
+        assert seen_keys[0][0].startswith("youtube_dQw4w9WgXcQ_s")
+        assert seen_keys[0][1] == [(10.0, 20.5)]
+        assert downloader._find_cached("youtube_dQw4w9WgXcQ") is None
+        with open(path, "rb") as f:
+            assert f.read() == b"sections"
+
+
+class TestJobProgressReporter:
+    """Test coalesced job progress reporting"""
+
+    @pytest.fixture
+    def redis_mock(self):
+        r = MagicMock()
+        r.hgetall.return_value = {}
+        r.pipeline.return_value.execute.return_value = [[]]
+        with patch("services.video_engine.progress.get_redis", return_value=r):
+            yield r
+
+    def test_throttles_deltas_and_flushes_only_at_terminal(self, redis_mock):
+        """Test that same-stage updates are coalesced and the row is written once"""
+        from services.video_engine.progress import JobProgressReporter
+
+        notify = MagicMock()
+        reporter = JobProgressReporter("job-1", "test", notify=notify, publish_interval=60, db_flush_interval=600)
+        with patch.object(reporter, "flush") as flush:
+            reporter.update(status="Rendering", progress=50)
+            reporter.update(progress=55)
+            reporter.update(progress=60)
+            reporter.update(status="Completed", progress=100, output_path="out.mp4")
+
+        assert [c.args[0] for c in notify.call_args_list] == [
+            {"id": "job-1", "status": "Rendering", "progress": 50},
+            {"id": "job-1", "status": "Completed", "progress": 100, "output_path": "out.mp4"},
+        ]
+        flush.assert_called_once()
+        # Every update still lands in the live hash
+        assert redis_mock.pipeline.return_value.hset.call_count >= 4
+
+    def test_falls_back_to_db_without_redis(self):
+        """Test that progress still reaches the row when Redis is down"""
+        from services.video_engine.progress import JobProgressReporter
+
+        reporter = JobProgressReporter("job-2", "test", publish_interval=60, db_flush_interval=600)
+        with patch("services.video_engine.progress.get_redis", side_effect=Exception("no redis")), \
+             patch.object(reporter, "flush") as flush:
+            reporter.update(status="Rendering", progress=50)
+            reporter.update(progress=60)
+
+        assert flush.call_count == 2
+
+    def test_eta_from_stage_history(self):
+        """Test time_remaining as current-stage median plus later stage medians"""
+        from services.video_engine.progress import JobProgressReporter, format_eta
+
+        r = MagicMock()
+        r.hgetall.return_value = {b"Downloading": b"10", b"Rendering": b"50", b"Validating": b"5"}
+        r.pipeline.return_value.execute.return_value = [[b"4", b"6"], [b"20"]]
+        reporter = JobProgressReporter("job-3", "test")
+        reporter.state = {"status": "Downloading", "progress": 10}
+
+        assert reporter.estimate_remaining(r) == pytest.approx(25, abs=0.5)
+        assert format_eta(85) == "1m 25s"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init, task_prerun, task_postrun
 import os
 
 from api.config import settings
@@ -10,7 +11,7 @@ celery_app = Celery(
     "ettametta",
     broker=CELERY_BROKER_URL,
     backend=CELERY_RESULT_BACKEND,
-    include=["services.video_engine.tasks", "services.discovery.tasks", "services.optimization.scheduler_tasks", "services.security.tasks", "services.storage.tasks"]
+    include=["services.video_engine.tasks", "services.discovery.tasks", "services.optimization.scheduler_tasks", "services.security.tasks", "services.storage.tasks", "services.monitoring.tasks", "services.analytics.tasks"]
 )
 
 celery_app.conf.update(
@@ -20,9 +21,9 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     beat_schedule={
-        "sentinel-trend-watcher-4h": {
+        "sentinel-trend-watcher": {
             "task": "discovery.sentinel_watcher",
-            "schedule": 14400.0, # Every 4 hours
+            "schedule": settings.SENTINEL_TICK_INTERVAL, # Scans only the niches that are due
         },
         "check-scheduled-posts-5m": {
             "task": "optimization.check_and_post_scheduled",
@@ -36,5 +37,34 @@ celery_app.conf.update(
             "task": "storage.manage_lifecycle",
             "schedule": 86400.0, # Every 24 hours
         },
+        "candidate-stats-refresh": {
+            "task": "analytics.refresh_candidate_stats",
+            "schedule": settings.STATS_REFRESH_INTERVAL, # Batched stats lookups instead of rescans
+        },
+        "telemetry-sampler": {
+            "task": "monitoring.sample_telemetry",
+            "schedule": settings.TELEMETRY_SAMPLE_INTERVAL,
+        },
     }
 )
+
+
+@worker_process_init.connect
+def warm_worker_models(**kwargs):
+    """Loads heavyweight models once per worker process instead of on first task."""
+    if settings.WHISPER_PRELOAD:
+        from api.utils.whisper_engine import whisper_engine
+        whisper_engine.warm()
+
+
+@task_prerun.connect
+def open_settings_scope(**kwargs):
+    """Each task resolves the system settings snapshot at most once."""
+    from api.utils.settings_snapshot import enter_settings_scope
+    enter_settings_scope()
+
+
+@task_postrun.connect
+def close_settings_scope(**kwargs):
+    from api.utils.settings_snapshot import exit_settings_scope
+    exit_settings_scope()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Boolean, ForeignKey, Index, UniqueConstraint
 from .database import Base
 from datetime import datetime
 # Import UserDB to ensure 'users' table is registered in metadata for foreign keys
@@ -53,6 +53,27 @@ class ContentCandidateDB(Base):
     metadata_json = Column(JSON, default={})
     niche = Column(String, index=True, nullable=True)
 
+    __table_args__ = (
+        # Discovery DB fallback: top candidates per niche by views
+        Index("ix_content_candidates_niche_views", niche, views.desc()),
+    )
+
+class CandidateStatsSampleDB(Base):
+    """One stats refresh of a stored candidate; the series gives its view velocity over time."""
+    __tablename__ = "candidate_stats_history"
+
+    id = Column(Integer, primary_key=True, index=True)
+    candidate_id = Column(String, ForeignKey("content_candidates.id", ondelete="CASCADE"), nullable=False)
+    sampled_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    views = Column(Integer, default=0)
+    engagement_score = Column(Float, default=0.0)
+    viral_score = Column(Integer, default=0)
+    velocity = Column(Float, nullable=True) # Views/hour since the previous sample (since publish for the first)
+
+    __table_args__ = (
+        Index("ix_candidate_stats_history_candidate_sampled", candidate_id, sampled_at),
+    )
+
 class ViralPatternDB(Base):
     __tablename__ = "viral_patterns"
 
@@ -110,6 +131,10 @@ class PublishedContentDB(Base):
     comments = Column(Integer, default=0)
     retention_rate = Column(Float, default=0.0)
 
+    __table_args__ = (
+        Index("ix_published_content_user_published_at", user_id, published_at.desc()),
+    )
+
 class VideoJobDB(Base):
     __tablename__ = "video_jobs"
 
@@ -124,6 +149,10 @@ class VideoJobDB(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_video_jobs_user_created_at", user_id, created_at.desc()),
+    )
+
 class MonitoredNiche(Base):
     __tablename__ = "monitored_niches"
 
@@ -132,6 +161,26 @@ class MonitoredNiche(Base):
     is_active = Column(Boolean, default=True)
     last_scanned_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Learned by the sentinel (services/discovery/sweep.py); NULL until the first scan
+    next_scan_at = Column(DateTime, nullable=True, index=True)
+    scan_interval_minutes = Column(Float, nullable=True)
+    yield_ewma = Column(Float, nullable=True)  # Smoothed new candidates (+ score movement) per scan
+    avg_viral_score = Column(Float, nullable=True)
+    last_dispatched_at = Column(DateTime, nullable=True)  # Sweep claim; counts in-flight scans against the budget
+
+class ScanCursorDB(Base):
+    """Newest publish time a scanner has returned for a niche (incremental discovery)."""
+    __tablename__ = "scan_cursors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scanner = Column(String, nullable=False)
+    niche = Column(String, nullable=False)
+    high_water_mark = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("scanner", "niche", name="uq_scan_cursors_scanner_niche"),
+    )
 
 class AffiliateLinkDB(Base):
     __tablename__ = "affiliate_links"
@@ -1,29 +1,19 @@
 import os
 import httpx
-from faster_whisper import WhisperModel
 import asyncio
+from api.utils.whisper_engine import whisper_engine
 
 class AIWorker:
     def __init__(self):
         # Groq API Configuration
         self.groq_url = "https://api.groq.com/openai/v1/chat/completions"
         self.groq_api_key = os.getenv("GROQ_API_KEY")
-        # Local Whisper Configuration
-        self.whisper_model_size = "base"
-        self.whisper_model = None 
+        # Local Whisper Configuration (warm pool shared by the whole process)
+        self.whisper = whisper_engine
 
     async def transcribe(self, audio_path: str):
-        """Transcribes audio using fast-whisper locally."""
-        if not self.whisper_model:
-            print(f"[OS-Worker] Loading Whisper ({self.whisper_model_size})...")
-            self.whisper_model = WhisperModel(self.whisper_model_size, device="cpu", compute_type="int8")
-            
-        segments, info = self.whisper_model.transcribe(audio_path, beam_size=5)
-        
-        words = []
-        for segment in segments:
-            words.append({"text": segment.text, "start": segment.start, "end": segment.end})
-        return words
+        """Transcribes audio using fast-whisper locally, off the event loop."""
+        return await self.whisper.transcribe(audio_path)
 
     async def analyze_viral_pattern(self, prompt: str):
         """Analyze content using Groq's high-speed Llama-3."""
@@ -0,0 +1,88 @@
+"""
+Keyset Pagination
+=================
+Cursor-based paging for newest-first listings. Rows are ordered by
+(sort column DESC, id DESC) and the cursor is the last row's (timestamp, id)
+pair, so each page is an index range scan instead of OFFSET + full sort.
+Legacy rows with a NULL sort value are paged as if stamped NULL_SORT_VALUE,
+i.e. after every dated row.
+
+Cursor format: urlsafe base64 of the JSON array ``[iso_timestamp, id]``.
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Stand-in for NULL timestamps (created_at/published_at are nullable on older rows)
+NULL_SORT_VALUE = datetime(1970, 1, 1)
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    payload = json.dumps([sort_value.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def keyset_page(
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Returns one page of `query` (newest first) and the cursor for the next page,
+    or None when this is the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sort_key = func.coalesce(sort_column, NULL_SORT_VALUE)
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_key < sort_value,
+            and_(sort_key == sort_value, id_column < row_id)
+        ))
+
+    rows = query.order_by(sort_key.desc(), id_column.desc()).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    sort_value = getattr(last, sort_column.key) or NULL_SORT_VALUE
+    return rows, encode_cursor(sort_value, getattr(last, id_column.key))
+
+
+def paginate(
+    response: Response,
+    query: Query,
+    sort_column,
+    id_column,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> List[Any]:
+    """
+    keyset_page for list endpoints: the body stays a plain JSON array and the
+    next cursor is exposed through the X-Next-Cursor response header.
+    """
+    rows, next_cursor = keyset_page(query, sort_column, id_column, cursor, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
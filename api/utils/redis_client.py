@@ -0,0 +1,130 @@
+"""
+Shared Redis Clients
+====================
+One module owns every Redis connection pool in the process. Callers used to
+build a client from the URL inside hot paths (a TCP connect per progress update
+or cache read); they now borrow pooled connections:
+
+    from api.utils.redis_client import get_redis, get_async_redis
+    get_redis().publish("job_updates", message)
+    await get_async_redis().get(key)
+
+Sync pools are shared process-wide (redis-py resets them after a fork, so Celery
+prefork children get their own). Async pools are bound to the event loop that
+created them, like the discovery HTTP clients.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as redis_async
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_redis_url(url: Optional[str] = None) -> str:
+    """
+    Applies the docker hostname rewrite: inside a container 'localhost' is the
+    container itself, so the compose service name 'redis' is used instead.
+    REDIS_REWRITE_LOCALHOST forces it on/off; unset means "only inside docker".
+    """
+    url = url or settings.REDIS_URL
+    rewrite = settings.REDIS_REWRITE_LOCALHOST
+    if rewrite is None:
+        rewrite = os.path.exists("/.dockerenv")
+    if rewrite and "//localhost" in url:
+        url = url.replace("//localhost", "//redis")
+    return url
+
+
+class RedisPools:
+    def __init__(self):
+        self._sync: Dict[Tuple[str, bool, bool], redis.ConnectionPool] = {}
+        self._async: Dict[Tuple[int, str, bool, bool], redis_async.ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _pool_kwargs(decode_responses: bool, subscriber: bool) -> dict:
+        return {
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            # Subscribers sit in a blocking read for as long as the channel is quiet
+            "socket_timeout": None if subscriber else settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "health_check_interval": 30,
+            "decode_responses": decode_responses,
+        }
+
+    def client(self, decode_responses: bool = False, subscriber: bool = False, url: Optional[str] = None) -> redis.Redis:
+        """
+        Sync client backed by the shared pool for (url, decode_responses). Pass
+        subscriber=True for long-lived pub/sub listeners (no read timeout).
+        """
+        key = (resolve_redis_url(url), decode_responses, subscriber)
+        pool = self._sync.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._sync.get(key)
+                if pool is None:
+                    pool = redis.ConnectionPool.from_url(key[0], **self._pool_kwargs(decode_responses, subscriber))
+                    self._sync[key] = pool
+        return redis.Redis(connection_pool=pool)
+
+    def async_client(self, decode_responses: bool = False, subscriber: bool = False, url: Optional[str] = None) -> redis_async.Redis:
+        """Async client backed by a pool owned by the running event loop."""
+        resolved = resolve_redis_url(url)
+        key = (id(asyncio.get_running_loop()), resolved, decode_responses, subscriber)
+        pool = self._async.get(key)
+        if pool is None:
+            pool = redis_async.ConnectionPool.from_url(resolved, **self._pool_kwargs(decode_responses, subscriber))
+            self._async[key] = pool
+        return redis_async.Redis(connection_pool=pool)
+
+    def stats(self) -> dict:
+        """Connection counts per pool, for /health and debugging."""
+        def describe(pool):
+            in_use = len(getattr(pool, "_in_use_connections", ()))
+            available = len(getattr(pool, "_available_connections", ()))
+            return {
+                "created": getattr(pool, "_created_connections", in_use + available),
+                "in_use": in_use,
+                "idle": available,
+                "max": pool.max_connections,
+            }
+
+        return {
+            "sync_pools": len(self._sync),
+            "async_pools": len(self._async),
+            "connections": {
+                f"{'decoded' if decode else 'raw'}{':subscriber' if subscriber else ''}": describe(pool)
+                for (_, decode, subscriber), pool in self._sync.items()
+            },
+        }
+
+    def ping(self) -> bool:
+        try:
+            return bool(self.client().ping())
+        except Exception:
+            return False
+
+    async def aclose(self):
+        """Disconnects the async pools owned by the current loop (call on shutdown)."""
+        loop_id = id(asyncio.get_running_loop())
+        for key in [k for k in self._async if k[0] == loop_id]:
+            await self._async.pop(key).disconnect()
+
+
+redis_pools = RedisPools()
+
+
+def get_redis(decode_responses: bool = False, subscriber: bool = False) -> redis.Redis:
+    return redis_pools.client(decode_responses, subscriber)
+
+
+def get_async_redis(decode_responses: bool = False, subscriber: bool = False) -> redis_async.Redis:
+    return redis_pools.async_client(decode_responses, subscriber)
@@ -0,0 +1,141 @@
+"""
+System Settings Snapshot
+========================
+Immutable, versioned view of the system_settings table.
+
+The whole table is read with one SELECT and kept per process. A Redis counter
+(`settings:version`) is bumped whenever settings are written; a process reloads
+only when that counter moved (or, with Redis unreachable, when its copy is older
+than SETTINGS_SNAPSHOT_TTL).
+
+Within an HTTP request or Celery task the snapshot is resolved at most once:
+`settings_scope()` pins the first snapshot used inside it, so every service in the
+same request/task sees the same values without further round trips.
+"""
+
+import time
+import logging
+import threading
+import contextlib
+from contextvars import ContextVar
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from api.config import settings
+from api.utils.database import SessionLocal
+from api.utils.redis_client import get_redis
+from api.utils.models import SystemSettings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "settings:version"
+
+
+class SettingsSnapshot:
+    """Read-only key -> value mapping of system settings at a given version."""
+
+    __slots__ = ("values", "version", "loaded_at")
+
+    def __init__(self, values: Dict[str, str], version: Optional[int]):
+        self.values: Mapping[str, str] = MappingProxyType(dict(values))
+        self.version = version
+        self.loaded_at = time.monotonic()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.values.get(key)
+        return value if value else default
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        value = self.get(key)
+        return value.lower() == "true" if value is not None else default
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+
+class SettingsStore:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._lock = threading.Lock()
+
+    def _remote_version(self) -> Optional[int]:
+        try:
+            return int(get_redis().get(VERSION_KEY) or 0)
+        except Exception:
+            return None
+
+    def _load(self, version: Optional[int]) -> SettingsSnapshot:
+        db = SessionLocal()
+        try:
+            rows = db.query(SystemSettings.key, SystemSettings.value).all()
+            return SettingsSnapshot({row.key: row.value for row in rows}, version)
+        finally:
+            db.close()
+
+    def current(self) -> SettingsSnapshot:
+        """The process-wide snapshot, reloaded if the Redis version moved."""
+        snapshot = self._snapshot
+        version = self._remote_version()
+        if snapshot is not None:
+            if version is not None and snapshot.version == version:
+                return snapshot
+            if version is None and time.monotonic() - snapshot.loaded_at < self.ttl:
+                return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and self._snapshot is not snapshot:
+                # Another thread reloaded while we waited
+                return self._snapshot
+            try:
+                self._snapshot = self._load(version)
+            except Exception as e:
+                logger.error(f"[Settings] Could not load system settings: {e}")
+                if snapshot is None:
+                    return SettingsSnapshot({}, None)
+            return self._snapshot
+
+    def bump_version(self):
+        """Call after writing system_settings rows so every process reloads."""
+        self._snapshot = None
+        try:
+            get_redis().incr(VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"[Settings] Could not bump settings version: {e}")
+
+
+settings_store = SettingsStore(settings.SETTINGS_SNAPSHOT_TTL)
+
+# Per request/task holder; {} means "in scope, nothing resolved yet"
+_scope: ContextVar[Optional[dict]] = ContextVar("settings_scope", default=None)
+
+
+@contextlib.contextmanager
+def settings_scope():
+    """Pins one snapshot for everything running inside the block (request or task)."""
+    token = _scope.set({})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def enter_settings_scope():
+    _scope.set({})
+
+
+def exit_settings_scope():
+    _scope.set(None)
+
+
+def current_settings() -> SettingsSnapshot:
+    """Snapshot for the current request/task (resolved once), or the process-wide one."""
+    holder = _scope.get()
+    if holder is None:
+        return settings_store.current()
+    if "snapshot" not in holder:
+        holder["snapshot"] = settings_store.current()
+    return holder["snapshot"]
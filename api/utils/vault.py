@@ -2,46 +2,206 @@ from sqlalchemy.orm import Session
 from api.utils.database import SessionLocal
 from api.utils.models import SystemSettings
 from api.config import settings
+from typing import Dict, Iterable, Optional, Tuple
+import threading
 import logging
+import json
+import time
 
 logger = logging.getLogger(__name__)
 
+INVALIDATION_CHANNEL = "vault:invalidate"
+
+
+class SecretCache:
+    """
+    Per-process cache of database-resolved secrets keyed by (key, user_id).
+
+    Stores the value the database layers (UserSetting, then SystemSettings) resolved
+    to, including "not set" (negative entries, shorter TTL) so missing keys don't hit
+    the database on every call. Writes through /settings publish on a Redis channel
+    and every process drops the affected entries immediately; the TTL bounds
+    staleness when Redis is unreachable.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[Tuple[str, Optional[int]], Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+
+    def get(self, key: str, user_id: Optional[int]) -> Tuple[bool, Optional[str]]:
+        entry = self._entries.get((key, user_id))
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    def put(self, key: str, user_id: Optional[int], value: Optional[str]):
+        ttl = self.ttl if value else self.negative_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(key, user_id)] = (time.monotonic() + ttl, value)
+
+    def drop(self, key: Optional[str] = None, user_id: Optional[int] = None):
+        """
+        Drops cached entries. A system-wide change (no user_id) also drops every user's
+        entry for the key, since those fall back to the system value.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            elif user_id is None:
+                for cache_key in [k for k in self._entries if k[0] == key]:
+                    del self._entries[cache_key]
+            else:
+                self._entries.pop((key, user_id), None)
+
+    def ensure_listener(self):
+        """Starts the Redis invalidation subscriber for this process (once)."""
+        if self._listener and self._listener.is_alive():
+            return
+        with self._lock:
+            if self._listener and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name="vault-invalidation", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        from api.utils.redis_client import get_redis
+        backoff = 1
+        while True:
+            subscribed = False
+            try:
+                pubsub = get_redis(subscriber=True).pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                subscribed, backoff = True, 1
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    keys = payload.get("keys")
+                    for key in keys if keys is not None else [None]:
+                        self.drop(key, payload.get("user_id"))
+            except Exception as e:
+                logger.debug(f"[Vault] Invalidation listener disconnected: {e}")
+                if subscribed:
+                    # Anything published while we were away is unknown; start from scratch
+                    self.drop()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+
+secret_cache = SecretCache(settings.VAULT_CACHE_TTL, settings.VAULT_NEGATIVE_CACHE_TTL)
+
+
+def invalidate_secrets(keys: Optional[Iterable[str]] = None, user_id: Optional[int] = None):
+    """
+    Call after writing UserSetting/SystemSettings rows (keys=None drops everything).
+    Drops the local entries and tells every other process (API workers, Celery) to do
+    the same in one pub/sub message.
+    """
+    keys = [k.lower() for k in keys] if keys is not None else None
+    for key in keys if keys is not None else [None]:
+        secret_cache.drop(key, user_id)
+    try:
+        from api.utils.redis_client import get_redis
+        get_redis().publish(
+            INVALIDATION_CHANNEL, json.dumps({"keys": keys, "user_id": user_id})
+        )
+    except Exception as e:
+        logger.warning(f"[Vault] Could not broadcast invalidation for {keys}: {e}")
+
+
+def invalidate_secret(key: str, user_id: Optional[int] = None):
+    invalidate_secrets([key], user_id)
+
+
+def _config_value(key: str):
+    # Convert key to uppercase for api.config match (e.g., groq_api_key -> GROQ_API_KEY)
+    config_key = key.upper()
+    if hasattr(settings, config_key):
+        return getattr(settings, config_key) or None
+    return None
+
+
+def _load_from_db(db: Session, keys: Iterable[str], user_id: Optional[int]) -> Dict[str, Optional[str]]:
+    """User override wins over the system value; keys set in neither map to None."""
+    keys = list(keys)
+    resolved: Dict[str, Optional[str]] = {k: None for k in keys}
+    for row in db.query(SystemSettings.key, SystemSettings.value).filter(SystemSettings.key.in_(keys)):
+        if row.value:
+            resolved[row.key] = row.value
+    if user_id:
+        from api.utils.models import UserSetting
+        for row in db.query(UserSetting.key, UserSetting.value).filter(
+            UserSetting.user_id == user_id,
+            UserSetting.key.in_(keys)
+        ):
+            if row.value:
+                resolved[row.key] = row.value
+    return resolved
+
+
+def get_secrets(keys: Iterable[str], user_id: int = None, defaults: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Resolves several secrets at once (same priority as get_secret). Cached keys are
+    served from memory; the rest are loaded with a single query per settings table.
+    Returned dict is keyed by the lower-cased key.
+    """
+    defaults = {k.lower(): v for k, v in (defaults or {}).items()}
+    keys = [k.lower() for k in keys]
+    secret_cache.ensure_listener()
+
+    db_values: Dict[str, Optional[str]] = {}
+    missing = []
+    for key in keys:
+        hit, value = secret_cache.get(key, user_id)
+        if hit:
+            db_values[key] = value
+        else:
+            missing.append(key)
+
+    if missing:
+        db = SessionLocal()
+        try:
+            loaded = _load_from_db(db, missing, user_id)
+            for key, value in loaded.items():
+                secret_cache.put(key, user_id, value)
+            db_values.update(loaded)
+        except Exception as e:
+            logger.error(f"Error resolving secrets {missing} for user {user_id}: {e}")
+        finally:
+            db.close()
+
+    return {
+        key: db_values.get(key) or _config_value(key) or defaults.get(key)
+        for key in keys
+    }
+
+
 def get_secret(key: str, default=None, user_id: int = None) -> str:
     """
-    Retrieves a secret. 
+    Retrieves a secret.
     Priority:
     1. User-specific override (UserSetting table)
     2. System-wide setting (SystemSettings table)
     3. environment-based settings (api.config)
+
+    Database lookups are cached per (key, user_id); see SecretCache.
     """
-    db = SessionLocal()
-    try:
-        # 1. Check User-specific override if user_id is provided
-        if user_id:
-            from api.utils.models import UserSetting
-            user_setting = db.query(UserSetting).filter(
-                UserSetting.user_id == user_id, 
-                UserSetting.key == key.lower()
-            ).first()
-            if user_setting and user_setting.value:
-                return user_setting.value
-
-        # 2. Check Database (System-wide)
-        db_setting = db.query(SystemSettings).filter(SystemSettings.key == key.lower()).first()
-        if db_setting and db_setting.value:
-            return db_setting.value
-            
-        # 3. Check api.config settings
-        # Convert key to uppercase for api.config match (e.g., groq_api_key -> GROQ_API_KEY)
-        config_key = key.upper()
-        if hasattr(settings, config_key):
-            val = getattr(settings, config_key)
-            if val:
-                return val
-                
-        return default
-    except Exception as e:
-        logger.error(f"Error resolving secret {key} for user {user_id}: {e}")
-        return default
-    finally:
-        db.close()
+    key = key.lower()
+    secret_cache.ensure_listener()
+
+    hit, value = secret_cache.get(key, user_id)
+    if not hit:
+        db = SessionLocal()
+        try:
+            value = _load_from_db(db, [key], user_id)[key]
+            secret_cache.put(key, user_id, value)
+        except Exception as e:
+            logger.error(f"Error resolving secret {key} for user {user_id}: {e}")
+            return default
+        finally:
+            db.close()
+
+    return value or _config_value(key) or default
@@ -0,0 +1,171 @@
+"""
+Whisper Transcription Engine
+
+Keeps warm faster-whisper models per worker process and serves them through a
+small thread pool (CTranslate2 releases the GIL, so threads run in parallel).
+Audio is decoded once to 16 kHz mono PCM, silence is skipped with VAD, and the
+word-level result is cached by a hash of that PCM so a source clip that comes
+back through the pipeline is never transcribed twice.
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from api.config import settings
+from api.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class WhisperEngine:
+    def __init__(self):
+        self.model_size = settings.WHISPER_MODEL_SIZE
+        self.pool_size = max(1, settings.WHISPER_POOL_SIZE)
+        self.batch_size = settings.WHISPER_BATCH_SIZE
+        self.beam_size = settings.WHISPER_BEAM_SIZE
+        self.cache_ttl = settings.WHISPER_CACHE_TTL
+        self.memory_cache_size = max(0, settings.WHISPER_MEMORY_CACHE_SIZE)
+
+        self._model = None
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="whisper")
+        self._memory_cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+
+    def warm(self):
+        """Loads the model (and batched pipeline) once per process."""
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            from faster_whisper import WhisperModel
+            logger.info(f"[WhisperEngine] Loading Whisper ({self.model_size}, pool={self.pool_size})...")
+            # num_workers lets `pool_size` threads transcribe concurrently on one set of weights
+            self._model = WhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type="int8",
+                num_workers=self.pool_size
+            )
+            if self.batch_size > 1:
+                try:
+                    from faster_whisper import BatchedInferencePipeline
+                    self._pipeline = BatchedInferencePipeline(model=self._model)
+                except ImportError:
+                    logger.warning("[WhisperEngine] faster-whisper has no batched pipeline, using sequential decoding")
+
+    @staticmethod
+    def extract_audio(media_path: str) -> np.ndarray:
+        """Decodes any media file to 16 kHz mono float32 PCM with one ffmpeg call."""
+        result = subprocess.run(
+            ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+             "-i", media_path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+             "-f", "s16le", "-acodec", "pcm_s16le", "-"],
+            capture_output=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Audio extraction failed: {result.stderr.decode(errors='ignore').strip()[-300:]}")
+        return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+    def _cache_key(self, audio: np.ndarray) -> str:
+        digest = hashlib.sha1(audio.tobytes()).hexdigest()
+        return f"whisper:words:{self.model_size}:{digest}"
+
+    def _remember(self, key: str, segments: List[dict]):
+        with self._memory_lock:
+            self._memory_cache[key] = segments
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+
+    def _cache_get(self, key: str) -> Optional[List[dict]]:
+        with self._memory_lock:
+            segments = self._memory_cache.get(key)
+            if segments is not None:
+                self._memory_cache.move_to_end(key)
+                return segments
+        try:
+            cached = get_redis().get(key)
+            if cached:
+                segments = json.loads(cached)
+                self._remember(key, segments)
+                return segments
+        except Exception as e:
+            logger.debug(f"[WhisperEngine] Cache lookup skipped: {e}")
+        return None
+
+    def _cache_set(self, key: str, segments: List[dict]):
+        self._remember(key, segments)
+        try:
+            get_redis().setex(key, self.cache_ttl, json.dumps(segments))
+        except Exception as e:
+            logger.debug(f"[WhisperEngine] Cache store skipped: {e}")
+
+    def _run_model(self, audio: np.ndarray) -> List[dict]:
+        self.warm()
+        if self._pipeline is not None:
+            segments, _ = self._pipeline.transcribe(
+                audio,
+                beam_size=self.beam_size,
+                batch_size=self.batch_size,
+                word_timestamps=True,
+                vad_filter=True
+            )
+        else:
+            segments, _ = self._model.transcribe(
+                audio,
+                beam_size=self.beam_size,
+                word_timestamps=True,
+                vad_filter=True,
+                vad_parameters={"min_silence_duration_ms": 500}
+            )
+
+        results = []
+        for segment in segments:
+            results.append({
+                "text": segment.text,
+                "start": segment.start,
+                "end": segment.end,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (segment.words or [])
+                ]
+            })
+        return results
+
+    def transcribe_sync(self, media_path: str) -> List[dict]:
+        """Blocking transcription. Returns segments with word-level timings."""
+        audio = self.extract_audio(media_path)
+        if audio.size == 0:
+            return []
+
+        key = self._cache_key(audio)
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info(f"[WhisperEngine] Cache HIT for {media_path}")
+            return cached
+
+        segments = self._run_model(audio)
+        self._cache_set(key, segments)
+        return segments
+
+    async def transcribe(self, media_path: str) -> List[dict]:
+        """Runs transcription on the engine's pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.transcribe_sync, media_path)
+
+
+whisper_engine = WhisperEngine()
@@ -21,9 +21,10 @@ import { cn } from "@/lib/utils";
 import { useEffect, useState } from "react";
 import { Skeleton } from "@/components/ui/Skeleton";
 import { ErrorNode } from "@/components/ui/ErrorNode";
-import { useWebSocket } from "@/hooks/useWebSocket";
+import { useTelemetry } from "@/hooks/useTelemetry";
 import dynamic from "next/dynamic";
-import { API_BASE, WS_BASE } from "@/lib/config";
+import { API_BASE } from "@/lib/config";
+import { fetchAllPages } from "@/lib/pagination";
 
 const GlobalPulseGlobe = dynamic(() => import("@/components/ui/GlobalPulseGlobe"), { ssr: false });
 
@@ -106,11 +107,11 @@ export default function AnalyticsPage() {
         const fetchPosts = async () => {
             try {
                 const token = localStorage.getItem("et_token");
-                const response = await fetch(`${API_BASE}/analytics/posts`, {
+                // The table sorts and filters client-side, so it needs every post
+                const data = await fetchAllPages(`${API_BASE}/analytics/posts`, {
                     headers: { Authorization: `Bearer ${token}` }
                 });
-                if (response.ok) {
-                    const data = await response.json();
+                if (data) {
                     setPosts(data);
                     if (data.length > 0 && !selectedPostId) {
                         setSelectedPostId(data[0].id.toString());
@@ -159,8 +160,10 @@ export default function AnalyticsPage() {
     // --- END DATA FETCHING ---
 
     // Real-time Telemetry Stream
-    const { data: telemetry } = useWebSocket<any>(`${WS_BASE}/ws/telemetry`);
-    const pulseIntensity = telemetry?.metrics?.signal_strength || 0;
+    const { metrics: live, byNode } = useTelemetry();
+    const renderNodes = byNode("renders");
+    // Globe pulses with render load (4 concurrent renders = full intensity)
+    const pulseIntensity = Math.min((live["renders.total"] || 0) / 4, 1);
 
     const columnHelper = createColumnHelper<SocialPost>();
     const columns = [
@@ -210,7 +213,7 @@ export default function AnalyticsPage() {
     const retentionChartData = (report?.retention_data || [100, 92, 85, 78, 70, 65, 58, 52, 48, 42, 38, 35]).map((v, i) => ({
         time: `${i * 5}s`,
         retention: v,
-        signal: Math.floor(v * (telemetry?.metrics?.signal_strength || 1))
+        signal: v
     }));
 
     const [activeChartPoint, setActiveChartPoint] = useState<any>(null);
@@ -234,7 +237,7 @@ export default function AnalyticsPage() {
     };
 
     const performanceData = [
-        { label: "Viral Velocity", score: telemetry?.metrics?.global_velocity * 10 || Math.min(Math.round((metrics.views / 200000) * 100), 100), status: metrics.views > 100000 ? "Peak" : "High" },
+        { label: "Viral Velocity", score: Math.min(Math.round((metrics.views / 200000) * 100), 100), status: metrics.views > 100000 ? "Peak" : "High" },
         { label: "Hook Retention", score: Math.round(metrics.retention_rate * 100), status: metrics.retention_rate > 0.7 ? "High" : "Medium" },
         { label: "Share Ratio", score: Math.min(Math.round((metrics.shares / metrics.views) * 1000), 100), status: "Growing" },
         { label: "Engagement Score", score: Math.min(Math.round((metrics.likes / metrics.views) * 100), 100), status: "Medium" },
@@ -350,9 +353,9 @@ export default function AnalyticsPage() {
                         ))
                     ) : (
                         <>
-                            <TelemetryTile title="Network Bitrate" value={`${telemetry?.metrics?.bitrate || "000.0"} Mb/s`} icon={<Zap className="h-6 w-6 text-primary" />} label="Signal Bandwidth" subtext={`${telemetry?.metrics?.latency || "00.0"} ms Latency`} />
-                            <TelemetryTile title="Propagation Velocity" value={`${telemetry?.metrics?.global_velocity || "0.0"}x`} icon={<TrendingUp className="h-6 w-6 text-primary" />} label="Viral Acceleration" subtext={`${telemetry?.metrics?.active_nodes || "0"} Active Nodes`} />
-                            <TelemetryTile title="Signal Strength" value={`${Math.round((telemetry?.metrics?.signal_strength || 0) * 100)}%`} icon={<BarChart3 className="h-6 w-6 text-primary" />} label="Connection Quality" subtext="Sync Locked" />
+                            <TelemetryTile title="Render Queue" value={`${live["queue.celery.depth"] ?? 0} Jobs`} icon={<Zap className="h-6 w-6 text-primary" />} label="Broker Backlog" subtext={`${live["renders.total"] ?? 0} Active Renders`} />
+                            <TelemetryTile title="Encode Throughput" value={`${live["render.encode_fps"] ?? "0.0"} fps`} icon={<TrendingUp className="h-6 w-6 text-primary" />} label="Last FFmpeg Pass" subtext={`${renderNodes.length} Render Nodes`} />
+                            <TelemetryTile title="Infra Latency" value={`${live["redis.latency_ms"] ?? "--"} ms`} icon={<BarChart3 className="h-6 w-6 text-primary" />} label="Redis Round Trip" subtext={`Postgres ${live["postgres.latency_ms"] ?? "--"} ms // Disk ${live["disk.used_pct"] ?? "--"}%`} />
                             <TelemetryTile title="Global Reach" value={metrics.views.toLocaleString()} icon={<Play className="h-6 w-6 text-primary" />} label="Network Ripple" subtext="+12.4% Velocity" />
                         </>
                     )}
@@ -596,16 +599,16 @@ export default function AnalyticsPage() {
                                             <p className="text-[10px] font-bold text-white uppercase tabular-nums">Channel: 48 / Node: VF-GLOBAL</p>
                                         </div>
                                         <div className="flex gap-1 h-6 items-end">
-                                            {telemetry?.active_segments?.map((seg: any, i: number) => (
+                                            {renderNodes.map((seg, i) => (
                                                 <div key={i} className="flex flex-col items-center gap-1">
                                                     <motion.div
-                                                        animate={{ height: `${seg.load}%` }}
+                                                        animate={{ height: `${Math.min(seg.value * 25, 100)}%` }}
                                                         transition={{ type: "spring", stiffness: 300 }}
                                                         className="w-3 bg-primary/20 rounded-t-sm relative overflow-hidden"
                                                     >
                                                         <div className="absolute inset-0 bg-primary opacity-20 animate-pulse" />
                                                     </motion.div>
-                                                    <span className="text-[6px] font-black text-zinc-700">{seg.label}</span>
+                                                    <span className="text-[6px] font-black text-zinc-700">{seg.node}</span>
                                                 </div>
                                             ))}
                                         </div>
@@ -316,38 +316,33 @@ export default function DiscoveryPage() {
         { lat: 6.5244, lng: 3.3792, intensity: 0.7, label: "LOS Gateway" }
     ]);
 
-    const { data: telemetryData } = useWebSocket(`${WS_BASE}/ws/telemetry`);
-
-    useEffect(() => {
-        if (telemetryData) {
-            try {
-                // telemetryData is already parsed by the hook
-                const data = telemetryData as any;
-                if (data.type === "telemetry_pulse" && data.geo_activity) {
-                    // Merge new points with existing ones, keeping the list size manageable
-                    setMapPoints(prev => {
-                        const newPoints = [...prev, ...data.geo_activity];
-                        return newPoints.slice(-15); // Keep last 15 active pulses
-                    });
-                }
+    // Job updates are partial deltas: handle every message, not just the last one React rendered
+    useWebSocket<any>(`${WS_BASE}/ws/telemetry`, (data) => {
+        try {
+            if (data.type === "telemetry_pulse" && data.geo_activity) {
+                // Merge new points with existing ones, keeping the list size manageable
+                setMapPoints(prev => {
+                    const newPoints = [...prev, ...data.geo_activity];
+                    return newPoints.slice(-15); // Keep last 15 active pulses
+                });
+            }
 
-                if (data.type === "job_update" && data.data && data.data.id === testJobId) {
-                    if (data.data.status === "Completed" && data.data.output_path) {
-                        setPreviewUrl(data.data.output_path);
-                        setShowPreview(true);
-                        setIsTestDriving(false);
-                        setTestJobId(null);
-                    } else if (data.data.status === "Failed") {
-                        alert("Test Drive Failed. Check logs for details.");
-                        setIsTestDriving(false);
-                        setTestJobId(null);
-                    }
+            if (data.type === "job_update" && data.data && data.data.id === testJobId) {
+                if (data.data.status === "Completed" && data.data.output_path) {
+                    setPreviewUrl(data.data.output_path);
+                    setShowPreview(true);
+                    setIsTestDriving(false);
+                    setTestJobId(null);
+                } else if (data.data.status === "Failed") {
+                    alert("Test Drive Failed. Check logs for details.");
+                    setIsTestDriving(false);
+                    setTestJobId(null);
                 }
-            } catch (e) {
-                console.error("Error processing telemetry for map:", e);
             }
+        } catch (e) {
+            console.error("Error processing telemetry for map:", e);
         }
-    }, [telemetryData]);
+    });
 
     return (
         <DashboardLayout>
@@ -64,7 +64,6 @@ export default function NexusPage() {
     const [userTier, setUserTier] = useState<string>("free");
     const [activeJobId, setActiveJobId] = useState<string | null>(null);
     const [selectedNodeIndex, setSelectedNodeIndex] = useState<number>(0);
-    const { data: jobUpdate } = useWebSocket<any>(`${WS_BASE}/ws/jobs`);
 
     // Fetch initial data
     useEffect(() => {
@@ -107,9 +106,9 @@ export default function NexusPage() {
         fetchData();
     }, []);
 
-    // Handle WebSocket updates
-    useEffect(() => {
-        if (jobUpdate && jobUpdate.type === "nexus_job_update") {
+    // Handle WebSocket updates: partial deltas, so merge every message rather than the batched `data` state
+    useWebSocket<any>(`${WS_BASE}/ws/jobs`, (jobUpdate) => {
+        if (jobUpdate.type === "nexus_job_update") {
             const updatedJob = jobUpdate.data;
             setNexusJobs(prev => {
                 const exists = prev.find(j => j.id === updatedJob.id);
@@ -119,7 +118,7 @@ export default function NexusPage() {
                 return [updatedJob, ...prev];
             });
         }
-    }, [jobUpdate]);
+    });
 
     // Button handlers
     const handleClusterSettings = () => {
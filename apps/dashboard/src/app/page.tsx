@@ -80,7 +80,7 @@ export default function Home() {
           setStats(data);
 
           // Fetch Egress history for activity feed
-          const historyRes = await fetch(`${API_BASE}/publish/history`, {
+          const historyRes = await fetch(`${API_BASE}/publish/history?limit=5`, {
             headers: { Authorization: `Bearer ${token}` }
           });
           if (historyRes.ok) {
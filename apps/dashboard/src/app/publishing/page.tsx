@@ -25,6 +25,8 @@ import {
 } from "lucide-react";
 import { cn } from "@/lib/utils";
 import { API_BASE } from "@/lib/config";
+import { fetchPage } from "@/lib/pagination";
+import { usePaginatedList } from "@/hooks/usePaginatedList";
 
 interface SocialAccount {
     id: number;
@@ -52,7 +54,8 @@ import { motion, AnimatePresence } from "framer-motion";
 
 export default function PublishingPage() {
     const [accounts, setAccounts] = useState<SocialAccount[]>([]);
-    const [history, setHistory] = useState<SocialPost[]>([]);
+    // Newest posts first; older ones are fetched on "Load more" through X-Next-Cursor
+    const { items: history, hasMore: hasMoreHistory, isLoadingMore: isLoadingMoreHistory, refresh: refreshHistory, loadMore: loadMoreHistory } = usePaginatedList<SocialPost>(`${API_BASE}/publish/history`);
     const [isLoading, setIsLoading] = useState(true);
 
     const [isPlatformModalOpen, setIsPlatformModalOpen] = useState(false);
@@ -95,14 +98,14 @@ export default function PublishingPage() {
             try {
                 const token = localStorage.getItem("et_token");
                 const headers = { "Authorization": `Bearer ${token}`, "Content-Type": "application/json" };
-                const [accountsRes, historyRes, jobsRes] = await Promise.all([
+                // Deploy picks from the newest jobs; one page is enough
+                const [accountsRes, , jobPage] = await Promise.all([
                     fetch(`${API_BASE}/publish/accounts`, { headers }),
-                    fetch(`${API_BASE}/publish/history`, { headers }),
-                    fetch(`${API_BASE}/video/jobs`, { headers })
+                    refreshHistory(),
+                    fetchPage(`${API_BASE}/video/jobs`, { headers })
                 ]);
                 if (accountsRes.ok) setAccounts(await accountsRes.json());
-                if (historyRes.ok) setHistory(await historyRes.json());
-                if (jobsRes.ok) setJobs(await jobsRes.json());
+                if (jobPage) setJobs(jobPage.rows);
 
                 // Fetch niches
                 const nichesRes = await fetch(`${API_BASE}/discovery/niches`, { headers });
@@ -692,6 +695,18 @@ export default function PublishingPage() {
                             )}
                         </AnimatePresence>
                     </div>
+                    {hasMoreHistory && (
+                        <div className="p-8 flex justify-center border-t border-white/5">
+                            <button
+                                onClick={loadMoreHistory}
+                                disabled={isLoadingMoreHistory}
+                                className="px-8 py-4 rounded-2xl glass-card border-white/5 hover:border-primary/50 text-[10px] font-black uppercase tracking-[0.3em] text-zinc-400 hover:text-primary transition-all flex items-center gap-3 disabled:opacity-50"
+                            >
+                                {isLoadingMoreHistory && <RefreshCw className="h-4 w-4 animate-spin" />}
+                                Load More Transmissions
+                            </button>
+                        </div>
+                    )}
                 </div>
             </div>
         </DashboardLayout >
@@ -22,6 +22,7 @@ import {
 import Link from "next/link";
 import { cn } from "@/lib/utils";
 import { API_BASE } from "@/lib/config";
+import { usePaginatedList } from "@/hooks/usePaginatedList";
 import dynamic from "next/dynamic";
 
 const ProcessingFlow = dynamic(() => import("@/components/ui/ProcessingFlow"), { ssr: false });
@@ -42,7 +43,15 @@ import { motion, AnimatePresence } from "framer-motion";
 
 function TransformationPageContent() {
     const searchParams = useSearchParams();
-    const [processingJobs, setProcessingJobs] = useState<VideoJob[]>([]);
+    // Newest jobs first; older ones are fetched on "Load more" through X-Next-Cursor
+    const {
+        items: processingJobs,
+        setItems: setProcessingJobs,
+        hasMore: hasMoreJobs,
+        isLoadingMore: isLoadingMoreJobs,
+        refresh: refreshJobs,
+        loadMore: loadMoreJobs
+    } = usePaginatedList<VideoJob>(`${API_BASE}/video/jobs`);
     const [activeFilters, setActiveFilters] = useState<any[]>([]);
     const [selectedJob, setSelectedJob] = useState<VideoJob | null>(null);
     const [isJobModalOpen, setIsJobModalOpen] = useState(false);
@@ -86,10 +95,7 @@ function TransformationPageContent() {
             if (response.ok) {
                 setNewJobUrl("");
                 setIsJobModalOpen(false);
-                const jobsRes = await fetch(`${API_BASE}/video/jobs`, {
-                    headers: { Authorization: `Bearer ${token}` }
-                }).then(r => r.json());
-                setProcessingJobs(jobsRes);
+                await refreshJobs();
             }
         } catch (error) {
             console.error("New job error:", error);
@@ -145,11 +151,8 @@ function TransformationPageContent() {
         }
     };
 
-    const { data: jobUpdate } = useWebSocket<any>(`${WS_BASE}/ws/jobs`);
-
-    useEffect(() => {
-        if (!jobUpdate) return;
-
+    // Job updates are partial deltas: merge every message (not the batched `data` state), or a status change can be lost
+    useWebSocket<any>(`${WS_BASE}/ws/jobs`, (jobUpdate) => {
         if (jobUpdate.type === "job_update") {
             const updatedJob = jobUpdate.data;
             setProcessingJobs(prev => {
@@ -169,7 +172,7 @@ function TransformationPageContent() {
                 return prev;
             });
         }
-    }, [jobUpdate]);
+    });
 
     React.useEffect(() => {
         const fetchData = async () => {
@@ -179,10 +182,9 @@ function TransformationPageContent() {
                 const headers = { Authorization: `Bearer ${token}` };
 
                 const [jobsRes, filtersRes] = await Promise.all([
-                    fetch(`${API_BASE}/video/jobs`, { headers }).then(r => r.json()),
+                    refreshJobs().then(jobs => jobs ?? []),
                     fetch(`${API_BASE}/settings/filters`, { headers }).then(r => r.json())
                 ]);
-                setProcessingJobs(jobsRes);
                 setActiveFilters(filtersRes);
                 if (jobsRes.length > 0 && !selectedJob) {
                     setSelectedJob(jobsRes[0]);
@@ -591,6 +593,16 @@ function TransformationPageContent() {
                                     )}
                                 </AnimatePresence>
                             </div>
+                            {hasMoreJobs && (
+                                <button
+                                    onClick={loadMoreJobs}
+                                    disabled={isLoadingMoreJobs}
+                                    className="w-full py-4 glass-card rounded-2xl hover:border-primary/40 text-[10px] font-black uppercase tracking-[0.25em] text-zinc-500 hover:text-primary transition-all flex items-center justify-center gap-3 disabled:opacity-50"
+                                >
+                                    {isLoadingMoreJobs && <RefreshCw className="h-4 w-4 animate-spin" />}
+                                    Load More Jobs
+                                </button>
+                            )}
                         </div>
                     </div>
 
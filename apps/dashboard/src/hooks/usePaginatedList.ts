@@ -0,0 +1,47 @@
+import { useState, useCallback, useRef } from 'react';
+import { appendUnique, fetchPage } from '@/lib/pagination';
+
+/**
+ * A cursor-paginated list endpoint, newest first.
+ * `refresh` (re)loads the first page and keeps any older pages already loaded below it;
+ * `loadMore` follows the X-Next-Cursor of the last page loaded.
+ */
+export function usePaginatedList<T extends { id: any }>(url: string) {
+    const [items, setItems] = useState<T[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
+    // Once older pages are loaded, refreshes must not reset the cursor back to page two
+    const loadedMore = useRef(false);
+
+    const authInit = (): RequestInit => ({
+        headers: { Authorization: `Bearer ${localStorage.getItem("et_token")}` }
+    });
+
+    const refresh = useCallback(async (): Promise<T[] | null> => {
+        const page = await fetchPage<T>(url, authInit());
+        if (!page) return null;
+        if (loadedMore.current) {
+            setItems(prev => appendUnique(page.rows, prev));
+        } else {
+            setItems(page.rows);
+            setNextCursor(page.nextCursor);
+        }
+        return page.rows;
+    }, [url]);
+
+    const loadMore = useCallback(async () => {
+        if (!nextCursor || isLoadingMore) return;
+        setIsLoadingMore(true);
+        try {
+            const page = await fetchPage<T>(url, authInit(), nextCursor);
+            if (!page) return;
+            loadedMore.current = true;
+            setItems(prev => appendUnique(prev, page.rows));
+            setNextCursor(page.nextCursor);
+        } finally {
+            setIsLoadingMore(false);
+        }
+    }, [url, nextCursor, isLoadingMore]);
+
+    return { items, setItems, hasMore: nextCursor !== null, isLoadingMore, refresh, loadMore };
+}
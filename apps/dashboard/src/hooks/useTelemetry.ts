@@ -0,0 +1,46 @@
+import { useState, useCallback } from 'react';
+import { useWebSocket } from './useWebSocket';
+import { WS_BASE } from '@/lib/config';
+
+export type TelemetryMetrics = Record<string, number>;
+export type TelemetryHistory = Record<string, [number, number][]>;
+
+const MAX_POINTS = 120;
+
+/**
+ * Live worker metrics from /ws/telemetry.
+ * The server sends one full snapshot on connect, then deltas ({set, unset}) that are folded in here.
+ */
+export function useTelemetry() {
+    const [metrics, setMetrics] = useState<TelemetryMetrics>({});
+    const [history, setHistory] = useState<TelemetryHistory>({});
+
+    const onMessage = useCallback((message: any) => {
+        if (message?.type === "telemetry_snapshot") {
+            setMetrics(message.metrics || {});
+            setHistory(message.history || {});
+        } else if (message?.type === "telemetry_delta") {
+            setMetrics(prev => {
+                const next = { ...prev, ...message.set };
+                (message.unset || []).forEach((key: string) => delete next[key]);
+                return next;
+            });
+            setHistory(prev => {
+                const next = { ...prev };
+                Object.entries(message.set as TelemetryMetrics).forEach(([key, value]) => {
+                    next[key] = [...(next[key] || []), [message.timestamp, value] as [number, number]].slice(-MAX_POINTS);
+                });
+                return next;
+            });
+        }
+    }, []);
+
+    const { status } = useWebSocket<any>(`${WS_BASE}/ws/telemetry`, onMessage);
+
+    // Per-node values arrive as "<metric>.<node>" keys
+    const byNode = (prefix: string) => Object.entries(metrics)
+        .filter(([key]) => key.startsWith(`${prefix}.`) && key !== `${prefix}.total`)
+        .map(([key, value]) => ({ node: key.slice(prefix.length + 1), value }));
+
+    return { metrics, history, status, byNode };
+}
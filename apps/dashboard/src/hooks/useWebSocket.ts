@@ -1,7 +1,10 @@
 import { useState, useEffect, useCallback, useRef } from 'react';
 
-export function useWebSocket<T>(url: string) {
+export function useWebSocket<T>(url: string, onMessage?: (message: T) => void) {
     const [data, setData] = useState<T | null>(null);
+    // Sees every message, including ones a re-render would coalesce away from `data`
+    const onMessageRef = useRef(onMessage);
+    onMessageRef.current = onMessage;
     const [status, setStatus] = useState<'connecting' | 'open' | 'closed'>('connecting');
     const ws = useRef<WebSocket | null>(null);
     const isMounted = useRef(true);
@@ -27,7 +30,10 @@ export function useWebSocket<T>(url: string) {
         }
 
         try {
-            const socket = new WebSocket(url);
+            // Job updates are delivered per user; the server resolves the user from the token
+            const token = localStorage.getItem("et_token");
+            const socketUrl = token ? `${url}${url.includes("?") ? "&" : "?"}token=${encodeURIComponent(token)}` : url;
+            const socket = new WebSocket(socketUrl);
 
             // Set connection timeout
             connectionTimeout.current = setTimeout(() => {
@@ -54,6 +60,7 @@ export function useWebSocket<T>(url: string) {
                 if (!isMounted.current) return;
                 try {
                     const message = JSON.parse(event.data);
+                    onMessageRef.current?.(message);
                     setData(message);
                 } catch (e) {
                     console.error("[WS] Failed to parse message", e);
@@ -0,0 +1,52 @@
+// List endpoints return one page per request; the next page's cursor comes back in this header
+export const NEXT_CURSOR_HEADER = "X-Next-Cursor";
+// Page size the API uses when no limit is given (api/utils/pagination.py DEFAULT_PAGE_SIZE)
+export const DEFAULT_PAGE_SIZE = 50;
+// Largest page the API serves (api/utils/pagination.py MAX_PAGE_SIZE)
+export const MAX_PAGE_SIZE = 200;
+
+export interface Page<T> {
+    rows: T[];
+    nextCursor: string | null;
+}
+
+/**
+ * Fetches one page of a cursor-paginated list endpoint.
+ * Resolves to null when the request is rejected, like checking `response.ok`.
+ */
+export async function fetchPage<T = any>(
+    url: string,
+    init?: RequestInit,
+    cursor?: string | null,
+    limit: number = DEFAULT_PAGE_SIZE
+): Promise<Page<T> | null> {
+    const pageUrl = new URL(url, window.location.href);
+    pageUrl.searchParams.set("limit", String(limit));
+    if (cursor) pageUrl.searchParams.set("cursor", cursor);
+
+    const response = await fetch(pageUrl.toString(), init);
+    if (!response.ok) return null;
+    return { rows: await response.json(), nextCursor: response.headers.get(NEXT_CURSOR_HEADER) };
+}
+
+/**
+ * Fetches every page of a list endpoint. Only for views that need the whole set
+ * client-side (sorting/filtering across all rows); lists should page with usePaginatedList.
+ */
+export async function fetchAllPages<T = any>(url: string, init?: RequestInit): Promise<T[] | null> {
+    const rows: T[] = [];
+    let cursor: string | null = null;
+    do {
+        const page: Page<T> | null = await fetchPage<T>(url, init, cursor, MAX_PAGE_SIZE);
+        if (!page) return null;
+        rows.push(...page.rows);
+        cursor = page.nextCursor;
+    } while (cursor);
+    return rows;
+}
+
+/** Appends rows that aren't already in `loaded` (pages can shift while new rows arrive). */
+export function appendUnique<T extends { id: any }>(loaded: T[], rows: T[]): T[] {
+    const seen = new Set(loaded.map(row => row.id));
+    return [...loaded, ...rows.filter(row => !seen.has(row.id))];
+}
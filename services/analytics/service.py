@@ -8,12 +8,12 @@ class AnalyticsService:
         from services.optimization.auth import token_manager
         from api.config import settings
         import logging
-        import redis
+        from api.utils.redis_client import get_redis
         import json
         
         # Redis Caching Layer
         try:
-            r = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            r = get_redis(decode_responses=True)
             cache_key = f"analytics:report:{post_id}"
             cached_data = r.get(cache_key)
             if cached_data:
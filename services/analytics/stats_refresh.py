@@ -0,0 +1,183 @@
+"""
+Candidate Stats Refresh
+=======================
+Keeps views/engagement of stored discovery candidates current without rescanning.
+
+Each run takes the candidates still inside the relevance window
+(discovered within STATS_REFRESH_WINDOW_DAYS), groups them by platform and hands
+each group to that platform's scanner `refresh_stats` batch lookup (YouTube: 50
+ids per statistics-only videos().list call, 1 quota unit each). Changes go back
+in one executemany UPDATE, and every refreshed candidate gets a sample in
+candidate_stats_history, so its view velocity can be read as a series instead of
+guessed from a single snapshot.
+
+Platforms whose scanner has no batch lookup are skipped; their stats still move
+when a scan sees them again.
+"""
+
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.utils.models import CandidateStatsSampleDB, ContentCandidateDB
+from services.discovery.cursors import published_time
+from services.discovery.models import ContentCandidate
+from services.discovery.persistence import candidate_from_row
+
+logger = logging.getLogger(__name__)
+
+# Columns a stats refresh rewrites on content_candidates
+STAT_COLUMNS = ["views", "view_count", "engagement_score", "engagement_rate", "viral_score"]
+
+
+@dataclass
+class RefreshResult:
+    selected: int = 0
+    refreshed: int = 0
+    # Platforms without a batch lookup, with how many candidates were left as they were
+    skipped: Dict[str, int] = field(default_factory=dict)
+    failed: List[str] = field(default_factory=list)
+    pruned: int = 0
+
+
+class CandidateStatsRefresher:
+    def __init__(
+        self,
+        scanners: Optional[list] = None,
+        window_days: Optional[int] = None,
+        max_candidates: Optional[int] = None
+    ):
+        self._scanners = scanners
+        self.window = datetime.timedelta(days=window_days or settings.STATS_REFRESH_WINDOW_DAYS)
+        self.max_candidates = max_candidates or settings.STATS_REFRESH_MAX_CANDIDATES
+
+    def refreshers(self) -> Dict[str, object]:
+        """{platform: scanner} for every scanner with a batch stats lookup."""
+        scanners = self._scanners
+        if scanners is None:
+            from services.discovery.service import base_discovery_service
+            scanners = base_discovery_service.scanners + base_discovery_service.global_scanners
+        return {s.platform_name: s for s in scanners if getattr(s, "platform_name", None)}
+
+    def select(self, db: Session, now: datetime.datetime) -> List[ContentCandidateDB]:
+        """Newest candidates still inside the relevance window."""
+        return db.query(ContentCandidateDB).filter(
+            ContentCandidateDB.discovery_date >= now - self.window
+        ).order_by(ContentCandidateDB.discovery_date.desc()).limit(self.max_candidates).all()
+
+    @staticmethod
+    def last_samples(db: Session, ids: List[str]) -> Dict[str, CandidateStatsSampleDB]:
+        """Latest history sample per candidate (one grouped query)."""
+        if not ids:
+            return {}
+        latest = (
+            db.query(CandidateStatsSampleDB.candidate_id, func.max(CandidateStatsSampleDB.sampled_at).label("sampled_at"))
+            .filter(CandidateStatsSampleDB.candidate_id.in_(ids))
+            .group_by(CandidateStatsSampleDB.candidate_id)
+            .subquery()
+        )
+        rows = db.query(CandidateStatsSampleDB).join(
+            latest,
+            (CandidateStatsSampleDB.candidate_id == latest.c.candidate_id)
+            & (CandidateStatsSampleDB.sampled_at == latest.c.sampled_at)
+        ).all()
+        return {row.candidate_id: row for row in rows}
+
+    @staticmethod
+    def velocity(
+        candidate: ContentCandidate,
+        previous: Optional[CandidateStatsSampleDB],
+        now: datetime.datetime
+    ) -> Optional[float]:
+        """Views/hour since the previous sample; the lifetime average for a first sample."""
+        if previous is not None:
+            hours = (now - previous.sampled_at).total_seconds() / 3600
+            if hours <= 0:
+                return None
+            return round((candidate.views - (previous.views or 0)) / hours, 2)
+        published = published_time(candidate)
+        if published is None:
+            return None
+        return round(candidate.views / max((now - published).total_seconds() / 3600, 1), 2)
+
+    async def _fetch(self, groups: Dict[str, List[ContentCandidate]], result: RefreshResult) -> List[ContentCandidate]:
+        """Runs every platform's batch lookup concurrently."""
+        refreshers = self.refreshers()
+        jobs = {}
+        for platform, candidates in groups.items():
+            scanner = refreshers.get(platform)
+            if scanner is None:
+                result.skipped[platform] = len(candidates)
+            else:
+                jobs[platform] = scanner.refresh_stats(candidates)
+
+        fresh: List[ContentCandidate] = []
+        outcomes = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        for platform, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"[StatsRefresh] {platform} lookup failed: {outcome}")
+                result.failed.append(platform)
+            else:
+                fresh.extend(outcome)
+        return fresh
+
+    def write(self, db: Session, fresh: List[ContentCandidate], now: datetime.datetime) -> int:
+        """One executemany UPDATE for the stats plus one multi-row INSERT of history samples."""
+        if not fresh:
+            return 0
+        previous = self.last_samples(db, [c.id for c in fresh])
+        table = ContentCandidateDB.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({col: bindparam(col) for col in STAT_COLUMNS})
+        )
+        db.execute(stmt, [{
+            "_id": c.id,
+            "views": c.views,
+            "view_count": c.views,
+            "engagement_score": c.engagement_score,
+            "engagement_rate": c.engagement_score,
+            "viral_score": c.viral_score,
+        } for c in fresh])
+        db.execute(CandidateStatsSampleDB.__table__.insert(), [{
+            "candidate_id": c.id,
+            "sampled_at": now,
+            "views": c.views,
+            "engagement_score": c.engagement_score,
+            "viral_score": c.viral_score,
+            "velocity": self.velocity(c, previous.get(c.id), now),
+        } for c in fresh])
+        return len(fresh)
+
+    def prune(self, db: Session, now: datetime.datetime) -> int:
+        """Drops samples older than the relevance window."""
+        return db.query(CandidateStatsSampleDB).filter(
+            CandidateStatsSampleDB.sampled_at < now - self.window
+        ).delete(synchronize_session=False)
+
+    async def refresh(self, db: Session, now: Optional[datetime.datetime] = None) -> RefreshResult:
+        """Refreshes one window's worth of candidates. The caller owns the commit."""
+        now = now or datetime.datetime.utcnow()
+        result = RefreshResult()
+        rows = self.select(db, now)
+        result.selected = len(rows)
+
+        groups: Dict[str, List[ContentCandidate]] = defaultdict(list)
+        for row in rows:
+            groups[row.platform].append(candidate_from_row(row))
+
+        fresh = await self._fetch(groups, result)
+        result.refreshed = self.write(db, fresh, now)
+        result.pruned = self.prune(db, now)
+        return result
+
+
+stats_refresher = CandidateStatsRefresher()
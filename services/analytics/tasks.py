@@ -0,0 +1,37 @@
+from api.utils.celery import celery_app
+from api.utils.database import SessionLocal
+from .stats_refresh import stats_refresher
+import asyncio
+
+@celery_app.task(name="analytics.refresh_candidate_stats")
+def refresh_candidate_stats_task():
+    """
+    Refreshes views/engagement of stored candidates inside the relevance window through
+    each platform's batch stats lookup, and appends to their velocity history.
+    """
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    db = SessionLocal()
+    try:
+        result = loop.run_until_complete(stats_refresher.refresh(db))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    print(f"[StatsRefresh] Refreshed {result.refreshed}/{result.selected} candidates "
+          f"(skipped: {result.skipped or 'none'}, failed: {result.failed or 'none'}, pruned {result.pruned} samples).")
+    return {
+        "status": "success",
+        "selected": result.selected,
+        "refreshed": result.refreshed,
+        "skipped": result.skipped,
+        "failed": result.failed,
+        "pruned": result.pruned
+    }
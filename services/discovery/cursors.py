@@ -0,0 +1,109 @@
+"""
+Scan Cursors
+============
+Per-(scanner, niche) high-water marks for incremental discovery.
+
+A cursor is the newest publish time a scanner has returned for a niche. An
+incremental scan asks each scanner only for content published after its cursor
+(minus DISCOVERY_CURSOR_OVERLAP_MINUTES, so items the platform indexes late are
+still picked up) instead of the whole horizon; candidates stored by earlier scans
+get their stats refreshed through the scanner's batch lookup instead of being
+searched for again.
+
+Cursors only move forward. Times are stored as naive UTC, like the rest of the
+schema.
+"""
+
+import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from api.config import settings
+from api.utils.database import SessionLocal
+from api.utils.models import ScanCursorDB
+from .models import ContentCandidate
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def published_time(candidate: ContentCandidate) -> Optional[datetime.datetime]:
+    """Publish time the scanner reported (metadata.published_at, ISO 8601), as naive UTC."""
+    raw = (candidate.metadata or {}).get("published_at")
+    if isinstance(raw, datetime.datetime):
+        return _naive_utc(raw)
+    if not raw or not isinstance(raw, str):
+        return None
+    try:
+        return _naive_utc(datetime.datetime.fromisoformat(raw.replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
+class ScanCursorStore:
+    def __init__(self, overlap_minutes: Optional[float] = None):
+        minutes = settings.DISCOVERY_CURSOR_OVERLAP_MINUTES if overlap_minutes is None else overlap_minutes
+        self.overlap = datetime.timedelta(minutes=minutes)
+
+    def load(self, niche: str, scanners: Iterable[str]) -> Dict[str, datetime.datetime]:
+        """{scanner: high-water mark} for the niche (one query); scanners without a cursor are omitted."""
+        db = SessionLocal()
+        try:
+            rows = db.query(ScanCursorDB).filter(
+                ScanCursorDB.niche == niche,
+                ScanCursorDB.scanner.in_(list(scanners))
+            ).all()
+            return {row.scanner: row.high_water_mark for row in rows}
+        finally:
+            db.close()
+
+    def since(
+        self,
+        cursor: Optional[datetime.datetime],
+        horizon_start: Optional[datetime.datetime]
+    ) -> Optional[datetime.datetime]:
+        """
+        published_after for the next scan: the cursor minus the overlap, never earlier
+        than the horizon. Returned timezone-aware (UTC), like the horizon scanners get.
+        """
+        if cursor is None:
+            return horizon_start
+        since = (cursor - self.overlap).replace(tzinfo=datetime.timezone.utc)
+        if horizon_start is not None and horizon_start > since:
+            return horizon_start
+        return since
+
+    def advance(self, niche: str, scanner: str, candidates: List[ContentCandidate]) -> Optional[datetime.datetime]:
+        """Moves the cursor to the newest publish time in `candidates`. Returns the stored mark."""
+        times = [t for t in (published_time(c) for c in candidates) if t is not None]
+        if not times:
+            return None
+        newest = max(times)
+        db = SessionLocal()
+        try:
+            row = db.query(ScanCursorDB).filter(
+                ScanCursorDB.niche == niche,
+                ScanCursorDB.scanner == scanner
+            ).first()
+            if row is None:
+                db.add(ScanCursorDB(scanner=scanner, niche=niche, high_water_mark=newest))
+            elif newest > row.high_water_mark:
+                row.high_water_mark = newest
+            else:
+                return row.high_water_mark
+            db.commit()
+            return newest
+        except SQLAlchemyError as e:
+            # Losing a race with another scan of the same niche only costs one wider scan
+            print(f"[Discovery] Cursor update failed for {scanner}/{niche}: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+
+scan_cursors = ScanCursorStore()
@@ -0,0 +1,310 @@
+"""
+Near-Duplicate Clustering
+=========================
+The same clip comes back from several scanners (YouTube, TikTok, DuckDuckGo and
+metasearch results pointing at it, Reddit reposts) as separate candidates. This
+stage clusters them so only one canonical candidate per clip is stored and picked.
+
+- Titles are normalized (lowercase, no URLs/hashtags/punctuation/filler words) and
+  cut into character shingles. MinHash signatures are banded for LSH, so only
+  candidates sharing a band are compared; a pair's titles match when the exact
+  shingle Jaccard similarity reaches DISCOVERY_DEDUP_THRESHOLD.
+- With DISCOVERY_DEDUP_THUMBNAILS (and Pillow installed) thumbnails get a 64-bit
+  dHash; hashes within THUMBNAIL_MAX_DISTANCE bits match. They are found through
+  eight 8-bit bands: fewer than 8 differing bits leave one band identical.
+- Candidates with the same URL are always linked. Candidates from different
+  platforms are linked when their titles or thumbnails match. Two uploads on the
+  same platform are separate videos unless both title and thumbnail match:
+  templated titles ("... in 2024" / "... in 2025") are common within a platform.
+- Linked candidates are unioned into clusters. The strongest member (viral score,
+  then views) becomes canonical: it keeps its own URL and platform stats (which the
+  stats refresh keeps updating) and carries the cross-platform aggregate in
+  metadata["cluster"].
+"""
+
+import io
+import re
+import random
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from api.config import settings
+from .models import ContentCandidate
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs around 0.5 Jaccard and up become LSH candidates
+MIN_TITLE_CHARS = 12  # Shorter normalized titles ("AI", "wow") are too generic to link on
+THUMBNAIL_MAX_DISTANCE = 6
+THUMBNAIL_BANDS = 8
+THUMBNAIL_FETCH_CONCURRENCY = 8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_URL_RE = re.compile(r"https?://\S+")
+_TAG_RE = re.compile(r"[#@]\w+")
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+# Words scanners and uploaders bolt onto the same clip's title
+FILLER_WORDS = {
+    "shorts", "short", "viral", "trending", "video", "clip", "official", "full", "new",
+    "reel", "reels", "tiktok", "youtube", "fyp", "foryou", "the", "a", "an", "of", "and",
+}
+
+
+def normalize_title(title: Optional[str]) -> str:
+    text = _TAG_RE.sub(" ", _URL_RE.sub(" ", (title or "").lower()))
+    words = _NON_WORD_RE.sub(" ", text).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    return (url or "").lower().split("://", 1)[-1].removeprefix("www.").rstrip("/")
+
+
+class MinHasher:
+    """MinHash over stable (blake2b) shingle hashes, so signatures match across processes."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, items: Set[str]) -> Tuple[int, ...]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in items]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self.perms)
+
+
+def dhash(image_bytes: bytes, size: int = 8) -> Optional[int]:
+    """64-bit difference hash of an image, or None if Pillow can't read it (or isn't installed)."""
+    try:
+        from PIL import Image
+        image = Image.open(io.BytesIO(image_bytes)).convert("L").resize((size + 1, size))
+    except Exception:
+        return None
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left, right = pixels[row * (size + 1) + col], pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class NearDuplicateClusterer:
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        num_perm: int = NUM_PERM,
+        bands: int = LSH_BANDS
+    ):
+        self.threshold = settings.DISCOVERY_DEDUP_THRESHOLD if threshold is None else threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+
+    def _title_pairs(self, candidates: Sequence[ContentCandidate]) -> Set[Tuple[int, int]]:
+        sets: Dict[int, Set[str]] = {}
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for i, c in enumerate(candidates):
+            title = normalize_title(c.title)
+            if len(title) < MIN_TITLE_CHARS:
+                continue
+            sets[i] = shingles(title)
+            signature = self.hasher.signature(sets[i])
+            for band in range(self.bands):
+                buckets[(band, signature[band * self.rows:(band + 1) * self.rows])].append(i)
+
+        checked, pairs = set(), set()
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pair = (members[x], members[y])
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    a, b = sets[pair[0]], sets[pair[1]]
+                    if len(a & b) / len(a | b) >= self.threshold:
+                        pairs.add(pair)
+        return pairs
+
+    @staticmethod
+    def _thumbnail_pairs(candidates: Sequence[ContentCandidate]) -> Set[Tuple[int, int]]:
+        hashes = {}
+        for i, c in enumerate(candidates):
+            value = (c.metadata or {}).get("thumbnail_hash")
+            if value:
+                hashes[i] = int(value, 16)
+        band_bits = 64 // THUMBNAIL_BANDS
+        buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, value in hashes.items():
+            for band in range(THUMBNAIL_BANDS):
+                buckets[(band, (value >> (band * band_bits)) & ((1 << band_bits) - 1))].append(i)
+        pairs = set()
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if bin(hashes[i] ^ hashes[j]).count("1") <= THUMBNAIL_MAX_DISTANCE:
+                        pairs.add((i, j))
+        return pairs
+
+    def cluster(self, candidates: Sequence[ContentCandidate]) -> List[List[int]]:
+        """Indices of each cluster, ordered by first appearance (singletons included)."""
+        links = _DisjointSet(len(candidates))
+        by_url: Dict[str, int] = {}
+        for i, c in enumerate(candidates):
+            url = _normalize_url(c.url)
+            if url in by_url:
+                links.union(by_url[url], i)
+            elif url:
+                by_url[url] = i
+
+        titles = self._title_pairs(candidates) if self.threshold > 0 else set()
+        thumbnails = self._thumbnail_pairs(candidates)
+        for i, j in titles | thumbnails:
+            if candidates[i].platform != candidates[j].platform or ((i, j) in titles and (i, j) in thumbnails):
+                links.union(i, j)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(candidates)):
+            clusters.setdefault(links.find(i), []).append(i)
+        return list(clusters.values())
+
+    @staticmethod
+    def strongest(members: Sequence[ContentCandidate]) -> ContentCandidate:
+        return max(members, key=lambda c: (c.viral_score or 0, c.views or 0))
+
+    @classmethod
+    def merge(cls, members: Sequence[ContentCandidate], canonical: Optional[ContentCandidate] = None) -> ContentCandidate:
+        """
+        Canonical candidate for a cluster (a single member is returned unchanged). The
+        strongest member leads unless `canonical` is given.
+        """
+        if len(members) == 1:
+            return members[0]
+        canonical = canonical or cls.strongest(members)
+        others = sorted(
+            (c for c in members if c is not canonical),
+            key=lambda c: (c.viral_score or 0, c.views or 0), reverse=True
+        )
+        total_views = sum(c.views or 0 for c in members)
+        engagement = (
+            sum((c.engagement_score or 0) * (c.views or 0) for c in members) / total_views
+            if total_views else canonical.engagement_score
+        )
+        cluster = {
+            "size": len(members),
+            "platforms": sorted({c.platform for c in members}),
+            "total_views": total_views,
+            "engagement_score": round(engagement, 4),
+            "members": [
+                {"id": c.id, "platform": c.platform, "url": c.url, "views": c.views, "viral_score": c.viral_score}
+                for c in others
+            ],
+        }
+        return canonical.model_copy(update={"metadata": {**(canonical.metadata or {}), "cluster": cluster}})
+
+    def dedupe(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        if len(candidates) < 2:
+            return candidates
+        clusters = self.cluster(candidates)
+        merged = [self.merge([candidates[i] for i in members]) for members in clusters]
+        if len(merged) < len(candidates):
+            logger.info(f"[Discovery] Merged {len(candidates)} candidates into {len(merged)} after near-duplicate clustering")
+        return merged
+
+    async def hash_thumbnails(self, candidates: Sequence[ContentCandidate], timeout: float = 5.0):
+        """Adds metadata["thumbnail_hash"] (hex dHash) to candidates with a fetchable thumbnail."""
+        import aiohttp
+        from .http_client import http_registry
+
+        semaphore = asyncio.Semaphore(THUMBNAIL_FETCH_CONCURRENCY)
+
+        async def fetch(c: ContentCandidate):
+            async with semaphore:
+                async with http_registry.session().get(c.thumbnail_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.read()
+
+        pending = [c for c in candidates if c.thumbnail_url and not (c.metadata or {}).get("thumbnail_hash")]
+        images = await asyncio.gather(*(fetch(c) for c in pending), return_exceptions=True)
+        for c, image in zip(pending, images):
+            if isinstance(image, bytes):
+                value = await asyncio.to_thread(dhash, image)
+                if value is not None:
+                    c.metadata = {**(c.metadata or {}), "thumbnail_hash": f"{value:016x}"}
+
+
+class StreamDeduper:
+    """
+    Dedup state for one streamed scan, where batches arrive (and are stored) one scanner
+    at a time. A candidate that duplicates one stored earlier in the stream is folded
+    into that candidate's cluster instead of being stored as its own row. The stored
+    canonical stays canonical, so earlier rows are never orphaned.
+    """
+
+    def __init__(self, clusterer: NearDuplicateClusterer):
+        self.clusterer = clusterer
+        self.seen: List[ContentCandidate] = []
+        # Candidate id -> id of the canonical row it is stored under
+        self.stored_as: Dict[str, str] = {}
+
+    def observe(self, candidates: Sequence[ContentCandidate]):
+        """Records candidates the caller dedupes and stores itself (find_trending_content)."""
+        self.seen.extend(candidates)
+
+    def add(self, candidates: Sequence[ContentCandidate]) -> Tuple[List[ContentCandidate], List[ContentCandidate]]:
+        """
+        (new canonicals to store, earlier canonicals whose cluster grew and should be
+        stored again). Earlier candidates without a recorded canonical (observed ones)
+        are assumed stored under their strongest member, as dedupe() would pick.
+        """
+        start = len(self.seen)
+        self.seen.extend(candidates)
+        fresh, regrouped = [], []
+        for members in self.clusterer.cluster(self.seen):
+            if members[-1] < start:
+                continue  # Nothing new in this cluster
+            group = [self.seen[i] for i in members]
+            earlier = [self.seen[i] for i in members if i < start]
+            if earlier:
+                anchor_id = self.stored_as.get(earlier[0].id)
+                anchor = next((c for c in earlier if c.id == anchor_id), None) or self.clusterer.strongest(earlier)
+                merged = self.clusterer.merge(group, canonical=anchor)
+                regrouped.append(merged)
+            else:
+                merged = self.clusterer.merge(group)
+                fresh.append(merged)
+            for c in group:
+                self.stored_as[c.id] = merged.id
+        return fresh, regrouped
+
+
+near_duplicates = NearDuplicateClusterer()
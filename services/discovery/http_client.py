@@ -0,0 +1,122 @@
+"""
+Shared HTTP Client Registry
+
+One keep-alive aiohttp session and one httpx client per event loop, shared by
+every TrendScanner in the process. Scanners used to open a fresh client per
+request, paying DNS + TLS on every call; a full fan-out now reuses warm pools.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class HTTPClientRegistry:
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_per_host: int = 8,
+        keepalive_timeout: float = 30.0,
+        dns_ttl: int = 300,
+        cache_entries: int = 256
+    ):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.cache_entries = cache_entries
+
+        # Clients are bound to the loop that created them (API loop, Celery run_async loop)
+        self._sessions: Dict[int, aiohttp.ClientSession] = {}
+        self._clients: Dict[int, httpx.AsyncClient] = {}
+        self._cache: Dict[Tuple, Tuple[float, int, str]] = {}
+
+    @staticmethod
+    def _loop_key() -> int:
+        return id(asyncio.get_running_loop())
+
+    def session(self) -> aiohttp.ClientSession:
+        """Shared aiohttp session with a pooled, per-host limited connector."""
+        key = self._loop_key()
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[key] = session
+        return session
+
+    def client(self) -> httpx.AsyncClient:
+        """Shared httpx client (HTTP/2 when the h2 package is installed)."""
+        key = self._loop_key()
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_per_host * 4,
+                    keepalive_expiry=self.keepalive_timeout
+                ),
+                timeout=15.0
+            )
+            self._clients[key] = client
+        return client
+
+    async def get_text(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 10.0,
+        cache_ttl: float = 0
+    ) -> Tuple[int, str]:
+        """
+        GET through the shared session. With cache_ttl > 0, successful responses are
+        reused for that many seconds (useful for trend endpoints hit by every niche).
+        """
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        if cache_ttl:
+            cached = self._cache.get(cache_key)
+            if cached and time.time() - cached[0] < cache_ttl:
+                return cached[1], cached[2]
+
+        async with self.session().get(
+            url, params=params, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            status, text = response.status, await response.text()
+
+        if cache_ttl and status == 200:
+            if len(self._cache) >= self.cache_entries:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[cache_key] = (time.time(), status, text)
+        return status, text
+
+    async def close(self):
+        """Closes the clients owned by the current loop (call on shutdown)."""
+        key = self._loop_key()
+        session = self._sessions.pop(key, None)
+        if session and not session.closed:
+            await session.close()
+        client = self._clients.pop(key, None)
+        if client and not client.is_closed:
+            await client.aclose()
+
+
+http_registry = HTTPClientRegistry()
@@ -0,0 +1,157 @@
+"""
+Bulk persistence for discovered candidates.
+
+Replaces per-row Session.merge() (a SELECT plus an INSERT/UPDATE each) with one
+INSERT ... ON CONFLICT (id) DO UPDATE per chunk. Postgres reports insert vs
+update through RETURNING; other backends use a single id lookup per chunk.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+from pydantic import BaseModel
+from sqlalchemy import select, update, bindparam, literal_column
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.utils.models import ContentCandidateDB
+from .models import ContentCandidate
+
+logger = logging.getLogger(__name__)
+
+# Columns refreshed when a candidate is seen again (discovery_date keeps the first sighting)
+UPDATE_COLUMNS = [
+    "platform", "url", "author", "title", "description", "view_count", "engagement_rate",
+    "views", "engagement_score", "viral_score", "duration_seconds", "thumbnail_url",
+    "metadata_json", "niche",
+]
+
+
+class UpsertResult(BaseModel):
+    inserted: List[str] = []
+    updated: List[str] = []
+
+    @property
+    def total(self) -> int:
+        return len(self.inserted) + len(self.updated)
+
+
+def candidate_row(candidate: ContentCandidate, niche: Optional[str]) -> Dict:
+    """Maps a scanner candidate to content_candidates columns (same mapping the merge path used)."""
+    return {
+        "id": candidate.id,
+        "platform": candidate.platform,
+        "url": candidate.url,
+        "author": candidate.author,
+        "title": candidate.title,
+        "description": candidate.description,
+        "view_count": candidate.views,
+        "engagement_rate": candidate.engagement_score,
+        "views": candidate.views,
+        "engagement_score": candidate.engagement_score,
+        "viral_score": candidate.viral_score,
+        "duration_seconds": candidate.duration_seconds,
+        "thumbnail_url": candidate.thumbnail_url,
+        "metadata_json": candidate.metadata,
+        "niche": niche,
+    }
+
+
+def candidate_from_row(r: ContentCandidateDB) -> ContentCandidate:
+    """Stored row back to the scanner model (inverse of candidate_row)."""
+    return ContentCandidate(
+        id=r.id,
+        platform=r.platform,
+        url=r.url,
+        author=r.author,
+        title=r.title,
+        description=r.description,
+        thumbnail_url=r.thumbnail_url,
+        view_count=r.views,
+        engagement_rate=r.engagement_score,
+        views=r.views,
+        engagement_score=r.engagement_score,
+        viral_score=r.viral_score,
+        duration_seconds=r.duration_seconds,
+        published_at=r.discovery_date.isoformat() if r.discovery_date else None,
+        niche=r.niche,
+        metadata=r.metadata_json or {}
+    )
+
+
+def _chunks(rows: List[Dict], size: int) -> Iterable[List[Dict]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _upsert_postgres(db: Session, chunk: List[Dict], result: UpsertResult):
+    from sqlalchemy.dialects.postgresql import insert
+    stmt = insert(ContentCandidateDB).values(chunk)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentCandidateDB.id],
+        set_={col: stmt.excluded[col] for col in UPDATE_COLUMNS}
+    ).returning(ContentCandidateDB.id, literal_column("(xmax = 0)"))
+    # xmax = 0 on the returned tuple means the row was freshly inserted, not updated
+    for row_id, inserted in db.execute(stmt):
+        (result.inserted if inserted else result.updated).append(row_id)
+
+
+def _existing_ids(db: Session, ids: List[str]) -> set:
+    return set(db.execute(select(ContentCandidateDB.id).where(ContentCandidateDB.id.in_(ids))).scalars())
+
+
+def _upsert_sqlite(db: Session, chunk: List[Dict], result: UpsertResult):
+    from sqlalchemy.dialects.sqlite import insert
+    existing = _existing_ids(db, [row["id"] for row in chunk])
+    stmt = insert(ContentCandidateDB).values(chunk)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentCandidateDB.id],
+        set_={col: stmt.excluded[col] for col in UPDATE_COLUMNS}
+    )
+    db.execute(stmt)
+    for row in chunk:
+        (result.updated if row["id"] in existing else result.inserted).append(row["id"])
+
+
+def _upsert_generic(db: Session, chunk: List[Dict], result: UpsertResult):
+    """Backends without ON CONFLICT: one lookup, one multi-row INSERT, one executemany UPDATE."""
+    existing = _existing_ids(db, [row["id"] for row in chunk])
+    new_rows = [row for row in chunk if row["id"] not in existing]
+    old_rows = [row for row in chunk if row["id"] in existing]
+    if new_rows:
+        db.execute(ContentCandidateDB.__table__.insert(), new_rows)
+    if old_rows:
+        table = ContentCandidateDB.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({col: bindparam(col) for col in UPDATE_COLUMNS})
+        )
+        db.execute(stmt, [{**row, "_id": row["id"]} for row in old_rows])
+    result.inserted.extend(row["id"] for row in new_rows)
+    result.updated.extend(row["id"] for row in old_rows)
+
+
+def upsert_candidates(
+    db: Session,
+    niche: Optional[str],
+    candidates: List[ContentCandidate],
+    chunk_size: Optional[int] = None
+) -> UpsertResult:
+    """
+    Inserts or refreshes `candidates` in chunks of `chunk_size` rows
+    (settings.DISCOVERY_UPSERT_CHUNK_SIZE by default). The caller owns the commit.
+    """
+    result = UpsertResult()
+    if not candidates:
+        return result
+
+    # ON CONFLICT can't touch one row twice per statement; keep the latest sighting of each id
+    rows = list({c.id: candidate_row(c, niche) for c in candidates}.values())
+    dialect = db.get_bind().dialect.name
+    upsert = {"postgresql": _upsert_postgres, "sqlite": _upsert_sqlite}.get(dialect, _upsert_generic)
+
+    for chunk in _chunks(rows, chunk_size or settings.DISCOVERY_UPSERT_CHUNK_SIZE):
+        upsert(db, chunk, result)
+
+    logger.info(f"[Discovery] Upserted {result.total} candidates for {niche}: {len(result.inserted)} new, {len(result.updated)} updated")
+    return result
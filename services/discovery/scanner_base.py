@@ -4,6 +4,9 @@ import datetime
 from .models import ContentCandidate
 
 class TrendScanner(ABC):
+    # ContentCandidate.platform this scanner produces; lets incremental scans find its stored rows
+    platform_name: Optional[str] = None
+
     @abstractmethod
     async def scan_trends(self, niche: str, published_after: Optional[datetime.datetime] = None) -> List[ContentCandidate]:
         pass
@@ -12,3 +15,10 @@ class TrendScanner(ABC):
     def identify_viral_velocity(self, candidate: ContentCandidate) -> float:
         """Calculates how fast the content is gaining views/engagement."""
         pass
+
+    async def refresh_stats(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        """
+        Re-reads current stats for previously discovered candidates through a cheap batch
+        lookup. Returns the updated copies; scanners without such an API return [].
+        """
+        return []
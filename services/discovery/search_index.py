@@ -0,0 +1,173 @@
+"""
+Content Search Index
+
+Ranked keyword search over content_candidates.
+
+- Postgres: `search_vector` tsvector column (title > niche > description weights)
+  maintained by the database and served by a GIN index, ranked with ts_rank_cd.
+- SQLite (dev/tests): an FTS5 external-content table kept in sync by triggers,
+  ranked with bm25.
+- Anything else (or an unmigrated database): the legacy ILIKE scan.
+
+Every query term is prefix-matched ("edit" finds "editing"), and results can be
+narrowed to a niche and/or platform.
+"""
+
+import re
+import logging
+from typing import List, Optional
+
+from sqlalchemy import or_, text
+from sqlalchemy.orm import Session
+
+from api.utils.models import ContentCandidateDB
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 8
+
+FTS_TABLE = "content_candidates_fts"
+
+SQLITE_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, niche, description,
+        content='content_candidates', content_rowid='rowid', tokenize='unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_candidates_fts_ai AFTER INSERT ON content_candidates BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, niche, description)
+        VALUES (new.rowid, new.title, new.niche, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_candidates_fts_ad AFTER DELETE ON content_candidates BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, niche, description)
+        VALUES ('delete', old.rowid, old.title, old.niche, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS content_candidates_fts_au AFTER UPDATE ON content_candidates BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, niche, description)
+        VALUES ('delete', old.rowid, old.title, old.niche, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, niche, description)
+        VALUES (new.rowid, new.title, new.niche, new.description);
+    END""",
+]
+
+
+def tokenize(query: str) -> List[str]:
+    """Lowercased word terms of a free-text query (operators and punctuation dropped)."""
+    return TOKEN_RE.findall(query.lower())[:MAX_TERMS]
+
+
+class ContentSearchIndex:
+    def __init__(self):
+        # Per-engine: is the native index usable (created / migrated)?
+        self._ready = {}
+
+    def _ensure_postgres_index(self, db: Session) -> bool:
+        bind = db.get_bind()
+        key = id(bind)
+        if key not in self._ready:
+            column = db.execute(text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'content_candidates' AND column_name = 'search_vector'"
+            )).first()
+            self._ready[key] = column is not None
+            if not column:
+                logger.warning("[Discovery] content_candidates.search_vector missing (run alembic upgrade); using ILIKE search")
+        return self._ready[key]
+
+    def _ensure_sqlite_index(self, db: Session) -> bool:
+        bind = db.get_bind()
+        key = id(bind)
+        if key not in self._ready:
+            try:
+                with bind.begin() as conn:
+                    # Triggers vanish with content_candidates (drop_all); the FTS table does not
+                    synced = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'content_candidates_fts_ai'")
+                    ).first()
+                    for ddl in SQLITE_FTS_DDL:
+                        conn.execute(text(ddl))
+                    if not synced:
+                        # Index rows written while no trigger was keeping the table in sync
+                        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+                self._ready[key] = True
+            except Exception as e:
+                logger.warning(f"[Discovery] SQLite FTS5 unavailable, using LIKE search: {e}")
+                self._ready[key] = False
+        return self._ready[key]
+
+    @staticmethod
+    def _filters(niche: Optional[str], platform: Optional[str]):
+        clauses = []
+        if niche:
+            clauses.append(ContentCandidateDB.niche == niche)
+        if platform:
+            clauses.append(ContentCandidateDB.platform == platform)
+        return clauses
+
+    def _search_postgres(self, db, terms, niche, platform, limit) -> List[ContentCandidateDB]:
+        tsq = " & ".join(f"{t}:*" for t in terms)
+        match = text("content_candidates.search_vector @@ to_tsquery('simple', :tsq)")
+        rank = text("ts_rank_cd(content_candidates.search_vector, to_tsquery('simple', :tsq)) DESC")
+        return (
+            db.query(ContentCandidateDB)
+            .filter(match, *self._filters(niche, platform))
+            .order_by(rank, ContentCandidateDB.views.desc())
+            .params(tsq=tsq)
+            .limit(limit)
+            .all()
+        )
+
+    def _search_sqlite(self, db, terms, niche, platform, limit) -> List[ContentCandidateDB]:
+        sql = (
+            f"SELECT c.id FROM {FTS_TABLE} f JOIN content_candidates c ON c.rowid = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match"
+        )
+        params = {"match": " ".join(f'"{t}"*' for t in terms), "limit": limit}
+        if niche:
+            sql += " AND c.niche = :niche"
+            params["niche"] = niche
+        if platform:
+            sql += " AND c.platform = :platform"
+            params["platform"] = platform
+        # Column weights mirror the Postgres setweight order: title, niche, description
+        sql += f" ORDER BY bm25({FTS_TABLE}, 4.0, 2.0, 1.0), c.views DESC LIMIT :limit"
+
+        ids = [row[0] for row in db.execute(text(sql), params)]
+        if not ids:
+            return []
+        rows = {r.id: r for r in db.query(ContentCandidateDB).filter(ContentCandidateDB.id.in_(ids))}
+        return [rows[i] for i in ids if i in rows]
+
+    def _search_like(self, db, query, niche, platform, limit) -> List[ContentCandidateDB]:
+        pattern = f"%{query}%"
+        return db.query(ContentCandidateDB).filter(
+            or_(
+                ContentCandidateDB.title.ilike(pattern),
+                ContentCandidateDB.description.ilike(pattern),
+                ContentCandidateDB.niche.ilike(pattern)
+            ),
+            *self._filters(niche, platform)
+        ).order_by(ContentCandidateDB.views.desc()).limit(limit).all()
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        niche: Optional[str] = None,
+        platform: Optional[str] = None,
+        limit: int = 50
+    ) -> List[ContentCandidateDB]:
+        """Best-ranked candidates matching every term of `query` (each as a prefix)."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql" and self._ensure_postgres_index(db):
+            return self._search_postgres(db, terms, niche, platform, limit)
+        if dialect == "sqlite" and self._ensure_sqlite_index(db):
+            return self._search_sqlite(db, terms, niche, platform, limit)
+        return self._search_like(db, query, niche, platform, limit)
+
+
+content_search_index = ContentSearchIndex()
@@ -1,8 +1,8 @@
 import json
-import redis
+import time
 import asyncio
 import datetime
-from typing import List
+from typing import List, Optional, Dict, Tuple, AsyncIterator
 from .models import ContentCandidate, ViralPattern
 from .youtube_scanner import YouTubeShortsScanner
 from .youtube_long_scanner import YouTubeLongScanner
@@ -22,10 +22,17 @@ from .bilibili_scanner import base_bilibili_scanner
 from .skool_scanner import base_skool_scanner
 from .duckduckgo_scanner import base_duckduckgo_scanner
 from .deconstructor import pattern_deconstructor
+from .persistence import upsert_candidates, candidate_from_row, UpsertResult
+from .cursors import scan_cursors
+from .dedup import near_duplicates, StreamDeduper
+from .search_index import content_search_index
 from api.utils.database import SessionLocal
-from api.utils.models import ContentCandidateDB, SystemSettings, NicheTrendDB, MonitoredNiche
+from api.utils.models import ContentCandidateDB
 from api.config import settings
 from api.utils.vault import get_secret
+from api.utils.settings_snapshot import current_settings
+from services.monitoring.telemetry import record as record_telemetry
+from api.utils.redis_client import get_redis
 from api.utils.celery import celery_app
 from groq import Groq
 
@@ -52,160 +59,304 @@ class DiscoveryService:
             base_bilibili_scanner,
             base_skool_scanner,
         ]
+        # Strong refs for fire-and-forget persistence so tasks aren't garbage collected
+        self._background_tasks = set()
 
-    async def find_trending_content(self, niche: str, horizon: str = "30d", tier: str = "free") -> List[ContentCandidate]:
-        import json
-        import redis
-        from api.config import settings
-
-        # 1. Check Cache
-        redis_url = settings.REDIS_URL
-        # Ensure we're using the correct hostname within docker
-        # If running in docker, 'localhost' won't work for accessing other containers
-        # We need to replace 'localhost' with 'redis' but keep the port/db
-        if "//localhost" in redis_url:
-             redis_url = redis_url.replace("//localhost", "//redis")
-
-        # Custom JSON Encoder for datetime
-        def json_serial(obj):
-            from datetime import datetime
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            raise TypeError (f"Type {type(obj)} not serializable")
-
-        import datetime
-        
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def _published_after(self, horizon: str):
         # Calculate published_after based on horizon
         now = datetime.datetime.now(datetime.timezone.utc)
-        published_after = None
         if horizon == "24h":
-            published_after = now - datetime.timedelta(days=1)
+            return now - datetime.timedelta(days=1)
         elif horizon == "7d":
-            published_after = now - datetime.timedelta(days=7)
+            return now - datetime.timedelta(days=7)
         elif horizon == "30d":
-            published_after = now - datetime.timedelta(days=30)
+            return now - datetime.timedelta(days=30)
+        return None
+
+    def _redis(self):
+        return get_redis()
 
+    def _cached_trends(self, niche: str, horizon: str) -> Optional[List[ContentCandidate]]:
         try:
-            r = redis.from_url(redis_url)
-            cache_key = f"discovery:trends:{niche}:{horizon}"
-            cached_data = r.get(cache_key)
-            
+            r = self._redis()
+            cached_data = r.get(f"discovery:trends:{niche}:{horizon}")
             if cached_data:
                 print(f"[Discovery] Cache HIT for {niche} ({horizon})")
-                data = json.loads(cached_data)
-                return [ContentCandidate(**item) for item in data]
+                return [ContentCandidate(**item) for item in json.loads(cached_data)]
         except Exception as e:
              print(f"[Discovery] Redis connection failed: {e}")
-             r = None
-
-        print(f"[Discovery] Cache MISS for {niche} ({horizon}), scanning...")
+        return None
 
-        # 2. Parallel Scanning
-        import asyncio
-        
-        # Prepare scanner tasks
-        tasks = []
-        for scanner in self.scanners:
-            tasks.append(scanner.scan_trends(niche, published_after=published_after))
-        
+    def _active_scanners(self, tier: str) -> list:
+        scanners = list(self.scanners)
         # Gate global scanners for FREE tier
         if tier != "free":
             print(f"[Discovery] Tier {tier}: Unleashing all {len(self.global_scanners)} global scanners.")
-            for g_scanner in self.global_scanners:
-                tasks.append(g_scanner.scan_trends(niche, published_after=published_after))
+            scanners.extend(self.global_scanners)
         else:
             print(f"[Discovery] Tier FREE: Restricted to core {len(self.scanners)} platforms.")
-            
-        # Execute all scans concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 4. Neural Ranking & Scoring Enrichment
-        all_candidates = []
-        for res in results:
-            if isinstance(res, list):
-                all_candidates.extend(res)
-            elif isinstance(res, Exception):
-                print(f"[Discovery] Scanner Exception: {res}")
-
-        # If no results from scan, fall back to database
-        if not all_candidates:
-            print(f"[Discovery] No scan results for {niche}, falling back to database...")
-            db = SessionLocal()
-            try:
-                db_results = db.query(ContentCandidateDB).filter(
-                    ContentCandidateDB.niche == niche
-                ).order_by(ContentCandidateDB.views.desc()).limit(50).all()
-                
-                for r in db_results:
-                    all_candidates.append(ContentCandidate(
-                        id=r.id,
-                        platform=r.platform,
-                        url=r.url,
-                        author=r.author,
-                        title=r.title,
-                        description=r.description,
-                        thumbnail_url=r.thumbnail_url,
-                        view_count=r.views,
-                        engagement_rate=r.engagement_score,
-                        views=r.views,
-                        engagement_score=r.engagement_score,
-                        viral_score=r.viral_score,
-                        duration_seconds=r.duration_seconds,
-                        published_at=r.discovery_date.isoformat() if r.discovery_date else None,
-                        niche=r.niche,
-                        metadata=r.metadata_json or {}
-                    ))
-            finally:
-                db.close()
-
-        # Enforcement: Selective Monetization Mode (Viral Score > 85)
-        db = SessionLocal()
-        try:
-            mode_setting = db.query(SystemSettings).filter(SystemSettings.key == "monetization_mode").first()
-            monetization_mode = mode_setting.value if mode_setting else "all"
-            
-            if monetization_mode == "selective":
-                threshold = 65
-                original_count = len(all_candidates)
-                all_candidates = [c for c in all_candidates if (getattr(c, 'viral_score', 0) or 0) >= threshold]
-                print(f"[Discovery] Selective Mode: Filtered {original_count} -> {len(all_candidates)} candidates (Threshold: {threshold})")
-        finally:
-            db.close()
-        
-        # 3. Persistence Logic (Efficient Batch Integration)
+        return scanners
+
+    def _selective_threshold(self) -> Optional[int]:
+        """Viral score floor when monetization mode is 'selective', else None."""
+        monetization_mode = current_settings().get("monetization_mode", "all")
+        return 65 if monetization_mode == "selective" else None
+
+    @staticmethod
+    def _apply_threshold(candidates: List[ContentCandidate], threshold: Optional[int]) -> List[ContentCandidate]:
+        if threshold is None:
+            return candidates
+        return [c for c in candidates if (getattr(c, 'viral_score', 0) or 0) >= threshold]
+
+    def _persist_candidates(self, niche: str, candidates: List[ContentCandidate]) -> Optional[UpsertResult]:
+        """Blocking bulk upsert of scanned candidates; run it via asyncio.to_thread from async code."""
+        if not candidates:
+            return None
         db = SessionLocal()
         try:
-            db_candidates = []
-            for c in all_candidates:
-                db_candidates.append(ContentCandidateDB(
-                    id=c.id,
-                    platform=c.platform,
-                    url=c.url,
-                    author=c.author,
-                    title=c.title,
-                    description=c.description,
-                    view_count=c.views,
-                    engagement_rate=c.engagement_score,
-                    views=c.views,
-                    engagement_score=c.engagement_score,
-                    viral_score=c.viral_score,
-                    duration_seconds=c.duration_seconds,
-                    thumbnail_url=c.thumbnail_url,
-                    metadata_json=c.metadata,
-                    niche=niche
-                ))
-            
-            for db_c in db_candidates:
-                db.merge(db_c)
-            
+            result = upsert_candidates(db, niche, candidates)
             db.commit()
-            print(f"[Discovery] Successfully persisted {len(db_candidates)} candidates for {niche}.")
+            print(f"[Discovery] Persisted {result.total} candidates for {niche} ({len(result.inserted)} new, {len(result.updated)} updated).")
+            return result
         except Exception as e:
             print(f"[Discovery] Persistence Error: {e}")
             db.rollback()
+            return None
         finally:
             db.close()
 
+    def _load_from_db(self, niche: str, limit: int = 50) -> List[ContentCandidate]:
+        db = SessionLocal()
+        try:
+            db_results = db.query(ContentCandidateDB).filter(
+                ContentCandidateDB.niche == niche
+            ).order_by(ContentCandidateDB.views.desc()).limit(limit).all()
+
+            return [candidate_from_row(r) for r in db_results]
+        finally:
+            db.close()
+
+    def _load_for_refresh(
+        self,
+        niche: str,
+        platform: str,
+        horizon_start: Optional[datetime.datetime],
+        skip_ids: set
+    ) -> List[ContentCandidate]:
+        """Stored candidates of one platform within the horizon, strongest first (DISCOVERY_REFRESH_LIMIT)."""
+        db = SessionLocal()
+        try:
+            query = db.query(ContentCandidateDB).filter(
+                ContentCandidateDB.niche == niche,
+                ContentCandidateDB.platform == platform
+            )
+            if horizon_start is not None:
+                query = query.filter(ContentCandidateDB.discovery_date >= horizon_start.replace(tzinfo=None))
+            if skip_ids:
+                query = query.filter(ContentCandidateDB.id.notin_(list(skip_ids)))
+            rows = query.order_by(ContentCandidateDB.viral_score.desc()).limit(settings.DISCOVERY_REFRESH_LIMIT).all()
+            return [candidate_from_row(r) for r in rows]
+        finally:
+            db.close()
+
+    async def _run_scanner(self, scanner, niche: str, published_after) -> List[ContentCandidate]:
+        # Per-scanner deadline; a scanner may override it with a `scan_timeout` attribute
+        timeout = getattr(scanner, "scan_timeout", None) or settings.DISCOVERY_SCANNER_TIMEOUT
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(scanner.scan_trends(niche, published_after=published_after), timeout)
+        finally:
+            # Redis write is blocking; keep it off the loop and out of the scanner's latency
+            latency = {f"scanner.{type(scanner).__name__}.latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+            self._spawn(asyncio.to_thread(record_telemetry, latency))
+
+    async def _refresh_stored(self, scanner, niche: str, horizon_start, skip_ids: set) -> List[ContentCandidate]:
+        """Fresh stats for what the scanner found earlier, via its batch lookup (if it has one)."""
+        if not getattr(scanner, "platform_name", None):
+            return []
+        try:
+            stored = await asyncio.to_thread(self._load_for_refresh, niche, scanner.platform_name, horizon_start, skip_ids)
+            refreshed = await scanner.refresh_stats(stored) if stored else []
+        except Exception as e:
+            print(f"[Discovery] Stats refresh failed ({type(scanner).__name__}): {e}")
+            return []
+        if refreshed:
+            print(f"[Discovery] Refreshed stats of {len(refreshed)} stored {scanner.platform_name} candidates for {niche}.")
+        return refreshed
+
+    async def _run_scanner_incremental(self, scanner, niche: str, since, horizon_start) -> List[ContentCandidate]:
+        """Scans only past the scanner's cursor, then batch-refreshes the stats of earlier finds."""
+        candidates = await self._run_scanner(scanner, niche, since) or []
+        await asyncio.to_thread(scan_cursors.advance, niche, type(scanner).__name__, candidates)
+        return candidates + await self._refresh_stored(scanner, niche, horizon_start, {c.id for c in candidates})
+
+    async def _hash_thumbnails(self, candidates: List[ContentCandidate]):
+        if settings.DISCOVERY_DEDUP_THUMBNAILS:
+            try:
+                await near_duplicates.hash_thumbnails(candidates)
+            except Exception as e:
+                print(f"[Discovery] Thumbnail hashing failed: {e}")
+
+    async def _dedupe(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        """Collapses cross-platform copies of the same clip into one canonical candidate each."""
+        await self._hash_thumbnails(candidates)
+        return await asyncio.to_thread(near_duplicates.dedupe, candidates)
+
+    async def _dedupe_batch(
+        self, deduper: StreamDeduper, candidates: List[ContentCandidate]
+    ) -> Tuple[List[ContentCandidate], List[ContentCandidate]]:
+        """Streamed batches: (new canonicals, earlier canonicals whose cluster grew)."""
+        await self._hash_thumbnails(candidates)
+        return await asyncio.to_thread(deduper.add, candidates)
+
+    async def _persist_late_results(
+        self,
+        niche: str,
+        pending: Dict[asyncio.Task, str],
+        threshold: Optional[int],
+        deduper: StreamDeduper
+    ):
+        """
+        Waits out scanners that missed the latency budget and stores whatever they return,
+        folding copies of clips the scan already returned into those candidates.
+        """
+        late = []
+        for task, name in pending.items():
+            try:
+                late.extend(self._apply_threshold(await task, threshold))
+            except Exception as e:
+                print(f"[Discovery] Late scanner {name} failed: {e}")
+        if late:
+            fresh, regrouped = await self._dedupe_batch(deduper, late)
+            await asyncio.to_thread(self._persist_candidates, niche, fresh + regrouped)
+            print(f"[Discovery] Persisted {len(fresh)} late candidates for {niche} ({len(late) - len(fresh)} were duplicates).")
+
+    async def stream_trending_content(
+        self,
+        niche: str,
+        horizon: str = "30d",
+        tier: str = "free",
+        latency_budget: Optional[float] = None,
+        persist: bool = True,
+        use_cache: bool = True,
+        incremental: bool = False
+    ) -> AsyncIterator[Tuple[str, List[ContentCandidate]]]:
+        """
+        Scatter/gather over all active scanners. Yields (scanner_name, candidates) as each
+        scanner finishes, stopping once `latency_budget` seconds have passed
+        (settings.DISCOVERY_LATENCY_BUDGET by default; <= 0 waits for every scanner).
+        With `persist`, each batch is deduplicated against what the stream already returned
+        and stored in the background as it arrives (without `persist`, the caller dedupes
+        and stores the gathered list). Scanners still running at the deadline keep going and
+        their results are deduplicated the same way and stored when they land.
+        use_cache=False always scans (scheduled sweeps measure what each scan finds).
+        With `incremental`, each scanner only asks for content newer than its cursor for the
+        niche (see cursors.py) and stored candidates come back with refreshed stats.
+        """
+        cached = self._cached_trends(niche, horizon) if use_cache else None
+        if cached is not None:
+            yield "cache", cached
+            return
+
+        print(f"[Discovery] Cache MISS for {niche} ({horizon}), scanning...")
+        if latency_budget is None:
+            latency_budget = settings.DISCOVERY_LATENCY_BUDGET
+        published_after = self._published_after(horizon)
+        threshold = await asyncio.to_thread(self._selective_threshold)
+        scanners = self._active_scanners(tier)
+
+        if incremental:
+            cursors = await asyncio.to_thread(scan_cursors.load, niche, [type(s).__name__ for s in scanners])
+            runs = [
+                self._run_scanner_incremental(
+                    scanner, niche, scan_cursors.since(cursors.get(type(scanner).__name__), published_after), published_after
+                )
+                for scanner in scanners
+            ]
+        else:
+            runs = [self._run_scanner(scanner, niche, published_after) for scanner in scanners]
+
+        deduper = StreamDeduper(near_duplicates)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + latency_budget if latency_budget and latency_budget > 0 else None
+        pending: Dict[asyncio.Task, str] = {
+            asyncio.ensure_future(run): type(scanner).__name__
+            for run, scanner in zip(runs, scanners)
+        }
+
+        try:
+            while pending:
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # Latency budget spent
+
+                for task in done:
+                    name = pending.pop(task)
+                    try:
+                        candidates = task.result()
+                    except asyncio.TimeoutError:
+                        print(f"[Discovery] Scanner {name} exceeded its deadline.")
+                        continue
+                    except Exception as e:
+                        print(f"[Discovery] Scanner Exception ({name}): {e}")
+                        continue
+
+                    candidates = self._apply_threshold(candidates or [], threshold)
+                    if not candidates:
+                        continue
+                    if persist:
+                        candidates, regrouped = await self._dedupe_batch(deduper, candidates)
+                        if candidates or regrouped:
+                            self._spawn(asyncio.to_thread(self._persist_candidates, niche, candidates + regrouped))
+                    else:
+                        deduper.observe(candidates)
+                    if candidates:
+                        yield name, candidates
+        finally:
+            if pending:
+                print(f"[Discovery] Budget reached for {niche}; {len(pending)} scanners continue in background: {list(pending.values())}")
+                self._spawn(self._persist_late_results(niche, dict(pending), threshold, deduper))
+
+    async def find_trending_content(
+        self,
+        niche: str,
+        horizon: str = "30d",
+        tier: str = "free",
+        latency_budget: Optional[float] = None,
+        use_cache: bool = True,
+        incremental: bool = False
+    ) -> List[ContentCandidate]:
+        all_candidates = []
+        from_cache = False
+        async for name, candidates in self.stream_trending_content(
+            niche, horizon, tier, latency_budget, persist=False, use_cache=use_cache, incremental=incremental
+        ):
+            from_cache = name == "cache"
+            all_candidates.extend(candidates)
+
+        if from_cache:
+            return all_candidates
+
+        # Store and rank each clip once, not once per platform that surfaced it
+        all_candidates = await self._dedupe(all_candidates)
+
+        # 3. Persistence (callers query the table right after this returns, so wait for it)
+        await asyncio.to_thread(self._persist_candidates, niche, all_candidates)
+
+        # If no results from scan, fall back to database (an empty incremental scan just means nothing new)
+        if not all_candidates and not incremental:
+            print(f"[Discovery] No scan results for {niche}, falling back to database...")
+            fallback = await asyncio.to_thread(self._load_from_db, niche)
+            threshold = await asyncio.to_thread(self._selective_threshold)
+            all_candidates = self._apply_threshold(fallback, threshold)
+
         # 5. Recursive Discovery Expansion (Autonomous Scaling)
         if len(all_candidates) > 0:
             asyncio.create_task(self._trigger_recursive_expansion(niche, all_candidates))
@@ -386,25 +537,22 @@ class DiscoveryService:
         finally:
             db.close()
 
-    async def search_content(self, query: str, limit: int = 50) -> List[ContentCandidate]:
+    async def search_content(
+        self,
+        query: str,
+        limit: int = 50,
+        niche: Optional[str] = None,
+        platform: Optional[str] = None
+    ) -> List[ContentCandidate]:
         """
-        Searches specific viral candidates by keyword (Title or Description).
+        Ranked full-text search over discovered candidates (title, niche, description),
+        prefix-matching every term and optionally narrowed to a niche and/or platform.
         Triggers a live scan if local results are insufficient.
         """
-        from api.utils.models import ContentCandidateDB
-        from sqlalchemy import or_
-
         db = SessionLocal()
         try:
-            # 1. Local Database Search
-            search_query = f"%{query}%"
-            results = db.query(ContentCandidateDB).filter(
-                or_(
-                    ContentCandidateDB.title.ilike(search_query),
-                    ContentCandidateDB.description.ilike(search_query),
-                    ContentCandidateDB.niche.ilike(search_query) 
-                )
-            ).order_by(ContentCandidateDB.views.desc()).limit(limit).all()
+            # 1. Local Index Search
+            results = content_search_index.search(db, query, niche=niche, platform=platform, limit=limit)
 
             # 2. Live Scan Trigger (Intelligence Layer)
             # If we have few results, proactively scan for the query term as a "Niche"
@@ -423,8 +571,10 @@ class DiscoveryService:
                 # We reuse find_trending_content but use the query as the niche
                 # This will populate the DB and return the fresh candidates
                 live_results = await self.find_trending_content(query, horizon="30d")
+                if platform:
+                    live_results = [c for c in live_results if c.platform == platform]
                 if live_results:
-                     return live_results
+                     return live_results[:limit]
 
             # Convert back to Pydantic models
             candidates = []
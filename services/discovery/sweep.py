@@ -0,0 +1,222 @@
+"""
+Sentinel Sweep Planner
+
+Decides which monitored niches to scan on each sentinel tick, and when:
+
+- every niche has a learned scan interval. After each scan its yield (new
+  candidates, plus how far the viral score moved) feeds an EWMA, and the interval
+  is set so a scan is expected to find ~SENTINEL_TARGET_YIELD new candidates: hot
+  niches come round sooner, stagnant ones back off up to the maximum interval;
+- a tick only considers niches that are due (next_scan_at passed or never
+  scanned), ranked by how overdue they are relative to their interval, weighted
+  by recent yield, and takes no more than the hourly scan budget allows;
+- picked niches are cut into batches of SENTINEL_SWEEP_CONCURRENCY; a batch runs
+  its niches concurrently in one worker event loop, sharing the warm scanner
+  HTTP pools and API clients;
+- batches are spaced evenly across SENTINEL_SWEEP_WINDOW (Celery countdowns), so
+  scanner APIs see a steady request rate instead of a burst every tick;
+- dispatching claims a niche: next_scan_at becomes a lease running one tick past
+  the end of the sweep window, so a batch still queued (or running) when the next
+  tick comes is not dispatched again, and last_dispatched_at counts it against the budget
+  before it finishes. A finished scan replaces the lease with its learned schedule.
+"""
+
+import math
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from api.config import settings
+from api.utils.models import ContentCandidateDB, MonitoredNiche
+
+YIELD_LOOKBACK = datetime.timedelta(days=7)
+# Smoothing for the per-niche yield and score averages (weight of the newest scan)
+EWMA_ALPHA = 0.3
+# Viral score movement (points) that counts as much as one new candidate
+SCORE_POINTS_PER_CANDIDATE = 10.0
+
+
+@dataclass
+class NicheRank:
+    niche: str
+    overdue: float
+    recent_yield: int
+    priority: float
+
+
+@dataclass
+class SweepBatch:
+    countdown: float
+    niches: List[str] = field(default_factory=list)
+
+
+class ScanIntervalModel:
+    """Learns each niche's scan interval from what its scans produce."""
+
+    def __init__(
+        self,
+        base_minutes: Optional[float] = None,
+        min_minutes: Optional[float] = None,
+        max_minutes: Optional[float] = None,
+        target_yield: Optional[float] = None
+    ):
+        self.base_minutes = base_minutes or settings.SENTINEL_BASE_INTERVAL_MINUTES
+        self.min_minutes = min_minutes or settings.SENTINEL_MIN_INTERVAL_MINUTES
+        self.max_minutes = max_minutes or settings.SENTINEL_MAX_INTERVAL_MINUTES
+        self.target_yield = target_yield or settings.SENTINEL_TARGET_YIELD
+
+    def interval_for(self, niche: MonitoredNiche) -> float:
+        """Current interval in minutes (the base interval until the niche has history)."""
+        return niche.scan_interval_minutes or self.base_minutes
+
+    def observe(
+        self,
+        niche: MonitoredNiche,
+        new_candidates: int,
+        mean_score: Optional[float],
+        now: Optional[datetime.datetime] = None
+    ) -> float:
+        """Folds one scan into the niche's history and reschedules it. Returns the new interval."""
+        now = now or datetime.datetime.utcnow()
+        velocity = float(new_candidates)
+        if mean_score is not None:
+            if niche.avg_viral_score is not None:
+                velocity += abs(mean_score - niche.avg_viral_score) / SCORE_POINTS_PER_CANDIDATE
+                niche.avg_viral_score = EWMA_ALPHA * mean_score + (1 - EWMA_ALPHA) * niche.avg_viral_score
+            else:
+                niche.avg_viral_score = mean_score
+
+        if niche.yield_ewma is None:
+            niche.yield_ewma = velocity
+        else:
+            niche.yield_ewma = EWMA_ALPHA * velocity + (1 - EWMA_ALPHA) * niche.yield_ewma
+
+        # Rescan once ~target_yield new candidates are expected to have accumulated
+        expected_rate = niche.yield_ewma / self.base_minutes
+        interval = self.target_yield / expected_rate if expected_rate > 0 else self.max_minutes
+        interval = min(max(interval, self.min_minutes), self.max_minutes)
+
+        niche.scan_interval_minutes = round(interval, 1)
+        niche.last_scanned_at = now
+        niche.next_scan_at = now + datetime.timedelta(minutes=interval)
+        return interval
+
+    def defer(self, niche: MonitoredNiche, now: Optional[datetime.datetime] = None):
+        """After a failed scan: retry after the minimum interval instead of every tick."""
+        now = now or datetime.datetime.utcnow()
+        niche.next_scan_at = now + datetime.timedelta(minutes=self.min_minutes)
+
+
+class SweepPlanner:
+    def __init__(
+        self,
+        window: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        budget_per_hour: Optional[int] = None,
+        tick_interval: Optional[float] = None,
+        intervals: Optional[ScanIntervalModel] = None
+    ):
+        self.window = settings.SENTINEL_SWEEP_WINDOW if window is None else window
+        self.concurrency = max(1, concurrency or settings.SENTINEL_SWEEP_CONCURRENCY)
+        self.budget_per_hour = settings.SENTINEL_SCAN_BUDGET_PER_HOUR if budget_per_hour is None else budget_per_hour
+        self.tick_interval = tick_interval or settings.SENTINEL_TICK_INTERVAL
+        self.intervals = intervals or scan_intervals
+
+    def due_niches(self, db: Session, now: datetime.datetime) -> List[MonitoredNiche]:
+        return db.query(MonitoredNiche).filter(
+            MonitoredNiche.is_active == True,
+            or_(MonitoredNiche.next_scan_at == None, MonitoredNiche.next_scan_at <= now)
+        ).all()
+
+    def recent_yield(self, db: Session, niches: Sequence[str], now: datetime.datetime) -> Dict[str, int]:
+        """New candidates per niche since now - YIELD_LOOKBACK (one grouped query)."""
+        rows = (
+            db.query(ContentCandidateDB.niche, func.count(ContentCandidateDB.id))
+            .filter(
+                ContentCandidateDB.niche.in_(list(niches)),
+                ContentCandidateDB.discovery_date >= now - YIELD_LOOKBACK
+            )
+            .group_by(ContentCandidateDB.niche)
+            .all()
+        )
+        return {niche: count for niche, count in rows}
+
+    def tick_allowance(self, db: Session, now: datetime.datetime) -> int:
+        """Scans this tick may start: its share of the hourly budget, minus scans dispatched or run this hour."""
+        if self.budget_per_hour <= 0:
+            return 0
+        hour_ago = now - datetime.timedelta(hours=1)
+        last_hour = db.query(func.count(MonitoredNiche.id)).filter(
+            or_(MonitoredNiche.last_dispatched_at >= hour_ago, MonitoredNiche.last_scanned_at >= hour_ago)
+        ).scalar() or 0
+        share = math.ceil(self.budget_per_hour * self.tick_interval / 3600)
+        return max(min(share, self.budget_per_hour - last_hour), 0)
+
+    def rank(self, niches: Sequence[MonitoredNiche], yields: Dict[str, int], now: datetime.datetime) -> List[NicheRank]:
+        """
+        Highest priority first. Overdue is elapsed time over the niche's interval; a
+        niche never scanned counts as one full lookback overdue, so new niches lead.
+        """
+        ranked = []
+        for n in niches:
+            interval_hours = self.intervals.interval_for(n) / 60
+            if n.last_scanned_at is None:
+                elapsed_hours = YIELD_LOOKBACK.total_seconds() / 3600
+            else:
+                elapsed_hours = max((now - n.last_scanned_at).total_seconds() / 3600, 0.0)
+            overdue = elapsed_hours / interval_hours
+            recent = yields.get(n.niche, 0)
+            ranked.append(NicheRank(n.niche, overdue, recent, overdue * (1 + math.log1p(recent))))
+        ranked.sort(key=lambda r: (-r.priority, r.niche))
+        return ranked
+
+    def plan(
+        self,
+        db: Session,
+        niches: Optional[Sequence[MonitoredNiche]] = None,
+        now: Optional[datetime.datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[SweepBatch]:
+        """
+        Batches for this tick. Defaults to the due niches within the budget allowance;
+        pass `niches`/`limit` to plan an explicit set.
+        """
+        now = now or datetime.datetime.utcnow()
+        if niches is None:
+            niches = self.due_niches(db, now)
+        if limit is None:
+            limit = self.tick_allowance(db, now)
+        if not niches or limit <= 0:
+            return []
+        ranked = self.rank(niches, self.recent_yield(db, [n.niche for n in niches], now), now)[:limit]
+
+        batches = [
+            SweepBatch(0.0, [r.niche for r in ranked[i:i + self.concurrency]])
+            for i in range(0, len(ranked), self.concurrency)
+        ]
+        spacing = self.window / len(batches) if self.window > 0 else 0.0
+        for i, batch in enumerate(batches):
+            batch.countdown = round(i * spacing, 1)
+        return batches
+
+    def claim(self, db: Session, batches: Sequence[SweepBatch], now: Optional[datetime.datetime] = None):
+        """
+        Leases the planned niches until one tick after the sweep window closes, so later
+        ticks skip them while they wait or run (a batch that hasn't reported back by
+        then is treated as lost). The caller owns the commit.
+        """
+        now = now or datetime.datetime.utcnow()
+        niches = [niche for batch in batches for niche in batch.niches]
+        if not niches:
+            return
+        lease = now + datetime.timedelta(seconds=self.window + self.tick_interval)
+        for row in db.query(MonitoredNiche).filter(MonitoredNiche.niche.in_(niches)):
+            row.next_scan_at = lease
+            row.last_dispatched_at = now
+
+
+scan_intervals = ScanIntervalModel()
+sweep_planner = SweepPlanner()
@@ -1,44 +1,110 @@
 from api.utils.celery import celery_app
 from api.utils.database import SessionLocal
-from api.utils.models import MonitoredNiche
+from api.utils.models import MonitoredNiche, ContentCandidateDB
+from api.utils.settings_snapshot import current_settings
 from services.discovery.service import base_discovery_service
+from services.discovery.sweep import sweep_planner, scan_intervals
+from sqlalchemy import func
 from datetime import datetime
+from typing import List
 import asyncio
 
 @celery_app.task(name="discovery.sentinel_watcher")
 def sentinel_trend_watcher():
     """
-    Background task that iterates through all active niches and triggers discovery.
-    If AUTO_PILOT is enabled, it triggers the Viral Loop for autonomous processing.
+    Runs every SENTINEL_TICK_INTERVAL: picks the niches that are due (each has a
+    learned scan interval), within the hourly scan budget, and schedules them as
+    batches spread across the sweep window (see SweepPlanner). Returns immediately.
+    If AUTO_PILOT is enabled, each niche runs the Viral Loop for autonomous processing.
     """
-    from api.utils.models import SystemSettings
-    from services.optimization.viral_loop import base_viral_loop
-    
     db = SessionLocal()
     try:
         # Check for Auto-Pilot setting
-        auto_pilot_setting = db.query(SystemSettings).filter(SystemSettings.key == "auto_pilot").first()
-        is_auto_pilot = auto_pilot_setting.value.lower() == "true" if auto_pilot_setting else False
-        
-        niches = db.query(MonitoredNiche).filter(MonitoredNiche.is_active == True).all()
-        print(f"[Sentinel] Monitoring {len(niches)} active niches (Auto-Pilot: {is_auto_pilot})...")
-        
-        for n in niches:
-            if is_auto_pilot:
-                # Trigger Master Viral Loop (Discovery -> Pick Winner -> Render -> Publish)
-                loop = asyncio.get_event_loop()
-                loop.run_until_complete(base_viral_loop.execute_autonomous_cycle(n.niche))
-            else:
-                # Standard Mode: Just scan trends and update DB for UI review
-                scan_trends_task.delay(n.niche)
-            
-            # Update last scanned time
-            n.last_scanned_at = datetime.utcnow()
-        
+        is_auto_pilot = current_settings().get_bool("auto_pilot")
+        batches = sweep_planner.plan(db)
+        # Claim before dispatching so a late batch isn't picked again by the next tick
+        sweep_planner.claim(db, batches)
         db.commit()
     finally:
         db.close()
-    return {"status": "dispatched", "niche_count": len(niches), "auto_pilot": is_auto_pilot}
+
+    niche_count = sum(len(batch.niches) for batch in batches)
+    print(f"[Sentinel] Scanning {niche_count} due niches in {len(batches)} batches (Auto-Pilot: {is_auto_pilot})...")
+    for batch in batches:
+        scan_niche_batch_task.apply_async(args=[batch.niches, is_auto_pilot], countdown=batch.countdown)
+
+    return {
+        "status": "dispatched",
+        "niche_count": niche_count,
+        "batch_count": len(batches),
+        "auto_pilot": is_auto_pilot
+    }
+
+@celery_app.task(name="discovery.scan_niche_batch")
+def scan_niche_batch_task(niches: List[str], auto_pilot: bool = False):
+    """
+    Scans one sweep batch concurrently in a single event loop, then feeds what each
+    scan found into the niche's learned scan interval.
+    Auto-pilot runs the full Viral Loop (Discovery -> Pick Winner -> Render -> Publish)
+    per niche; standard mode only refreshes trends in the DB for UI review.
+    """
+    from services.optimization.viral_loop import base_viral_loop
+
+    # Nobody waits on sweep results, so let every scanner finish; skip the trends
+    # cache so the yield measured below comes from a real scan. Incremental: each
+    # scanner only fetches what is newer than its cursor, stored finds get fresh stats
+    scan_options = {"latency_budget": 0, "use_cache": False, "incremental": True}
+
+    async def scan(niche: str):
+        if auto_pilot:
+            await base_viral_loop.execute_autonomous_cycle(niche, **scan_options)
+            return None
+        return await base_discovery_service.find_trending_content(niche, **scan_options)
+
+    started = datetime.utcnow()
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    results = loop.run_until_complete(asyncio.gather(*(scan(n) for n in niches), return_exceptions=True))
+
+    outcomes = dict(zip(niches, results))
+    scanned = [n for n in niches if not isinstance(outcomes[n], Exception)]
+    for niche in niches:
+        if niche not in scanned:
+            print(f"[Sentinel] Sweep scan failed for {niche}: {outcomes[niche]}")
+
+    intervals = {}
+    db = SessionLocal()
+    try:
+        # discovery_date keeps the first sighting, so rows dated after `started` are new
+        new_counts = dict(
+            db.query(ContentCandidateDB.niche, func.count(ContentCandidateDB.id))
+            .filter(ContentCandidateDB.niche.in_(scanned), ContentCandidateDB.discovery_date >= started)
+            .group_by(ContentCandidateDB.niche)
+            .all()
+        ) if scanned else {}
+        now = datetime.utcnow()
+        for row in db.query(MonitoredNiche).filter(MonitoredNiche.niche.in_(niches)):
+            result = outcomes[row.niche]
+            if isinstance(result, Exception):
+                scan_intervals.defer(row, now)
+                continue
+            scores = [c.viral_score for c in result or []]
+            mean_score = sum(scores) / len(scores) if scores else None
+            intervals[row.niche] = scan_intervals.observe(row, new_counts.get(row.niche, 0), mean_score, now)
+        db.commit()
+    finally:
+        db.close()
+
+    return {
+        "status": "success",
+        "scanned": scanned,
+        "failed": [n for n in niches if n not in scanned],
+        "new_counts": {n: new_counts.get(n, 0) for n in scanned},
+        "next_interval_minutes": {n: round(i, 1) for n, i in intervals.items()}
+    }
 
 @celery_app.task(name="discovery.scan_trends")
 def scan_trends_task(niche: str):
@@ -48,7 +114,8 @@ def scan_trends_task(niche: str):
     print(f"[Discovery Task] Automated scan for: {niche}")
     # DiscoveryService is async, so we run it in a loop
     loop = asyncio.get_event_loop()
-    candidates = loop.run_until_complete(base_discovery_service.find_trending_content(niche))
+    # Background scans have no one waiting on them, so let every scanner finish
+    candidates = loop.run_until_complete(base_discovery_service.find_trending_content(niche, latency_budget=0))
     
     return {
         "status": "success", 
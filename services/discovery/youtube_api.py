@@ -0,0 +1,47 @@
+"""
+YouTube Data API helpers shared by the Shorts and Long-form scanners.
+"""
+
+from typing import Callable, Dict, List
+
+from .models import ContentCandidate
+
+# videos().list accepts at most 50 ids per call (1 quota unit regardless of count)
+VIDEOS_LIST_MAX_IDS = 50
+
+
+def fetch_video_details(youtube, video_ids: List[str], part: str = "statistics,contentDetails") -> Dict[str, dict]:
+    """
+    Fetches statistics/contentDetails for many videos in as few videos().list calls as
+    possible. Blocking (googleapiclient); call it from a worker thread.
+    Returns {video_id: video_resource}; ids the API doesn't return are omitted.
+    """
+    details: Dict[str, dict] = {}
+    unique_ids = list(dict.fromkeys(video_ids))
+    for i in range(0, len(unique_ids), VIDEOS_LIST_MAX_IDS):
+        chunk = unique_ids[i:i + VIDEOS_LIST_MAX_IDS]
+        # No maxResults: the API rejects it together with `id`, and the ids already bound the result
+        response = youtube.videos().list(
+            id=",".join(chunk),
+            part=part
+        ).execute()
+        for item in response.get("items", []):
+            details[item["id"]] = item
+    return details
+
+
+def refresh_statistics(
+    youtube,
+    candidates: List[ContentCandidate],
+    id_prefix: str,
+    rescore: Callable[[ContentCandidate, dict], ContentCandidate]
+) -> List[ContentCandidate]:
+    """
+    Current statistics for stored candidates (ids are `id_prefix` + video id) at one
+    quota unit per 50 videos, instead of re-running search (100 units per call).
+    `rescore` builds the updated candidate from the old one and the new statistics.
+    Videos the API no longer returns (deleted/private) are left out. Blocking.
+    """
+    by_video = {c.id[len(id_prefix):]: c for c in candidates if c.id.startswith(id_prefix)}
+    details = fetch_video_details(youtube, list(by_video), part="statistics")
+    return [rescore(by_video[video_id], item.get("statistics", {})) for video_id, item in details.items()]
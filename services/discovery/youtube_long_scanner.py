@@ -4,10 +4,14 @@ from typing import List, Optional
 import random
 from api.config import settings
 from googleapiclient.discovery import build
+from .youtube_api import fetch_video_details, refresh_statistics
+import asyncio
 import datetime
 import re
 
 class YouTubeLongScanner(TrendScanner):
+    platform_name = "YouTube (Pillar)"
+
     async def scan_trends(self, niche: str, published_after: Optional[datetime.datetime] = None) -> List[ContentCandidate]:
         """
         Scans YouTube for high-performance long-form videos (4-20 mins) in a niche.
@@ -16,74 +20,96 @@ class YouTubeLongScanner(TrendScanner):
             return []
 
         try:
-            youtube = build("youtube", "v3", developerKey=settings.YOUTUBE_API_KEY)
-            
-            # Search for 'medium' duration (4 to 20 mins)
-            search_params = {
-                "q": f"{niche} guide",
-                "part": "id,snippet",
-                "maxResults": 5,
-                "type": "video",
-                "videoDuration": "medium",
-                "relevanceLanguage": "en",
-                "order": "viewCount"
-            }
-            
-            if published_after:
-                search_params["publishedAfter"] = published_after.isoformat().replace("+00:00", "") + "Z"
+            # googleapiclient is blocking; keep the whole exchange off the event loop
+            return await asyncio.to_thread(self._scan_sync, niche, published_after)
+        except Exception as e:
+            print(f"[YouTubeLongScanner] ERROR: {str(e)}")
+            return []
 
-            search_response = youtube.search().list(**search_params).execute()
+    def _scan_sync(self, niche: str, published_after: Optional[datetime.datetime] = None) -> List[ContentCandidate]:
+        youtube = build("youtube", "v3", developerKey=settings.YOUTUBE_API_KEY)
+        
+        # Search for 'medium' duration (4 to 20 mins)
+        search_params = {
+            "q": f"{niche} guide",
+            "part": "id,snippet",
+            "maxResults": 5,
+            "type": "video",
+            "videoDuration": "medium",
+            "relevanceLanguage": "en",
+            "order": "viewCount"
+        }
+        
+        if published_after:
+            search_params["publishedAfter"] = published_after.isoformat().replace("+00:00", "") + "Z"
 
-            candidates = []
-            for item in search_response.get("items", []):
-                video_id = item["id"]["videoId"]
-                snippet = item["snippet"]
-                
-                video_response = youtube.videos().list(
-                    id=video_id,
-                    part="statistics,contentDetails"
-                ).execute()
-                
-                if not video_response.get("items"): continue
-                
-                v_data = video_response["items"][0]
-                stats = v_data["statistics"]
-                # Duration is in ISO 8601 (e.g. PT10M30S)
-                duration_raw = v_data["contentDetails"]["duration"]
-                duration_seconds = self._parse_duration(duration_raw)
-                
-                views = int(stats.get("viewCount", 0))
-                engagement_score = self._calculate_engagement(stats)
-                
-                # Calculate viral score (Pillar specific)
-                pub_date_str = snippet.get("publishedAt")
-                viral_score = self._calculate_viral_score(views, pub_date_str, engagement_score)
+        search_response = youtube.search().list(**search_params).execute()
+        items = search_response.get("items", [])
+        details = fetch_video_details(youtube, [item["id"]["videoId"] for item in items])
 
-                candidates.append(ContentCandidate(
-                    id=f"yt_long_{video_id}",
-                    platform="YouTube (Pillar)",
-                    url=f"https://youtube.com/watch?v={video_id}",
-                    author=snippet.get("channelTitle", "Unknown"),
-                    title=snippet.get("title", "No Title"),
-                    view_count=views, # Legacy
-                    engagement_rate=engagement_score, # Legacy
-                    views=views,
-                    engagement_score=engagement_score,
-                    viral_score=viral_score,
-                    duration_seconds=float(duration_seconds),
-                    tags=[niche, "Pillar", "Long-Form"],
-                    metadata={
-                        "published_at": pub_date_str,
-                        "duration": duration_raw,
-                        "type": "pillar"
-                    }
-                ))
+        candidates = []
+        for item in items:
+            video_id = item["id"]["videoId"]
+            snippet = item["snippet"]
+            
+            if video_id not in details: continue
             
-            return candidates
+            v_data = details[video_id]
+            stats = v_data["statistics"]
+            # Duration is in ISO 8601 (e.g. PT10M30S)
+            duration_raw = v_data["contentDetails"]["duration"]
+            duration_seconds = self._parse_duration(duration_raw)
+            
+            views = int(stats.get("viewCount", 0))
+            engagement_score = self._calculate_engagement(stats)
+            
+            # Calculate viral score (Pillar specific)
+            pub_date_str = snippet.get("publishedAt")
+            viral_score = self._calculate_viral_score(views, pub_date_str, engagement_score)
 
-        except Exception as e:
-            print(f"[YouTubeLongScanner] ERROR: {str(e)}")
+            candidates.append(ContentCandidate(
+                id=f"yt_long_{video_id}",
+                platform=self.platform_name,
+                url=f"https://youtube.com/watch?v={video_id}",
+                author=snippet.get("channelTitle", "Unknown"),
+                title=snippet.get("title", "No Title"),
+                view_count=views, # Legacy
+                engagement_rate=engagement_score, # Legacy
+                views=views,
+                engagement_score=engagement_score,
+                viral_score=viral_score,
+                duration_seconds=float(duration_seconds),
+                tags=[niche, "Pillar", "Long-Form"],
+                metadata={
+                    "published_at": pub_date_str,
+                    "duration": duration_raw,
+                    "video_id": video_id,
+                    "type": "pillar"
+                }
+            ))
+        
+        return candidates
+
+    async def refresh_stats(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        if not settings.YOUTUBE_API_KEY or not candidates:
             return []
+        return await asyncio.to_thread(self._refresh_sync, candidates)
+
+    def _refresh_sync(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        youtube = build("youtube", "v3", developerKey=settings.YOUTUBE_API_KEY)
+        return refresh_statistics(youtube, candidates, "yt_long_", self._rescore)
+
+    def _rescore(self, candidate: ContentCandidate, stats: dict) -> ContentCandidate:
+        views = int(stats.get("viewCount", 0))
+        engagement_score = self._calculate_engagement(stats)
+        pub_date_str = (candidate.metadata or {}).get("published_at")
+        return candidate.model_copy(update={
+            "views": views,
+            "view_count": views,
+            "engagement_score": engagement_score,
+            "engagement_rate": engagement_score,
+            "viral_score": self._calculate_viral_score(views, pub_date_str, engagement_score)
+        })
 
     def _calculate_engagement(self, stats: dict) -> float:
         views = int(stats.get("viewCount", 1))
@@ -4,12 +4,16 @@ from typing import List, Optional
 import random
 from api.config import settings
 from googleapiclient.discovery import build
+from .youtube_api import fetch_video_details, refresh_statistics
+import asyncio
 import datetime
 import re
 
 from api.utils.vault import get_secret
 
 class YouTubeShortsScanner(TrendScanner):
+    platform_name = "YouTube Shorts"
+
     async def scan_trends(self, niche: str, published_after: Optional[datetime.datetime] = None) -> List[ContentCandidate]:
         """
         Scans YouTube for trending Shorts in a specific niche using the Data API v3.
@@ -20,78 +24,101 @@ class YouTubeShortsScanner(TrendScanner):
             raise ValueError("YouTube API key not configured. Please set YOUTUBE_API_KEY in environment.")
 
         try:
-            youtube = build("youtube", "v3", developerKey=api_key)
+            # googleapiclient is blocking; keep the whole exchange off the event loop
+            return await asyncio.to_thread(self._scan_sync, api_key, niche, published_after)
+        except Exception as e:
+            print(f"[YouTubeScanner] ERROR: {str(e)}")
+            raise ValueError(f"YouTube API error: {str(e)}")
+
+    def _scan_sync(self, api_key: str, niche: str, published_after: Optional[datetime.datetime] = None) -> List[ContentCandidate]:
+        youtube = build("youtube", "v3", developerKey=api_key)
+        
+        # 1. Search for trending videos in the niche
+        # We filter for 'short' duration and 'video' type
+        search_params = {
+            "q": f"{niche} #shorts",
+            "part": "id,snippet",
+            "maxResults": 10,
+            "type": "video",
+            "videoDuration": "short",
+            "relevanceLanguage": "en",
+            "order": "viewCount"
+        }
+        
+        if published_after:
+            search_params["publishedAfter"] = published_after.isoformat().replace("+00:00", "") + "Z"
+
+        search_response = youtube.search().list(**search_params).execute()
+        items = search_response.get("items", [])
+
+        # 2. Get detailed video stats for every result in one batched call
+        details = fetch_video_details(youtube, [item["id"]["videoId"] for item in items])
+
+        candidates = []
+        for item in items:
+            video_id = item["id"]["videoId"]
+            snippet = item["snippet"]
             
-            # 1. Search for trending videos in the niche
-            # We filter for 'short' duration and 'video' type
-            search_params = {
-                "q": f"{niche} #shorts",
-                "part": "id,snippet",
-                "maxResults": 10,
-                "type": "video",
-                "videoDuration": "short",
-                "relevanceLanguage": "en",
-                "order": "viewCount"
-            }
+            video_data = details.get(video_id, {})
+            stats = video_data.get("statistics", {})
+            content_details = video_data.get("contentDetails", {})
             
-            if published_after:
-                search_params["publishedAfter"] = published_after.isoformat().replace("+00:00", "") + "Z"
-
-            search_response = youtube.search().list(**search_params).execute()
-
-            candidates = []
-            for item in search_response.get("items", []):
-                video_id = item["id"]["videoId"]
-                snippet = item["snippet"]
-                
-                # 2. Get detailed video stats
-                video_response = youtube.videos().list(
-                    id=video_id,
-                    part="statistics,contentDetails"
-                ).execute()
-                
-                video_data = video_response["items"][0] if video_response.get("items") else {}
-                stats = video_data.get("statistics", {})
-                content_details = video_data.get("contentDetails", {})
-                
-                # Parse duration
-                duration_str = content_details.get("duration", "PT0S")
-                duration_seconds = self._parse_duration(duration_str)
-                
-                views = int(stats.get("viewCount", 0))
-                engagement_score = self._calculate_engagement(stats)
-                
-                # Calculate viral score (Real metrics)
-                pub_date_str = snippet.get("publishedAt")
-                viral_score = self._calculate_viral_score(views, pub_date_str, engagement_score)
-
-                candidates.append(ContentCandidate(
-                    id=f"yt_{video_id}",
-                    platform="YouTube Shorts",
-                    url=f"https://youtube.com/shorts/{video_id}",
-                    author=snippet.get("channelTitle", "Unknown"),
-                    title=snippet.get("title", "No Title"),
-                    view_count=views, # Legacy
-                    engagement_rate=engagement_score, # Legacy
-                    views=views,
-                    engagement_score=engagement_score,
-                    viral_score=viral_score,
-                    duration_seconds=float(duration_seconds),
-                    tags=[niche, "Shorts", "Trending"],
-                    thumbnail_url=snippet.get("thumbnails", {}).get("high", {}).get("url") or snippet.get("thumbnails", {}).get("default", {}).get("url"),
-                    metadata={
-                        "published_at": pub_date_str,
-                        "thumbnails": snippet.get("thumbnails"),
-                        "video_id": video_id,
-                        "duration": duration_str
-                    }
-                ))
+            # Parse duration
+            duration_str = content_details.get("duration", "PT0S")
+            duration_seconds = self._parse_duration(duration_str)
             
-            return candidates
+            views = int(stats.get("viewCount", 0))
+            engagement_score = self._calculate_engagement(stats)
+            
+            # Calculate viral score (Real metrics)
+            pub_date_str = snippet.get("publishedAt")
+            viral_score = self._calculate_viral_score(views, pub_date_str, engagement_score)
 
-        except Exception as e:
-            print(f"[YouTubeScanner] ERROR: {str(e)}")
-            raise ValueError(f"YouTube API error: {str(e)}")
+            candidates.append(ContentCandidate(
+                id=f"yt_{video_id}",
+                platform=self.platform_name,
+                url=f"https://youtube.com/shorts/{video_id}",
+                author=snippet.get("channelTitle", "Unknown"),
+                title=snippet.get("title", "No Title"),
+                view_count=views, # Legacy
+                engagement_rate=engagement_score, # Legacy
+                views=views,
+                engagement_score=engagement_score,
+                viral_score=viral_score,
+                duration_seconds=float(duration_seconds),
+                tags=[niche, "Shorts", "Trending"],
+                thumbnail_url=snippet.get("thumbnails", {}).get("high", {}).get("url") or snippet.get("thumbnails", {}).get("default", {}).get("url"),
+                metadata={
+                    "published_at": pub_date_str,
+                    "thumbnails": snippet.get("thumbnails"),
+                    "video_id": video_id,
+                    "duration": duration_str
+                }
+            ))
+        
+        return candidates
+
+    async def refresh_stats(self, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        api_key = get_secret("youtube_api_key")
+        if not api_key or not candidates:
+            return []
+        return await asyncio.to_thread(self._refresh_sync, api_key, candidates)
+
+    def _refresh_sync(self, api_key: str, candidates: List[ContentCandidate]) -> List[ContentCandidate]:
+        youtube = build("youtube", "v3", developerKey=api_key)
+        return refresh_statistics(youtube, candidates, "yt_", self._rescore)
+
+    def _rescore(self, candidate: ContentCandidate, stats: dict) -> ContentCandidate:
+        views = int(stats.get("viewCount", 0))
+        engagement_score = self._calculate_engagement(stats)
+        pub_date_str = (candidate.metadata or {}).get("published_at")
+        return candidate.model_copy(update={
+            "views": views,
+            "view_count": views,
+            "engagement_score": engagement_score,
+            "engagement_rate": engagement_score,
+            "viral_score": self._calculate_viral_score(views, pub_date_str, engagement_score)
+        })
 
     def _calculate_engagement(self, stats: dict) -> float:
         views = int(stats.get("viewCount", 1))
@@ -0,0 +1,12 @@
+from api.utils.celery import celery_app
+from .telemetry import sample_system, record
+import logging
+
+@celery_app.task(name="monitoring.sample_telemetry", ignore_result=True)
+def sample_telemetry_task():
+    """
+    Periodic sample of broker, database and disk health for the live telemetry feed.
+    """
+    metrics = sample_system()
+    record(metrics)
+    logging.debug(f"[Telemetry] Sampled {len(metrics)} metrics.")
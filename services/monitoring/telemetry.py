@@ -0,0 +1,210 @@
+"""
+Worker Telemetry
+================
+Workers push operational metrics into Redis; /ws/telemetry streams them.
+
+- `telemetry:latest` (hash): newest value of every metric
+- `telemetry:series:{metric}` (list): ring buffer of the last TELEMETRY_HISTORY
+  "timestamp:value" samples, newest first
+- `telemetry:renders` (sorted set): renders in progress, scored by start time so
+  entries left behind by a crashed worker age out
+
+Metric names are flat and dotted (`queue.celery.depth`, `scanner.TikTokScanner.latency_ms`,
+`renders.<node>`), which keeps the socket's delta encoding a plain dict diff.
+
+Recording is fire-and-forget: telemetry must never fail or slow down the work it
+measures.
+"""
+
+import time
+import uuid
+import shutil
+import socket
+import logging
+import contextlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from api.config import settings
+from api.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LATEST_KEY = "telemetry:latest"
+RENDERS_KEY = "telemetry:renders"
+STORAGE_LEASE_KEY = "telemetry:storage_lease"
+NODE = socket.gethostname()
+
+
+def series_key(metric: str) -> str:
+    return f"telemetry:series:{metric}"
+
+
+def record(metrics: Dict[str, float]):
+    """Stores the latest value and appends to each metric's ring buffer (one round trip)."""
+    if not metrics:
+        return
+    now = round(time.time(), 3)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hset(LATEST_KEY, mapping={name: value for name, value in metrics.items()})
+        for name, value in metrics.items():
+            pipe.lpush(series_key(name), f"{now}:{value}")
+            pipe.ltrim(series_key(name), 0, settings.TELEMETRY_HISTORY - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"[Telemetry] Dropped {list(metrics)}: {e}")
+
+
+@contextlib.contextmanager
+def track_render():
+    """Counts the enclosed block as an active render on this node."""
+    member = f"{NODE}|{uuid.uuid4().hex}"
+    try:
+        get_redis().zadd(RENDERS_KEY, {member: time.time()})
+    except Exception as e:
+        logger.debug(f"[Telemetry] Render tracking unavailable: {e}")
+    try:
+        yield
+    finally:
+        try:
+            get_redis().zrem(RENDERS_KEY, member)
+        except Exception:
+            pass
+
+
+def record_encode(frames: float, seconds: float):
+    """Encode throughput of a finished render, overall and for this node."""
+    if frames > 0 and seconds > 0:
+        fps = round(frames / seconds, 1)
+        record({"render.encode_fps": fps, f"render.encode_fps.{NODE}": fps})
+
+
+def _timed_ms(fn) -> Optional[float]:
+    started = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        logger.debug(f"[Telemetry] Probe failed: {e}")
+        return None
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _postgres_ping():
+    from sqlalchemy import text
+    from api.utils.database import SessionLocal
+    with SessionLocal() as db:
+        db.execute(text("SELECT 1"))
+
+
+def _storage_due(r) -> bool:
+    """
+    True for one sampler per TELEMETRY_STORAGE_INTERVAL across all workers (Redis
+    SET NX lease). Sizing the outputs tree walks and stats every file, so it must
+    not run on the 15s sampling tick.
+    """
+    try:
+        return bool(r.set(STORAGE_LEASE_KEY, NODE, nx=True, ex=max(int(settings.TELEMETRY_STORAGE_INTERVAL), 1)))
+    except Exception as e:
+        logger.debug(f"[Telemetry] Storage sampling skipped: {e}")
+        return False
+
+
+def sample_system() -> Dict[str, float]:
+    """
+    Samples the infrastructure signals no single task owns: broker queue depth,
+    Redis/Postgres round-trip latency and disk usage of the render output volume.
+    `storage.*` (size of the outputs tree) is only refreshed every
+    TELEMETRY_STORAGE_INTERVAL; the dashboards keep showing the last value.
+    """
+    from services.storage.manager import storage_manager
+
+    metrics: Dict[str, float] = {}
+    r = get_redis()
+    try:
+        pipe = r.pipeline(transaction=False)
+        for queue in settings.TELEMETRY_QUEUES.split(","):
+            pipe.llen(queue.strip())
+        for queue, depth in zip(settings.TELEMETRY_QUEUES.split(","), pipe.execute()):
+            metrics[f"queue.{queue.strip()}.depth"] = depth
+    except Exception as e:
+        logger.debug(f"[Telemetry] Queue depth unavailable: {e}")
+
+    for name, probe in (("redis", r.ping), ("postgres", _postgres_ping)):
+        latency = _timed_ms(probe)
+        if latency is not None:
+            metrics[f"{name}.latency_ms"] = latency
+
+    try:
+        disk = shutil.disk_usage(storage_manager.output_dir)
+        metrics.update({
+            "disk.used_pct": round(disk.used / disk.total * 100, 1),
+            "disk.free_gb": round(disk.free / 1024 ** 3, 2),
+        })
+    except OSError as e:
+        logger.debug(f"[Telemetry] Disk usage unavailable: {e}")
+
+    if _storage_due(r):
+        try:
+            outputs = storage_manager.get_output_dir_size()
+            metrics.update({
+                "storage.outputs_gb": round(outputs / 1024 ** 3, 2),
+                "storage.threshold_pct": round(outputs / storage_manager.threshold_bytes * 100, 1),
+            })
+        except OSError as e:
+            logger.debug(f"[Telemetry] Output size unavailable: {e}")
+
+    return metrics
+
+
+def _number(value) -> float:
+    if isinstance(value, bytes):
+        value = value.decode()
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def read_latest(r) -> Dict[str, float]:
+    """Current value of every metric plus active renders per node."""
+    pipe = r.pipeline(transaction=False)
+    pipe.hgetall(LATEST_KEY)
+    pipe.zremrangebyscore(RENDERS_KEY, "-inf", time.time() - settings.TELEMETRY_RENDER_MAX_AGE)
+    pipe.zrange(RENDERS_KEY, 0, -1)
+    latest, _, renders = pipe.execute()
+
+    snapshot = {}
+    for name, value in latest.items():
+        name = name.decode() if isinstance(name, bytes) else name
+        try:
+            snapshot[name] = _number(value)
+        except ValueError:
+            continue
+    for member in renders:
+        member = member.decode() if isinstance(member, bytes) else member
+        key = f"renders.{member.split('|', 1)[0]}"
+        snapshot[key] = snapshot.get(key, 0) + 1
+    snapshot["renders.total"] = len(renders)
+    return snapshot
+
+
+def read_history(r, metrics: Iterable[str], limit: int) -> Dict[str, List[Tuple[float, float]]]:
+    """Oldest-first [timestamp, value] samples per metric, for charts on connect."""
+    metrics = list(metrics)
+    pipe = r.pipeline(transaction=False)
+    for name in metrics:
+        pipe.lrange(series_key(name), 0, limit - 1)
+    history = {}
+    for name, samples in zip(metrics, pipe.execute()):
+        points = []
+        for sample in reversed(samples):
+            ts, _, value = (sample.decode() if isinstance(sample, bytes) else sample).partition(":")
+            points.append((float(ts), _number(value)))
+        if points:
+            history[name] = points
+    return history
+
+
+def diff(previous: Dict[str, float], current: Dict[str, float]) -> Tuple[Dict[str, float], List[str]]:
+    """(changed or new values, metrics that disappeared)."""
+    changed = {k: v for k, v in current.items() if previous.get(k) != v}
+    removed = [k for k in previous if k not in current]
+    return changed, removed
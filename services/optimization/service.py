@@ -2,7 +2,8 @@ from .models import PostMetadata
 from api.config import settings
 from api.utils.os_worker import ai_worker
 from api.utils.database import SessionLocal
-from api.utils.models import AffiliateLinkDB, SystemSettings
+from api.utils.models import AffiliateLinkDB
+from api.utils.settings_snapshot import current_settings
 from services.monetization.service import base_monetization_engine
 import json
 import logging
@@ -22,12 +23,9 @@ class OptimizationService:
         
         try:
             # 1. Check Monetization Settings
-            agg_setting = db.query(SystemSettings).filter(SystemSettings.key == "monetization_aggression").first()
-            if agg_setting:
-                aggression = int(agg_setting.value)
-            
-            strategy_setting = db.query(SystemSettings).filter(SystemSettings.key == "active_monetization_strategy").first()
-            active_strategy = strategy_setting.value if strategy_setting else "affiliate"
+            system = current_settings()
+            aggression = system.get_int("monetization_aggression", aggression)
+            active_strategy = system.get("active_monetization_strategy", "affiliate")
             
             # Determine if we should harvest this time (Probability check)
             should_harvest = random.randint(1, 100) <= aggression
@@ -9,16 +9,18 @@ class ViralLoopController:
     def __init__(self):
         self.logger = logging.getLogger("ViralLoop")
 
-    async def execute_autonomous_cycle(self, niche: str, platform: str = "YouTube Shorts"):
+    async def execute_autonomous_cycle(self, niche: str, platform: str = "YouTube Shorts", **scan_options):
         """
         The Master Loop: Finds trends -> Picks Winner -> Dispatches Processing.
+        scan_options are passed to find_trending_content (sentinel sweeps scan uncached
+        and wait for every scanner).
         """
         self.logger.info(f"[ViralLoop] Starting autonomous cycle for {niche}...")
         
         db = SessionLocal()
         try:
             # 1. Discovery & Ranking
-            candidates = await base_discovery_service.find_trending_content(niche)
+            candidates = await base_discovery_service.find_trending_content(niche, **scan_options)
             if not candidates:
                 self.logger.warning(f"[ViralLoop] No candidates found for {niche}. Aborting cycle.")
                 return
@@ -27,8 +29,9 @@ class ViralLoopController:
             winner = candidates[0]
             self.logger.info(f"[ViralLoop] Winner identified: {winner.title} ({winner.url})")
 
-            # 2. Check if already processed
-            existing_job = db.query(VideoJobDB).filter(VideoJobDB.input_url == winner.url).first()
+            # 2. Check if already processed (under any platform's copy of the clip)
+            source_urls = [winner.url] + [m["url"] for m in (winner.metadata or {}).get("cluster", {}).get("members", [])]
+            existing_job = db.query(VideoJobDB).filter(VideoJobDB.input_url.in_(source_urls)).first()
             if existing_job:
                 self.logger.info(f"[ViralLoop] Video already in pipeline ({existing_job.status}). Skipping.")
                 return
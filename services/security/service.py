@@ -1,15 +1,15 @@
 import os
 import json
 import datetime
-import redis
 from api.config import settings
+from api.utils.redis_client import get_redis
 
 class SecuritySentinel:
     """
     Dedicated Security Sentinel service for real-time monitoring and threat detection.
     """
     def __init__(self):
-        self.redis_client = redis.from_url(settings.REDIS_URL.replace("//localhost", "//redis") if "//localhost" in settings.REDIS_URL else settings.REDIS_URL)
+        self.redis_client = get_redis()
         self.log_key = "sentinel:security_logs"
         self.health_key = "sentinel:security_health"
 
@@ -1,4 +1,4 @@
-from api.utils.vault import get_secret
+from api.utils.vault import get_secret, get_secrets
 from typing import Optional
 import os
 import logging
@@ -25,11 +25,16 @@ class StorageService:
         return get_secret("storage_region", "us-east-1")
 
     def _get_client(self):
-        # Determine credentials
-        access_key = get_secret("storage_access_key") or get_secret("aws_access_key_id")
-        secret_key = get_secret("storage_secret_key") or get_secret("aws_secret_access_key")
+        # Determine credentials (one settings lookup for all of them)
+        s = get_secrets([
+            "storage_access_key", "aws_access_key_id", "storage_secret_key",
+            "aws_secret_access_key", "storage_endpoint", "storage_region"
+        ], defaults={"storage_region": "us-east-1"})
+        access_key = s["storage_access_key"] or s["aws_access_key_id"]
+        secret_key = s["storage_secret_key"] or s["aws_secret_access_key"]
+        endpoint, region = s["storage_endpoint"], s["storage_region"]
         
-        current_keys = (access_key, secret_key, self.endpoint, self.region)
+        current_keys = (access_key, secret_key, endpoint, region)
         
         if self._s3_client and self._last_keys == current_keys:
             return self._s3_client
@@ -41,7 +46,7 @@ class StorageService:
             
             client_kwargs = {
                 'service_name': 's3',
-                'region_name': self.region
+                'region_name': region
             }
             
             if access_key and secret_key:
@@ -51,8 +56,8 @@ class StorageService:
                 logging.warning(f"[StorageService] No access keys provided. Attempting unsigned access.")
                 client_kwargs['config'] = Config(signature_version=UNSIGNED)
             
-            if self.endpoint:
-                client_kwargs['endpoint_url'] = self.endpoint
+            if endpoint:
+                client_kwargs['endpoint_url'] = endpoint
 
             self._s3_client = boto3.client(**client_kwargs)
             self._last_keys = current_keys
@@ -1,27 +1,61 @@
 import os
+import re
+import time
 import uuid
+import glob
+import fcntl
+import shutil
+import asyncio
+import hashlib
 import logging
+import threading
 import yt_dlp
-from typing import Optional
+import subprocess
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional, List, Tuple
+
+# Canonical ids for the platforms we pull from most, so cache hits need no network call
+YOUTUBE_ID_RE = re.compile(r"(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([A-Za-z0-9_-]{11})")
+TIKTOK_ID_RE = re.compile(r"tiktok\.com/.*?/video/(\d+)")
+CACHED_FILE_RE = re.compile(r"^\.[A-Za-z0-9]+$")
+
+# Extracted info carries signed stream URLs; only reuse it for a short window
+INFO_TTL = 600
+INFO_CACHE_MAX = 256
 
 class VideoDownloader:
     def __init__(self, download_dir: str = "temp/downloads"):
+        from api.config import settings
         self.download_dir = download_dir
+        self.cache_dir = os.path.join(download_dir, "cache")
+        self.cache_max_bytes = int(settings.DOWNLOAD_CACHE_MAX_GB * 1024 ** 3)
         os.makedirs(self.download_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._info_cache: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self._info_lock = threading.Lock()
 
-    async def download_video(self, url: str) -> Optional[str]:
+    @staticmethod
+    def canonical_id(url: str, info: Optional[dict] = None) -> str:
         """
-        Downloads a video from a URL and returns the local file path.
+        Stable cache key for a video: '<platform>_<id>'. Uses extracted info when
+        available, URL patterns for YouTube/TikTok, and a URL hash otherwise.
         """
+        if info and info.get("id"):
+            extractor = (info.get("extractor_key") or info.get("ie_key") or "generic").lower()
+            return f"{extractor}_{info['id']}"
+        match = YOUTUBE_ID_RE.search(url)
+        if match:
+            return f"youtube_{match.group(1)}"
+        match = TIKTOK_ID_RE.search(url)
+        if match:
+            return f"tiktok_{match.group(1)}"
+        return f"url_{hashlib.sha1(url.strip().encode()).hexdigest()[:16]}"
+
+    def _base_opts(self, url: str) -> dict:
+        """Shared yt-dlp options (client selection + cookies) for inspection and download."""
         from api.config import settings
-        file_id = str(uuid.uuid4())
-        output_path = os.path.join(self.download_dir, f"{file_id}.%(ext)s")
-        
         ydl_opts = {
-            # More flexible format selector for better compatibility
-            'format': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
-            'outtmpl': output_path,
-            'merge_output_format': 'mp4',
             'quiet': True,
             'no_warnings': True,
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36',
@@ -32,17 +66,17 @@ class VideoDownloader:
                 }
             },
         }
-        
+
         # Determine cookies path - check multiple locations for Docker compatibility
         is_tiktok = 'tiktok' in url.lower()
         is_youtube = 'youtube' in url.lower() or 'youtu.be' in url.lower()
-        
+
         cookie_path = None
         if is_tiktok:
             cookie_path = os.getenv('TIKTOK_COOKIES_FILE') or settings.TIKTOK_COOKIES_PATH
         elif is_youtube:
             cookie_path = os.getenv('YOUTUBE_COOKIES_FILE') or settings.YOUTUBE_COOKIES_PATH
-        
+
         # If relative path, try multiple locations (Docker mounts)
         if cookie_path and not os.path.isabs(cookie_path):
             # Try relative to current directory
@@ -52,83 +86,344 @@ class VideoDownloader:
                 if os.path.exists(cookie_path_alt):
                     cookie_path = cookie_path_alt
                     print(f"[VideoDownloader] Using cookie at: {cookie_path}")
-        
+
         if cookie_path and os.path.exists(cookie_path):
             ydl_opts['cookiefile'] = cookie_path
-            print(f"[VideoDownloader] Using cookies: {cookie_path}")
         elif cookie_path:
             print(f"[VideoDownloader] WARNING: Cookie file not found: {cookie_path}")
+        return ydl_opts
+
+    def _extract_info(self, url: str) -> dict:
+        """
+        One metadata extraction per URL, reused by verify_video_asset and download_video.
+        process=False defers format selection, so a picky selector can't fail validation.
+        """
+        with self._info_lock:
+            cached = self._info_cache.get(url)
+            if cached and time.time() - cached[0] < INFO_TTL:
+                self._info_cache.move_to_end(url)
+                return cached[1]
+        with yt_dlp.YoutubeDL(self._base_opts(url)) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+        self._remember_info(url, info)
+        return info
+
+    def _remember_info(self, url: str, info: dict):
+        """Stores an extraction, dropping expired entries and then the least recently used."""
+        now = time.time()
+        with self._info_lock:
+            self._info_cache[url] = (now, info)
+            self._info_cache.move_to_end(url)
+            for stale in [u for u, (at, _) in self._info_cache.items() if now - at >= INFO_TTL]:
+                del self._info_cache[stale]
+            while len(self._info_cache) > INFO_CACHE_MAX:
+                self._info_cache.popitem(last=False)
+
+    def _lock_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.lock")
+
+    @contextmanager
+    def _key_lock(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        """
+        Exclusive per-video lock (flock on cache/<key>.lock) shared by threads and worker
+        processes. Lock files are unlinked along with their cache entry, so after locking we
+        check the path still names the file we hold and start over if it was replaced.
+        Yields False when `blocking` is off and another holder has the lock.
+        """
+        lock_path = self._lock_path(key)
+        while True:
+            with open(lock_path, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    try:
+                        current = os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino
+                    except FileNotFoundError:
+                        current = False
+                    if current:
+                        yield True
+                        return
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _drop_lock_file(self, key: str):
+        """Unlinks a key's lock file; only call while holding that key's lock."""
+        try:
+            os.remove(self._lock_path(key))
+        except OSError:
+            pass
+
+    def _find_cached(self, key: str) -> Optional[str]:
+        for path in glob.glob(os.path.join(self.cache_dir, f"{key}.*")):
+            # Finished files have a single extension; skip locks and partial/format fragments (key.f137.mp4)
+            suffix = os.path.basename(path)[len(key):]
+            if CACHED_FILE_RE.match(suffix) and not path.endswith((".lock", ".part", ".ytdl")):
+                return path
+        return None
+
+    def _checkout(self, cached_path: str) -> str:
+        """
+        Hands each job its own path (hardlink, copy as fallback) so per-job cleanup
+        never deletes the cached original.
+        """
+        os.utime(cached_path)  # LRU bump
+        ext = os.path.splitext(cached_path)[1]
+        job_path = os.path.join(self.download_dir, f"{uuid.uuid4()}{ext}")
+        try:
+            os.link(cached_path, job_path)
+        except OSError:
+            shutil.copy2(cached_path, job_path)
+        return job_path
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        Drops least recently used cache entries until the cache fits its byte budget.
+        Entries whose lock is held (being fetched or served) are left for the next pass;
+        evicted entries take their lock file with them, as do locks left by failed fetches.
+        """
+        entries = []
+        locks = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*")):
+            if path.endswith(".lock"):
+                locks.append(path)
+                continue
+            if path.endswith((".part", ".ytdl")) or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries) + (os.path.getsize(keep) if keep and os.path.exists(keep) else 0)
+        for _, size, path in sorted(entries):
+            if total <= self.cache_max_bytes:
+                break
+            key = os.path.basename(path).split(".", 1)[0]
+            with self._key_lock(key, blocking=False) as locked:
+                if not locked:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                    logging.info(f"[VideoDownloader] Evicted cached source: {os.path.basename(path)}")
+                except OSError:
+                    continue
+                if not self._find_cached(key):
+                    self._drop_lock_file(key)
+
+        keep_key = os.path.basename(keep).split(".", 1)[0] if keep else None
+        for lock_path in locks:
+            key = os.path.basename(lock_path)[:-len(".lock")]
+            if key == keep_key or self._find_cached(key):
+                continue
+            with self._key_lock(key, blocking=False) as locked:
+                if locked and not self._find_cached(key):
+                    self._drop_lock_file(key)
+
+    def _download_to_cache(self, url: str, info: dict, key: str) -> Optional[str]:
+        ydl_opts = self._base_opts(url)
+        ydl_opts.update({
+            # More flexible format selector for better compatibility
+            'format': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
+            'outtmpl': os.path.join(self.cache_dir, f"{key}.%(ext)s"),
+            'merge_output_format': 'mp4',
+        })
+
+        def run(opts) -> Optional[str]:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                result = ydl.process_ie_result(dict(info), download=True)
+                downloads = result.get("requested_downloads") or []
+                if downloads and downloads[0].get("filepath"):
+                    return downloads[0]["filepath"]
+                return ydl.prepare_filename(result)
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                final_path = ydl.prepare_filename(info)
-                return final_path
+            return run(ydl_opts)
         except Exception as e:
             # Absolute last resort for any format error
             print(f"[VideoDownloader] Broad fallback triggered for {url}. Error: {str(e)}")
             ydl_opts.pop('format', None) # Let yt-dlp decide
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=True)
-                    return ydl.prepare_filename(info)
+                return run(ydl_opts)
             except Exception as e2:
                 print(f"[VideoDownloader] Critical Failure for {url}: {str(e2)}")
                 return None
 
-    async def verify_video_asset(self, url: str) -> bool:
+    @staticmethod
+    def merge_ranges(ranges: List[List[float]], pad: float = 0.5, duration: Optional[float] = None) -> List[Tuple[float, float]]:
+        """Sorts [start, end] windows, pads their ends (as trim_to_hooks does) and merges overlaps."""
+        windows = []
+        for start, end in sorted((float(a), float(b)) for a, b in ranges if b > a):
+            start = max(start, 0.0)
+            end = end + pad if duration is None else min(end + pad, duration)
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+            else:
+                windows.append((start, end))
+        return windows
+
+    def hook_ranges(self, url: str) -> List[List[float]]:
         """
-        Quickly inspects the URL to ensure it has a valid video stream.
+        Picks hook windows for long-form sources from YouTube's 'most replayed' heatmap,
+        so only those sections need to be fetched. Returns [] when the full file should be used.
         """
         from api.config import settings
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'simulate': True,
-            'skip_download': True,
-            # DO NOT specify format here. specifying format leads to "Requested format is not available"
-            # on some platforms if the selector is even slightly off.
-            # Use Android client for YouTube (simpler signature encryption)
-            'extractor_args': {
-                'youtube': {
-                    'player_client': ['android', 'web', 'tv']
-                }
-            },
-        }
-        
-        # Add cookies for validation bypass
-        is_tiktok = 'tiktok' in url.lower()
-        is_youtube = 'youtube' in url.lower() or 'youtu.be' in url.lower()
-        
-        cookie_path = None
-        if is_tiktok:
-            cookie_path = os.getenv('TIKTOK_COOKIES_FILE') or settings.TIKTOK_COOKIES_PATH
-        elif is_youtube:
-            cookie_path = os.getenv('YOUTUBE_COOKIES_FILE') or settings.YOUTUBE_COOKIES_PATH
+        if self._find_cached(self.canonical_id(url)):
+            return []  # Full source already local; trimming it is cheaper than a new fetch
+        try:
+            info = self._extract_info(url)
+        except Exception:
+            return []
 
-        # If relative path, try /app location for Docker
-        if cookie_path and not os.path.isabs(cookie_path):
-            if not os.path.exists(cookie_path):
-                cookie_path_alt = f"/app/{cookie_path}"
-                if os.path.exists(cookie_path_alt):
-                    cookie_path = cookie_path_alt
+        duration = info.get("duration") or 0
+        heatmap = info.get("heatmap") or []
+        if duration < settings.PARTIAL_DOWNLOAD_MIN_DURATION or not heatmap:
+            return []
 
-        if cookie_path and os.path.exists(cookie_path):
-            ydl_opts['cookiefile'] = cookie_path
+        half = settings.PARTIAL_DOWNLOAD_WINDOW / 2
+        picked: List[List[float]] = []
+        for point in sorted(heatmap, key=lambda p: p.get("value", 0), reverse=True):
+            center = (point["start_time"] + point["end_time"]) / 2
+            start, end = max(center - half, 0.0), min(center + half, duration)
+            if any(start < b and end > a for a, b in picked):
+                continue
+            picked.append([start, end])
+            if len(picked) >= settings.PARTIAL_DOWNLOAD_HOOKS:
+                break
+        return sorted(picked)
+
+    def _download_sections_to_cache(self, url: str, info: dict, key: str, ranges: List[Tuple[float, float]]) -> Optional[str]:
+        """
+        Fetches only `ranges` (yt-dlp seeks into the remote stream, so untouched bytes are
+        never transferred) and joins them into one compact file in the cache.
+        """
+        work_dir = os.path.join(self.download_dir, "sections", uuid.uuid4().hex)
+        os.makedirs(work_dir, exist_ok=True)
+        ydl_opts = self._base_opts(url)
+        ydl_opts.update({
+            'format': 'bestvideo[height<=1080]+bestaudio/best[height<=1080]/best',
+            'outtmpl': os.path.join(work_dir, "%(section_start)012.3f.%(ext)s"),
+            'merge_output_format': 'mp4',
+            'download_ranges': yt_dlp.utils.download_range_func(None, ranges),
+        })
+
+        try:
+            try:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    ydl.process_ie_result(dict(info), download=True)
+            except Exception as e:
+                print(f"[VideoDownloader] Broad fallback triggered for sections of {url}. Error: {str(e)}")
+                ydl_opts.pop('format', None)
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    ydl.process_ie_result(dict(info), download=True)
+
+            parts = sorted(
+                p for p in glob.glob(os.path.join(work_dir, "*"))
+                if not p.endswith((".part", ".ytdl")) and CACHED_FILE_RE.match(os.path.basename(p)[12:])
+            )
+            if not parts:
+                return None
+
+            output_path = os.path.join(self.cache_dir, f"{key}.mp4")
+            concat_list = os.path.join(work_dir, "concat.txt")
+            with open(concat_list, "w") as f:
+                for part in parts:
+                    f.write(f"file '{os.path.abspath(part)}'\n")
+            result = subprocess.run([
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", concat_list,
+                "-c", "copy", "-movflags", "+faststart", output_path
+            ], capture_output=True, text=True)
+            if result.returncode != 0:
+                print(f"[VideoDownloader] Section join failed for {url}: {result.stderr.strip()[-300:]}")
+                return None
+            logging.info(f"[VideoDownloader] Fetched {len(parts)} sections of {url}")
+            return output_path
+        except Exception as e:
+            print(f"[VideoDownloader] Critical Failure for sections of {url}: {str(e)}")
+            return None
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _download_sync(self, url: str, ranges: Optional[List[List[float]]] = None) -> Optional[str]:
+        key = self.canonical_id(url)
+        if key.startswith("url_"):
+            # Unknown URL shape: resolve the real id (this extraction is reused for the download)
+            try:
+                key = self.canonical_id(url, self._extract_info(url))
+            except Exception as e:
+                print(f"[VideoDownloader] Critical Failure for {url}: {str(e)}")
+                return None
+
+        windows = self.merge_ranges(ranges) if ranges else []
+        if windows:
+            # Each distinct set of sections is its own cache entry
+            spec = ",".join(f"{a:.3f}-{b:.3f}" for a, b in windows)
+            key = f"{key}_s{hashlib.sha1(spec.encode()).hexdigest()[:10]}"
+
+        # One lock per video merges concurrent requests across threads and worker processes
+        with self._key_lock(key):
+            try:
+                cached = self._find_cached(key)
+                if cached:
+                    logging.info(f"[VideoDownloader] Cache HIT for {key}")
+                    return self._checkout(cached)
+
+                try:
+                    info = self._extract_info(url)
+                except Exception as e:
+                    print(f"[VideoDownloader] Critical Failure for {url}: {str(e)}")
+                    return None
+
+                if windows:
+                    path = self._download_sections_to_cache(url, info, key, windows)
+                else:
+                    path = self._download_to_cache(url, info, key)
+                if not path or not os.path.exists(path):
+                    return None
+                self._evict(keep=path)
+                return self._checkout(path)
+            finally:
+                if not self._find_cached(key):
+                    # Failed fetch: nothing to guard, don't leave the lock file behind
+                    self._drop_lock_file(key)
+
+    async def download_video(self, url: str, ranges: Optional[List[List[float]]] = None) -> Optional[str]:
+        """
+        Downloads a video from a URL and returns a local file path owned by the caller.
+        Sources are cached by canonical video id, so repeat requests skip yt-dlp entirely.
+        With `ranges` ([[start, end], ...] in seconds) only those sections are fetched and
+        the returned file holds them back to back.
+        """
+        return await asyncio.to_thread(self._download_sync, url, ranges)
+
+    async def verify_video_asset(self, url: str) -> bool:
+        """
+        Quickly inspects the URL to ensure it has a valid video stream.
+        """
+        if self._find_cached(self.canonical_id(url)):
+            return True
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                # Check for video stream (vcodec != 'none')
-                vcodec = info.get('vcodec') or 'none'
-                
-                # If we get metadata but vcodec is 'none', it might just be the format selection failed.
-                # As long as we got 'info', the video exists.
-                if vcodec == 'none' and not info.get('formats'):
-                     print(f"[VideoDownloader] VALIDATION FAILED: {url} has no formats.")
-                     return False
-                     
+            info = await asyncio.to_thread(self._extract_info, url)
+            # Redirect results (short links, embeds) are resolved during download
+            if info.get("_type") in ("url", "url_transparent"):
                 return True
+
+            # Check for video stream (vcodec != 'none')
+            vcodec = info.get('vcodec') or 'none'
+
+            # If we get metadata but vcodec is 'none', it might just be the format selection failed.
+            # As long as we got 'info', the video exists.
+            if vcodec == 'none' and not info.get('formats') and not info.get('url'):
+                 print(f"[VideoDownloader] VALIDATION FAILED: {url} has no formats.")
+                 return False
+
+            return True
         except Exception as e:
             # If we see "format is not available", it means the video exists but ytdlp struggled with the selector.
             # We allow it to pass so the downloader's broad fallback can try again.
@@ -0,0 +1,187 @@
+"""
+FFmpeg Filtergraph Compiler
+
+Translates the dashboard filter IDs (f1-f12) plus the AI strategy dict into a
+single ffmpeg `-filter_complex` graph so a render is one decode/encode pass
+instead of a stack of MoviePy composite layers.
+"""
+
+import random
+import logging
+from typing import List, Dict, Optional
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# atempo only accepts factors in this range per instance
+ATEMPO_MIN = 0.5
+ATEMPO_MAX = 2.0
+
+
+class CompiledFilterGraph(BaseModel):
+    filter_complex: str
+    video_label: str = "vout"
+    audio_label: Optional[str] = None
+    speed: float = 1.0
+    applied_filters: List[str] = []
+
+
+class FilterGraphCompiler:
+    """
+    Compiles enabled filters + strategy into an ffmpeg filter_complex string.
+    Mirrors the visual intent of the MoviePy effects in VideoProcessor.
+    """
+
+    def __init__(self, font_path: Optional[str] = None):
+        self.font_path = font_path
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        """Escapes characters that have meaning inside a filter option value."""
+        return value.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+
+    def resolve_filters(self, enabled_filters: Optional[List[str]], strategy: Optional[Dict]) -> List[str]:
+        """Dashboard filters (manual) + AI filters (autonomous), de-duplicated in order."""
+        merged = list(enabled_filters or [])
+        if strategy:
+            merged.extend(strategy.get("recommended_filters") or [])
+        seen = set()
+        return [f for f in merged if not (f in seen or seen.add(f))]
+
+    def _vibe_filters(self, insights: Dict) -> List[str]:
+        """Maps VLM insights to eq adjustments (see VideoProcessor.apply_vibe_adjustments)."""
+        mood = (insights.get("visual_mood") or "Neutral").lower()
+        chain = []
+        if "dark" in mood or "mysterious" in mood:
+            chain.append("eq=brightness=-0.02:contrast=1.1")
+        elif "energetic" in mood or "bright" in mood:
+            chain.append("eq=brightness=0.04:contrast=1.05:saturation=1.1")
+        elif "vintage" in mood or "nostalgic" in mood:
+            chain.append("eq=contrast=0.95:saturation=0.95")
+        return chain
+
+    def compile(
+        self,
+        enabled_filters: Optional[List[str]] = None,
+        strategy: Optional[Dict] = None,
+        duration: Optional[float] = None,
+        has_audio: bool = True,
+        seed: Optional[int] = None,
+        time_offset: float = 0.0
+    ) -> CompiledFilterGraph:
+        """
+        Builds the graph. `seed` fixes every random choice (speed, overlay timing)
+        so several renders of the same job produce identical parameters.
+        `time_offset` is the source position of the input when rendering one
+        segment of a longer video, keeping timed overlays on the global timeline.
+        """
+        strategy = strategy or {}
+        rng = random.Random(seed)
+        filters = self.resolve_filters(enabled_filters, strategy)
+
+        # Linear chain of video filters; the glow step branches and re-joins
+        steps: List[str] = []
+        applied: List[str] = []
+        glow = False
+
+        if "f1" in filters:
+            steps.append("hflip")
+            applied.append("f1")
+
+        if "f2" in filters:
+            zoom = round(rng.uniform(1.02, 1.08), 3)
+            steps.append(f"scale=trunc(iw*{zoom}/2)*2:trunc(ih*{zoom}/2)*2")
+            steps.append(f"crop=trunc(iw/{zoom}/2)*2:trunc(ih/{zoom}/2)*2")
+            applied.append("f2")
+
+        if "f3" in filters:
+            steps.append("eq=contrast=1.05:saturation=1.12")
+            applied.append("f3")
+
+        speed = 1.0
+        if "f6" in filters:
+            speed_range = strategy.get("speed_range") or [0.95, 1.05]
+            speed = round(rng.uniform(speed_range[0], speed_range[-1]), 4)
+            speed = min(max(speed, ATEMPO_MIN), ATEMPO_MAX)
+            steps.append(f"setpts=PTS/{speed}")
+            applied.append("f6")
+
+        if "f8" in filters:
+            intensity = float(strategy.get("jitter_intensity", 1.0) or 0.0)
+            if intensity > 0:
+                zoom = round(1.04 + intensity * 0.01, 4)
+                steps.append(f"scale=trunc(iw*{zoom}/2)*2:trunc(ih*{zoom}/2)*2")
+                steps.append(
+                    f"crop=trunc(iw/{zoom}/2)*2:trunc(ih/{zoom}/2)*2"
+                    f":x='(iw-ow)/2+{intensity}*(2*random(0)-1)'"
+                    f":y='(ih-oh)/2+{intensity}*(2*random(1)-1)'"
+                )
+                applied.append("f8")
+
+        if strategy.get("visual_insights"):
+            steps.extend(self._vibe_filters(strategy["visual_insights"]))
+
+        if "f10" in filters:
+            steps.append("noise=alls=10:allf=t+u")
+            applied.append("f10")
+
+        if "f11" in filters:
+            steps.append("hue=s=0")
+            applied.append("f11")
+
+        if "f12" in filters:
+            shift = rng.randint(2, 5)
+            steps.append(f"rgbashift=rh=-{shift}:bh={shift}")
+            applied.append("f12")
+
+        if "f9" in filters:
+            glow = True
+            applied.append("f9")
+
+        # Timed overlays run after the speed change so their windows are in output time
+        overlays: List[str] = []
+        out_duration = duration / speed if duration else None
+        offset = time_offset / speed
+        t = f"(t+{offset:.3f})" if offset else "t"
+
+        if "f7" in filters:
+            start = rng.uniform(0, max(out_duration - 1.0, 0.0)) if out_duration else 1.0
+            overlays.append(
+                "drawbox=x=0:y=0:w=iw:h=ih:color=0xFFD2A0@0.08:t=fill"
+                f":enable='between({t},{start:.2f},{start + 0.6:.2f})'"
+            )
+            applied.append("f7")
+
+        if "f4" in filters and self.font_path:
+            overlays.append(
+                f"drawtext=fontfile='{self._escape(self.font_path)}':text='!':fontsize=70:fontcolor=white"
+                f":x=(w-text_w)/2:y=(h-text_h)/2:enable='gte({t},2)*lt(mod({t}-2,3),0.2)'"
+            )
+            applied.append("f4")
+
+        # Encoders need even dimensions and a standard pixel format
+        tail = overlays + ["scale=trunc(iw/2)*2:trunc(ih/2)*2", "format=yuv420p"]
+
+        head = ",".join(steps) if steps else "null"
+        if glow:
+            graph = (
+                f"[0:v]{head},split[base][halo];"
+                "[halo]eq=brightness=0.05:contrast=1.1[glow];"
+                "[base][glow]blend=all_mode=screen:all_opacity=0.3,"
+                f"{','.join(tail)}[vout]"
+            )
+        else:
+            graph = f"[0:v]{head},{','.join(tail)}[vout]"
+
+        audio_label = None
+        if has_audio:
+            graph += f";[0:a]atempo={speed}[aout]" if speed != 1.0 else ";[0:a]anull[aout]"
+            audio_label = "aout"
+
+        logger.info(f"[FilterGraph] Compiled {len(applied)} filters {applied} (speed {speed}x)")
+        return CompiledFilterGraph(
+            filter_complex=graph,
+            audio_label=audio_label,
+            speed=speed,
+            applied_filters=applied
+        )
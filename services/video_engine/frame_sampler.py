@@ -0,0 +1,132 @@
+"""
+Streaming Frame Sampler
+
+Decodes a file front to back and yields (optionally downscaled) frames at the
+requested positions. Frames between nearby samples are grabbed but never
+retrieved, so dense sampling (OCR) has no per-sample seek back to the previous
+keyframe. Sparse sampling (a handful of VLM keyframes across a long source)
+seeks across gaps longer than `seek_gap_seconds` instead of decoding them.
+"""
+
+import logging
+from typing import Dict, Iterator, List, Optional, Set
+from .probe import probe_service
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class SampledFrame:
+    __slots__ = ("index", "timestamp", "image", "scale")
+
+    def __init__(self, index: int, timestamp: float, image, scale: float):
+        self.index = index
+        self.timestamp = timestamp
+        self.image = image  # BGR ndarray
+        self.scale = scale  # image size / source size (<= 1.0)
+
+
+class FrameSampler:
+    def __init__(self, seek_gap_seconds: float = 10.0):
+        # Longer gaps are cheaper to seek over (one keyframe + a partial GOP) than to grab through
+        self.seek_gap_seconds = seek_gap_seconds
+
+    @staticmethod
+    def evenly_spaced(frame_count: int, count: int) -> List[int]:
+        """`count` frame indices spread across the file (same spacing the VLM used)."""
+        if frame_count <= 0 or count <= 0:
+            return []
+        interval = max(frame_count // count, 1)
+        return [i * interval for i in range(count) if i * interval < frame_count]
+
+    @staticmethod
+    def every_n(frame_count: int, step: int) -> List[int]:
+        return list(range(0, max(frame_count, 0), max(step, 1)))
+
+    def _downscale(self, frame, max_height: Optional[int]):
+        height = frame.shape[0]
+        if not max_height or height <= max_height:
+            return frame, 1.0
+        scale = max_height / height
+        width = int(round(frame.shape[1] * scale))
+        return cv2.resize(frame, (width, max_height), interpolation=cv2.INTER_AREA), scale
+
+    def iter_frames(
+        self,
+        video_path: str,
+        frame_indices: Optional[List[int]] = None,
+        timestamps: Optional[List[float]] = None,
+        max_height: Optional[int] = None
+    ) -> Iterator[SampledFrame]:
+        """
+        Yields frames at `frame_indices` (or `timestamps`, in seconds) in file order.
+        Stops decoding as soon as the last requested frame has been produced.
+        """
+        if not CV2_AVAILABLE:
+            logger.error("[FrameSampler] OpenCV not available")
+            return
+
+        meta = probe_service.probe(video_path)
+        if not meta or not meta.has_video:
+            return
+        fps = meta.fps or 30.0
+
+        targets = set(frame_indices or [])
+        if timestamps:
+            targets.update(int(round(t * fps)) for t in timestamps)
+        if meta.frame_count:
+            targets = {i for i in targets if 0 <= i < meta.frame_count}
+        if not targets:
+            return
+        seek_gap = max(int(self.seek_gap_seconds * fps), 1)
+
+        cap = cv2.VideoCapture(video_path)
+        try:
+            index = 0
+            for target in sorted(targets):
+                if target - index > seek_gap:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+                    index = target
+                grabbed = True
+                while index <= target:
+                    grabbed = cap.grab()
+                    if not grabbed:
+                        break
+                    index += 1
+                if not grabbed:
+                    break
+                ok, frame = cap.retrieve()
+                if ok:
+                    image, scale = self._downscale(frame, max_height)
+                    yield SampledFrame(target, target / fps, image, scale)
+        finally:
+            cap.release()
+
+    def sample_many(
+        self,
+        video_path: str,
+        requests: Dict[str, List[int]],
+        max_height: Optional[int] = None
+    ) -> Dict[str, List[SampledFrame]]:
+        """
+        Serves several consumers' frame-index requests from one decode.
+        Returns {consumer_name: [SampledFrame, ...]} in frame order.
+        """
+        wanted: Dict[int, Set[str]] = {}
+        for name, indices in requests.items():
+            for i in indices:
+                wanted.setdefault(i, set()).add(name)
+
+        results: Dict[str, List[SampledFrame]] = {name: [] for name in requests}
+        for frame in self.iter_frames(video_path, frame_indices=list(wanted), max_height=max_height):
+            for name in wanted[frame.index]:
+                results[name].append(frame)
+        return results
+
+
+frame_sampler = FrameSampler()
@@ -1,12 +1,22 @@
 import easyocr
-import cv2
 import os
+import json
+import hashlib
 import logging
+import threading
 import numpy as np
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from typing import List, Dict, Optional
+from .probe import probe_service
+from .frame_sampler import frame_sampler
+from api.config import settings
+from api.utils.redis_client import get_redis
+
+# Zones are cached for a week; the same source clip is often re-rendered
+ZONE_CACHE_TTL = 7 * 86400
 
 class OCRService:
-    def __init__(self):
+    def __init__(self, max_cached_zones: int = 256):
         # Initialize reader once. This will download models on first run if not present.
         # We use English by default, but can be expanded.
         try:
@@ -16,6 +26,14 @@ class OCRService:
             logging.error(f"[OCRService] Failed to initialize EasyOCR: {e}")
             self.reader = None
 
+        # Fast caption-placement mode: detection only, downscaled, batched
+        self.detect_height = settings.OCR_DETECT_HEIGHT
+        self.batch_size = settings.OCR_BATCH_SIZE
+        # In-process LRU in front of Redis, keyed by file fingerprint
+        self.max_cached_zones = max_cached_zones
+        self._zone_cache: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._zone_lock = threading.Lock()
+
     def detect_text_regions(self, video_path: str, sample_rate: int = 30) -> List[Dict]:
         """
         Samples frames from a video and detects bounding boxes of text.
@@ -24,30 +42,26 @@ class OCRService:
         if not self.reader:
             return []
 
-        cap = cv2.VideoCapture(video_path)
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
+        meta = probe_service.probe(video_path)
+        if not meta or not meta.has_video:
+            return []
+        height = meta.height
+
         all_detections = []
         
-        # Sample frames (every 1 second or sample_rate frames)
-        for i in range(0, frame_count, sample_rate):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i)
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
+        # Sample frames (every 1 second or sample_rate frames) in one sequential decode
+        indices = frame_sampler.every_n(meta.frame_count, sample_rate)
+        for sampled in frame_sampler.iter_frames(video_path, frame_indices=indices):
             # Perform OCR on the frame
             # EasyOCR returns: [ ([[x,y],[x,y],[x,y],[x,y]], text, confidence), ... ]
-            results = self.reader.readtext(frame)
+            results = self.reader.readtext(sampled.image)
             
             for (bbox, text, prob) in results:
                 if prob > 0.3: # Filter low confidence
                     # bbox is 4 points: tl, tr, br, bl
                     tl, tr, br, bl = bbox
                     all_detections.append({
-                        "frame": i,
+                        "frame": sampled.index,
                         "text": text,
                         "confidence": prob,
                         "bbox": {
@@ -59,31 +73,121 @@ class OCRService:
                         "normalized_y": (tl[1] + br[1]) / (2 * height) # 0 to 1
                     })
         
-        cap.release()
         return all_detections
 
-    def get_caption_strategy(self, video_path: str) -> str:
+    @staticmethod
+    def _file_fingerprint(video_path: str, chunk_size: int = 4 * 1024 * 1024) -> str:
+        """Content hash from the size plus the first and last chunks (avoids reading whole videos)."""
+        digest = hashlib.sha1()
+        size = os.path.getsize(video_path)
+        digest.update(str(size).encode())
+        with open(video_path, "rb") as f:
+            digest.update(f.read(chunk_size))
+            if size > chunk_size:
+                f.seek(max(size - chunk_size, chunk_size))
+                digest.update(f.read(chunk_size))
+        return digest.hexdigest()
+
+    def _remember_zones(self, fingerprint: str, zones: List[int]):
+        with self._zone_lock:
+            self._zone_cache[fingerprint] = zones
+            self._zone_cache.move_to_end(fingerprint)
+            while len(self._zone_cache) > self.max_cached_zones:
+                self._zone_cache.popitem(last=False)
+
+    def _cached_zones(self, fingerprint: str) -> Optional[List[int]]:
+        with self._zone_lock:
+            zones = self._zone_cache.get(fingerprint)
+            if zones is not None:
+                self._zone_cache.move_to_end(fingerprint)
+                return zones
+        try:
+            cached = get_redis().get(f"ocr:zones:{fingerprint}")
+            if cached:
+                zones = json.loads(cached)
+                self._remember_zones(fingerprint, zones)
+                return zones
+        except Exception as e:
+            logging.debug(f"[OCRService] Zone cache lookup skipped: {e}")
+        return None
+
+    def _store_zones(self, fingerprint: str, zones: List[int]):
+        self._remember_zones(fingerprint, zones)
+        try:
+            get_redis().setex(f"ocr:zones:{fingerprint}", ZONE_CACHE_TTL, json.dumps(zones))
+        except Exception as e:
+            logging.debug(f"[OCRService] Zone cache store skipped: {e}")
+
+    def _accumulate_zones(self, batch: List[np.ndarray], zones: List[int]):
+        """Runs the text detector (no recognition) on a batch of same-sized frames."""
+        horizontal_lists, free_lists = self.reader.detect(np.stack(batch), reformat=False)
+        height = batch[0].shape[0]
+        for horizontal, free in zip(horizontal_lists, free_lists):
+            # horizontal boxes: [x_min, x_max, y_min, y_max]; free boxes: 4 points
+            centers = [(box[2] + box[3]) / 2 for box in horizontal]
+            centers += [sum(pt[1] for pt in box) / 4 for box in free]
+            for y in centers:
+                zones[min(int(y / height * 5), 4)] += 1
+
+    def detect_zone_density(self, video_path: str, sample_rate: int = 30) -> List[int]:
+        """
+        Fast path for caption placement: counts text boxes per vertical fifth of the frame.
+        Frames are downscaled to OCR_DETECT_HEIGHT and sent to the detector in batches,
+        and the result is cached per source file fingerprint.
+        """
+        zones = [0, 0, 0, 0, 0]
+        if not self.reader or not os.path.exists(video_path):
+            return zones
+
+        fingerprint = self._file_fingerprint(video_path)
+        cached = self._cached_zones(fingerprint)
+        if cached is not None:
+            logging.info(f"[OCRService] Zone cache HIT for {os.path.basename(video_path)}")
+            return cached
+
+        meta = probe_service.probe(video_path)
+        if not meta or not meta.has_video:
+            return zones
+
+        indices = frame_sampler.every_n(meta.frame_count, sample_rate)
+        batch = []
+        for sampled in frame_sampler.iter_frames(video_path, frame_indices=indices, max_height=self.detect_height):
+            batch.append(sampled.image)
+            if len(batch) >= self.batch_size:
+                self._accumulate_zones(batch, zones)
+                batch = []
+        if batch:
+            self._accumulate_zones(batch, zones)
+
+        self._store_zones(fingerprint, zones)
+        return zones
+
+    @staticmethod
+    def _zones_from_detections(detections: List[Dict]) -> List[int]:
+        zones = [0, 0, 0, 0, 0]
+        for d in detections:
+            y = d["normalized_y"]
+            idx = int(y * 5)
+            if idx > 4: idx = 4
+            zones[idx] += 1
+        return zones
+
+    def get_caption_strategy(self, video_path: str, fast: bool = True) -> str:
         """
         Analyzes the video and returns a placement strategy: 'bottom' (default), 'top', or 'center'.
         Uses a density-based 'Least Obstructive Path' approach.
+        `fast` uses detection-only zone counting; otherwise full-resolution OCR is run.
         """
-        detections = self.detect_text_regions(video_path)
-        if not detections:
-            return "bottom"
-
         # Divide into 5 vertical zones for higher precision
         # Zone 0: Top (0.0-0.2)
         # Zone 1: Upper Middle (0.2-0.4)
         # Zone 2: Middle (0.4-0.6)
         # Zone 3: Lower Middle (0.6-0.8)
         # Zone 4: Bottom (0.8-1.0)
-        
-        zones = [0, 0, 0, 0, 0]
-        for d in detections:
-            y = d["normalized_y"]
-            idx = int(y * 5)
-            if idx > 4: idx = 4
-            zones[idx] += 1
+        if fast:
+            zones = self.detect_zone_density(video_path)
+        else:
+            zones = self._zones_from_detections(self.detect_text_regions(video_path))
             
         logging.info(f"[OCRService] Vertical Density Map: {zones}")
 
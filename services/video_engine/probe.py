@@ -0,0 +1,181 @@
+"""
+Media Probe Service
+
+One ffprobe call per file, cached by (path, size, mtime). Every part of the
+video engine that only needs size/fps/duration should ask here instead of
+opening the container with cv2 or MoviePy.
+"""
+
+import os
+import json
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class MediaMetadata(BaseModel):
+    path: str
+    width: int = 0
+    height: int = 0
+    fps: float = 0.0
+    duration: float = 0.0
+    frame_count: int = 0
+    has_video: bool = False
+    has_audio: bool = False
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    audio_sample_rate: int = 0
+    bit_rate: int = 0
+    format_name: Optional[str] = None
+    rotation: int = 0
+
+    class Config:
+        frozen = True  # Shared across callers via the cache
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.width, self.height)
+
+
+def _parse_rate(rate: Optional[str]) -> float:
+    """Parses ffprobe rationals like '30000/1001'."""
+    if not rate:
+        return 0.0
+    try:
+        if "/" in rate:
+            num, den = rate.split("/", 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except ValueError:
+        return 0.0
+
+
+class MediaProbeService:
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int, int], MediaMetadata]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache_key(self, path: str) -> Optional[Tuple[str, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    def probe(self, path: str) -> Optional[MediaMetadata]:
+        """Returns cached metadata for `path`, probing it on first use. None if unreadable."""
+        key = self._cache_key(path)
+        if key is None:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached:
+                self._cache.move_to_end(key)
+                return cached
+
+        metadata = self._probe_ffprobe(path) or self._probe_opencv(path)
+        if metadata is None:
+            return None
+
+        with self._lock:
+            self._cache[key] = metadata
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return metadata
+
+    def invalidate(self, path: str):
+        """Drops every cached entry for `path` (e.g. after an in-place rewrite)."""
+        target = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._cache if k[0] == target]:
+                del self._cache[key]
+
+    def _probe_ffprobe(self, path: str) -> Optional[MediaMetadata]:
+        try:
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-print_format", "json",
+                 "-show_format", "-show_streams", path],
+                capture_output=True,
+                text=True,
+                timeout=15
+            )
+            if result.returncode != 0:
+                logger.warning(f"[MediaProbe] ffprobe failed for {path}: {result.stderr.strip()[-200:]}")
+                return None
+            data = json.loads(result.stdout or "{}")
+        except Exception as e:
+            logger.warning(f"[MediaProbe] ffprobe unavailable for {path}: {e}")
+            return None
+
+        fmt = data.get("format", {})
+        streams = data.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+        duration = float(fmt.get("duration") or (video or {}).get("duration") or 0.0)
+        fields = {
+            "path": path,
+            "duration": duration,
+            "has_video": video is not None,
+            "has_audio": audio is not None,
+            "bit_rate": int(fmt.get("bit_rate") or 0),
+            "format_name": fmt.get("format_name"),
+        }
+
+        if video:
+            fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+            rotation = (video.get("tags") or {}).get("rotate")
+            for side_data in video.get("side_data_list") or []:
+                rotation = side_data.get("rotation", rotation)
+            fields.update({
+                "width": int(video.get("width") or 0),
+                "height": int(video.get("height") or 0),
+                "fps": fps,
+                "video_codec": video.get("codec_name"),
+                "frame_count": int(video.get("nb_frames") or 0) or int(round(duration * fps)),
+                "rotation": int(float(rotation or 0)),
+            })
+
+        if audio:
+            fields.update({
+                "audio_codec": audio.get("codec_name"),
+                "audio_sample_rate": int(audio.get("sample_rate") or 0),
+            })
+
+        return MediaMetadata(**fields)
+
+    def _probe_opencv(self, path: str) -> Optional[MediaMetadata]:
+        """Fallback for hosts without ffprobe. Cannot see audio streams."""
+        try:
+            import cv2
+        except ImportError:
+            return None
+
+        cap = cv2.VideoCapture(path)
+        try:
+            if not cap.isOpened():
+                return None
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            return MediaMetadata(
+                path=path,
+                width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                fps=fps,
+                frame_count=frame_count,
+                duration=frame_count / fps if fps > 0 else 0.0,
+                has_video=True
+            )
+        finally:
+            cap.release()
+
+
+probe_service = MediaProbeService()
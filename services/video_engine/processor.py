@@ -3,12 +3,17 @@ import os
 import uuid
 import random
 import logging
+import time
 import asyncio
 import subprocess
 from typing import List, Optional, Dict
 from .transcription import transcription_service
 from .ocr_service import ocr_service
 from .stock_service import stock_service
+from .filtergraph import FilterGraphCompiler, CompiledFilterGraph
+from .segment_renderer import SegmentParallelRenderer
+from .probe import probe_service
+from services.monitoring.telemetry import track_render, record_encode
 from api.config import settings
 
 try:
@@ -48,6 +53,14 @@ class VideoProcessor:
         
         logging.info(f"Video Engine initialized with font: {self.font_path}")
         
+        # Render backend: remotion (default), ffmpeg (opt-in single-pass filtergraph), or moviepy
+        self.render_backend = settings.RENDER_BACKEND.lower()
+        self.filtergraph = FilterGraphCompiler(font_path=self.font_path)
+        
+        # Segment-parallel rendering for long sources (CPU encode only)
+        self.segment_workers = settings.SEGMENT_PARALLEL_WORKERS or (os.cpu_count() or 1)
+        self.segment_min_duration = settings.SEGMENT_PARALLEL_MIN_DURATION
+        
         # Check ffmpeg version and warn about ARM64
         self._check_ffmpeg_version()
         
@@ -125,19 +138,18 @@ class VideoProcessor:
         
         logging.info(f"[VideoProcessor] Creating OpenCV-based processing for: {input_path}")
         
-        # Get video info from clip or probe with OpenCV
+        # Get video info from clip or the shared probe cache
         if clip:
             width, height = clip.size
             fps = clip.fps
             duration = clip.duration
         else:
-            cap = cv2.VideoCapture(input_path)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration = total_frames / fps if fps > 0 else 0
-            cap.release()
+            meta = probe_service.probe(input_path)
+            if not meta:
+                raise RuntimeError(f"Cannot probe video: {input_path}")
+            width, height = meta.size
+            fps = meta.fps
+            duration = meta.duration
         
         # Store OpenCV state for processing
         self._opencv_mode = True
@@ -202,30 +214,15 @@ class VideoProcessor:
 
     async def _load_video_opencv_fallback(self, input_path: str) -> VideoFileClip:
         """
-        OpenCV-based fallback for video loading.
+        Fallback for video loading.
         Probes video properties and tries again with MoviePy.
         """
-        if not CV2_AVAILABLE:
-            logging.error("[VideoProcessor] OpenCV not available, cannot fallback")
-            raise RuntimeError("Video loading failed and OpenCV fallback unavailable")
-        
-        logging.info(f"[VideoProcessor] Probing video with OpenCV: {input_path}")
-        cap = cv2.VideoCapture(input_path)
-        
-        if not cap.isOpened():
-            cap.release()
-            raise RuntimeError(f"OpenCV cannot open video: {input_path}")
-        
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        duration = frame_count / fps if fps > 0 else 0
-        
-        cap.release()
+        logging.info(f"[VideoProcessor] Probing video: {input_path}")
+        meta = probe_service.probe(input_path)
+        if not meta or not meta.has_video:
+            raise RuntimeError(f"Cannot open video: {input_path}")
         
-        logging.info(f"[VideoProcessor] OpenCV probe: {width}x{height}, {fps}fps, {duration:.2f}s, {frame_count} frames")
+        logging.info(f"[VideoProcessor] Probe: {meta.width}x{meta.height}, {meta.fps}fps, {meta.duration:.2f}s, {meta.frame_count} frames")
         
         # Set environment variable to help MoviePy work around issues
         os.environ['FFMPEG_BINARY'] = 'ffmpeg'
@@ -254,16 +251,16 @@ class VideoProcessor:
         
         logging.info(f"[VideoProcessor] Processing video with OpenCV: {input_path}")
         
+        # Get video properties
+        meta = probe_service.probe(input_path)
+        if not meta:
+            raise RuntimeError(f"Cannot probe video: {input_path}")
+        fps, width, height, total_frames = meta.fps, meta.width, meta.height, meta.frame_count
+        
         cap = cv2.VideoCapture(input_path)
         if not cap.isOpened():
             raise RuntimeError(f"Cannot open video: {input_path}")
         
-        # Get video properties
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
         # Define output
         output_path = os.path.join(self.output_dir, output_name)
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
@@ -613,19 +610,128 @@ class VideoProcessor:
         
         return output_path
 
-    async def process_full_pipeline(
-        self, 
-        input_path: str, 
-        output_name: str, 
-        enabled_filters: Optional[List[str]] = None, 
+    def build_ffmpeg_command(self, input_path: str, output_path: str, graph: CompiledFilterGraph, codec: str) -> List[str]:
+        """Assembles the single-pass ffmpeg invocation for a compiled graph."""
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", input_path,
+            "-filter_complex", graph.filter_complex,
+            "-map", f"[{graph.video_label}]",
+        ]
+        if graph.audio_label:
+            cmd += ["-map", f"[{graph.audio_label}]", "-c:a", "aac", "-b:a", "160k"]
+        cmd += ["-c:v", codec]
+        if codec == "libx264":
+            cmd += ["-preset", "veryfast", "-crf", "21"]
+        cmd += ["-movflags", "+faststart", output_path]
+        return cmd
+
+    async def _render_filtergraph(
+        self,
+        input_path: str,
+        output_name: str,
+        enabled_filters: Optional[List[str]] = None,
+        strategy: Optional[Dict] = None
+    ) -> str:
+        """
+        Renders every enabled effect in one ffmpeg decode/encode pass.
+        Raises RuntimeError so the caller can fall back to MoviePy.
+        """
+        meta = probe_service.probe(input_path)
+        has_audio = meta.has_audio if meta else False
+        duration = meta.duration if meta else 0.0
+        frames = meta.frame_count if meta else 0
+        output_path = os.path.join(self.output_dir, output_name)
+        started = time.monotonic()
+
+        if self.codec == "libx264" and self.segment_workers > 1 and duration >= self.segment_min_duration:
+            try:
+                renderer = SegmentParallelRenderer(self.filtergraph, codec=self.codec)
+                await renderer.render(
+                    input_path, output_path, duration, has_audio,
+                    enabled_filters=enabled_filters,
+                    strategy=strategy,
+                    workers=self.segment_workers
+                )
+                logging.info(f"[VideoProcessor] Segment-parallel render complete ({self.segment_workers} workers): {output_path}")
+                record_encode(frames, time.monotonic() - started)
+                return output_path
+            except Exception as e:
+                logging.warning(f"[VideoProcessor] Segment-parallel render failed: {e}. Retrying as single pass.")
+
+        graph = self.filtergraph.compile(
+            enabled_filters=enabled_filters,
+            strategy=strategy,
+            duration=duration or None,
+            has_audio=has_audio
+        )
+
+        codecs = [self.codec] if self.codec == "libx264" else [self.codec, "libx264"]
+        last_error = ""
+        for codec in codecs:
+            cmd = self.build_ffmpeg_command(input_path, output_path, graph, codec)
+            started = time.monotonic()
+            result = await asyncio.to_thread(subprocess.run, cmd, capture_output=True, text=True)
+            if result.returncode == 0 and os.path.exists(output_path):
+                logging.info(f"[VideoProcessor] FFmpeg single-pass render complete ({codec}): {output_path}")
+                record_encode(frames, time.monotonic() - started)
+                return output_path
+            last_error = result.stderr.strip()[-500:]
+            logging.warning(f"[VideoProcessor] FFmpeg render failed with {codec}: {last_error}")
+
+        raise RuntimeError(f"FFmpeg filtergraph render failed: {last_error}")
+
+    async def _process_moviepy(
+        self,
+        input_path: str,
+        output_name: str,
+        enabled_filters: Optional[List[str]] = None,
         strategy: Optional[Dict] = None
     ) -> str:
+        """
+        Legacy layer-by-layer MoviePy render. Kept as the fallback when ffmpeg fails.
+        """
+        strategy = strategy or {}
+        filters = self.filtergraph.resolve_filters(enabled_filters, strategy)
+
+        source = await self._load_video_with_timeout(input_path)
+        clip = source
+
+        if "f6" in filters:
+            clip = self.apply_speed_ramping(clip, strategy.get("speed_range") or [0.95, 1.05])
+        if "f8" in filters and strategy.get("jitter_intensity", 1.0):
+            clip = CompositeVideoClip(
+                [self.apply_dynamic_jitter(clip, strategy.get("jitter_intensity", 1.0))],
+                size=clip.size
+            )
+        if strategy.get("visual_insights"):
+            clip = self.apply_vibe_adjustments(clip, strategy["visual_insights"])
+        if "f10" in filters:
+            clip = self.apply_film_grain(clip)
+        if "f11" in filters:
+            clip = self.apply_grayscale(clip)
+        if "f12" in filters:
+            clip = self.apply_random_glitch(clip)
+        if "f9" in filters:
+            clip = self.apply_atmospheric_glow(clip)
+        if "f7" in filters:
+            clip = self.apply_cinematic_overlays(clip)
+
+        output_path = os.path.join(self.output_dir, output_name)
+        try:
+            clip.write_videofile(output_path, codec=self.codec, audio_codec="aac")
+        except Exception:
+            clip.write_videofile(output_path, codec="libx264", audio_codec="aac")
+        finally:
+            source.close()
+
+        return output_path
+
+    async def _render_remotion(self, input_path: str, output_name: str, strategy: Optional[Dict] = None) -> Optional[str]:
         """
         High-fidelity video transformation using Remotion.
         Delegates the visual layout and captions to React for professional quality.
         """
-        logging.info(f"[VideoProcessor] Starting Remotion transformation for {output_name}")
-        
         try:
             from services.video_engine.remotion_service import remotion_service
             
@@ -653,8 +759,39 @@ class VideoProcessor:
             raise Exception("Remotion rendering failed to produce an output")
             
         except Exception as e:
-            logging.error(f"[VideoProcessor] Remotion pipeline failed: {e}. Falling back to basic ffmpeg.")
-            # Basic fallback: just return the input or do a simple copy
-            return input_path
+            logging.error(f"[VideoProcessor] Remotion pipeline failed: {e}. Falling back to ffmpeg.")
+            return None
+
+    async def process_full_pipeline(
+        self, 
+        input_path: str, 
+        output_name: str, 
+        enabled_filters: Optional[List[str]] = None, 
+        strategy: Optional[Dict] = None
+    ) -> str:
+        """
+        Runs the transformation with the configured backend (settings.RENDER_BACKEND).
+        Remotion is the default; the single-pass ffmpeg filtergraph (no Remotion title,
+        subtitle or voiceover) only runs first when RENDER_BACKEND=ffmpeg.
+        Fallback order: remotion -> ffmpeg filtergraph -> MoviePy -> untouched input.
+        """
+        logging.info(f"[VideoProcessor] Starting {self.render_backend} transformation for {output_name}")
+        with track_render():
+            if self.render_backend == "remotion":
+                rendered_path = await self._render_remotion(input_path, output_name, strategy)
+                if rendered_path:
+                    return rendered_path
+
+            if self.render_backend != "moviepy":
+                try:
+                    return await self._render_filtergraph(input_path, output_name, enabled_filters, strategy)
+                except Exception as e:
+                    logging.error(f"[VideoProcessor] FFmpeg pipeline failed: {e}. Falling back to MoviePy.")
+
+            try:
+                return await self._process_moviepy(input_path, output_name, enabled_filters, strategy)
+            except Exception as e:
+                logging.error(f"[VideoProcessor] MoviePy pipeline failed: {e}. Returning source untouched.")
+                return input_path
 
 base_video_processor = VideoProcessor()
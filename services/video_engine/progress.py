@@ -0,0 +1,225 @@
+"""
+Job Progress Reporter
+
+Coalesces the status/progress stream of a Celery job:
+
+- the newest state goes to a Redis hash (`job:progress:{id}`) on every update,
+  which is what live listings read;
+- WebSocket deltas (changed fields only) are published at most once per
+  PROGRESS_PUBLISH_INTERVAL, except stage changes and terminal states, which go
+  out immediately;
+- VideoJobDB is written at terminal states, plus at most every
+  PROGRESS_DB_FLUSH_INTERVAL seconds as a crash safety net.
+
+`time_remaining` is estimated from how long each stage of the same pipeline took
+on recent jobs (median of the last STAGE_HISTORY samples per stage).
+"""
+
+import time
+import json
+import logging
+import statistics
+from typing import Callable, Dict, Iterable, List, Optional
+
+from api.config import settings
+from api.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"Completed", "Failed", "Aborted"}
+STATE_TTL = 86400
+STAGE_HISTORY = 50
+
+
+def progress_key(job_id: str) -> str:
+    return f"job:progress:{job_id}"
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(round(seconds))
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+
+class JobProgressReporter:
+    def __init__(
+        self,
+        job_id: str,
+        pipeline: str,
+        notify: Optional[Callable[[Dict], None]] = None,
+        publish_interval: Optional[float] = None,
+        db_flush_interval: Optional[float] = None
+    ):
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.notify = notify
+        self.publish_interval = settings.PROGRESS_PUBLISH_INTERVAL if publish_interval is None else publish_interval
+        self.db_flush_interval = settings.PROGRESS_DB_FLUSH_INTERVAL if db_flush_interval is None else db_flush_interval
+
+        self.state: Dict = {}
+        self._published: Dict = {}
+        self._last_publish = 0.0
+        self._last_flush = time.monotonic()
+        self._stage_started = time.monotonic()
+        self._stage_progress: Optional[int] = None
+
+    # --- stage timing history -------------------------------------------------
+
+    def _history_key(self, stage: str) -> str:
+        return f"job:stage_durations:{self.pipeline}:{stage}"
+
+    def _stages_key(self) -> str:
+        return f"job:stages:{self.pipeline}"
+
+    def _record_stage(self, r, stage: str, duration: float, progress: Optional[int]):
+        pipe = r.pipeline(transaction=False)
+        pipe.lpush(self._history_key(stage), round(duration, 2))
+        pipe.ltrim(self._history_key(stage), 0, STAGE_HISTORY - 1)
+        if progress is not None:
+            pipe.hset(self._stages_key(), stage, progress)
+        pipe.execute()
+
+    def estimate_remaining(self, r) -> Optional[float]:
+        """
+        Median time left in the current stage plus the medians of every stage that
+        historically comes after it (by progress). None without enough history.
+        """
+        stage, progress = self.state.get("status"), self.state.get("progress")
+        if not stage or progress is None:
+            return None
+        stages = {name.decode() if isinstance(name, bytes) else name: int(p)
+                  for name, p in r.hgetall(self._stages_key()).items()}
+        upcoming = [s for s, p in stages.items() if p > progress and s not in TERMINAL_STATUSES]
+
+        pipe = r.pipeline(transaction=False)
+        for name in [stage] + upcoming:
+            pipe.lrange(self._history_key(name), 0, -1)
+        histories = pipe.execute()
+        medians = [statistics.median(float(x) for x in h) if h else None for h in histories]
+        if medians[0] is None and not any(m is not None for m in medians[1:]):
+            return None
+
+        in_stage = time.monotonic() - self._stage_started
+        remaining = max((medians[0] or 0.0) - in_stage, 0.0)
+        return remaining + sum(m for m in medians[1:] if m is not None)
+
+    # --- updates ----------------------------------------------------------------
+
+    def update(self, status: Optional[str] = None, progress: Optional[int] = None, output_path: Optional[str] = None):
+        now = time.monotonic()
+        stage_changed = bool(status) and status != self.state.get("status")
+
+        r = None
+        try:
+            r = get_redis()
+            # A stage cut short by failure would skew the history
+            if stage_changed and self.state.get("status") and status not in ("Failed", "Aborted"):
+                self._record_stage(r, self.state["status"], now - self._stage_started, self._stage_progress)
+        except Exception as e:
+            logger.debug(f"[Progress] Stage history skipped: {e}")
+        if stage_changed:
+            self._stage_started = now
+            self._stage_progress = progress
+
+        if status:
+            self.state["status"] = status
+        if progress is not None:
+            self.state["progress"] = progress
+        if output_path:
+            self.state["output_path"] = output_path
+
+        terminal = self.state.get("status") in TERMINAL_STATUSES
+        if terminal:
+            self.state.pop("time_remaining", None)
+        elif r is not None:
+            try:
+                eta = self.estimate_remaining(r)
+                if eta is not None:
+                    self.state["time_remaining"] = format_eta(eta)
+            except Exception as e:
+                logger.debug(f"[Progress] ETA skipped: {e}")
+
+        live = self._write_state(r, terminal)
+
+        if terminal or stage_changed or now - self._last_publish >= self.publish_interval:
+            self._publish(now)
+
+        # Without Redis the row is the only place readers can see progress
+        if terminal or not live or now - self._last_flush >= self.db_flush_interval:
+            self.flush()
+
+    def _write_state(self, r, terminal: bool) -> bool:
+        if r is None:
+            return False
+        try:
+            mapping = {k: json.dumps(v) for k, v in self.state.items()}
+            mapping["updated_at"] = json.dumps(time.time())
+            pipe = r.pipeline(transaction=False)
+            pipe.hset(progress_key(self.job_id), mapping=mapping)
+            if "time_remaining" not in self.state:
+                pipe.hdel(progress_key(self.job_id), "time_remaining")
+            # Once the row is authoritative the hash only needs to outlive in-flight readers
+            pipe.expire(progress_key(self.job_id), 300 if terminal else STATE_TTL)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.debug(f"[Progress] Live state write skipped: {e}")
+            return False
+
+    def _publish(self, now: float):
+        delta = {k: v for k, v in self.state.items() if self._published.get(k) != v}
+        if not delta or self.notify is None:
+            return
+        try:
+            self.notify({"id": self.job_id, **delta})
+            self._published.update(delta)
+            self._last_publish = now
+        except Exception as e:
+            logger.warning(f"[Progress] Publish failed for {self.job_id}: {e}")
+
+    def flush(self):
+        """Writes the current state to VideoJobDB (one UPDATE, no SELECT)."""
+        from api.utils.database import SessionLocal
+        from api.utils.models import VideoJobDB
+
+        values = {k: self.state[k] for k in ("status", "progress", "output_path", "time_remaining") if k in self.state}
+        if self.state.get("status") in TERMINAL_STATUSES:
+            values["time_remaining"] = None
+        if not values:
+            return
+        try:
+            with SessionLocal() as db:
+                db.query(VideoJobDB).filter(VideoJobDB.id == self.job_id).update(values, synchronize_session=False)
+                db.commit()
+            self._last_flush = time.monotonic()
+        except Exception as e:
+            logger.error(f"[Progress] DB flush failed for {self.job_id}: {e}")
+
+
+def live_progress(job_ids: Iterable[str]) -> Dict[str, Dict]:
+    """Latest Redis state for each job that has one (one pipelined round trip)."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return {}
+    try:
+        pipe = get_redis(decode_responses=True).pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(progress_key(job_id))
+        results = pipe.execute()
+    except Exception as e:
+        logger.debug(f"[Progress] Live state unavailable: {e}")
+        return {}
+    return {
+        job_id: {k: json.loads(v) for k, v in state.items() if k != "updated_at"}
+        for job_id, state in zip(job_ids, results) if state
+    }
+
+
+def overlay_live_progress(jobs: List) -> List:
+    """Applies live Redis state to VideoJobDB rows that are still running."""
+    running = [job for job in jobs if job.status not in TERMINAL_STATUSES]
+    live = live_progress(job.id for job in running)
+    for job in running:
+        for field, value in live.get(job.id, {}).items():
+            setattr(job, field, value)
+    return jobs
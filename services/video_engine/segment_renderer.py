@@ -0,0 +1,155 @@
+"""
+Segment-Parallel Renderer
+
+Splits a long source at keyframes, renders every segment through the same
+compiled filtergraph concurrently, then joins the results with a stream-copy
+concat and muxes the (retimed) source audio once at the end.
+"""
+
+import os
+import csv
+import uuid
+import shutil
+import asyncio
+import logging
+import subprocess
+from typing import List, Dict, Optional, Tuple
+from .filtergraph import FilterGraphCompiler, CompiledFilterGraph
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentParallelRenderer:
+    def __init__(self, compiler: FilterGraphCompiler, codec: str = "libx264", work_dir: str = "temp/segments"):
+        self.compiler = compiler
+        self.codec = codec
+        self.work_dir = work_dir
+        os.makedirs(self.work_dir, exist_ok=True)
+
+    @staticmethod
+    def _run(cmd: List[str]) -> subprocess.CompletedProcess:
+        return subprocess.run(cmd, capture_output=True, text=True)
+
+    def split_at_keyframes(self, input_path: str, segment_count: int, duration: float, job_dir: str) -> List[Tuple[str, float]]:
+        """
+        Stream-copies the video track into ~equal segments. The segment muxer only
+        cuts on keyframes, so no re-encode is needed. Returns (path, start_seconds).
+        """
+        segment_time = max(duration / segment_count, 1.0)
+        list_path = os.path.join(job_dir, "segments.csv")
+        pattern = os.path.join(job_dir, "src_%03d.mp4")
+
+        result = self._run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", input_path,
+            "-map", "0:v:0", "-an", "-c", "copy",
+            "-f", "segment", "-segment_time", f"{segment_time:.3f}",
+            "-reset_timestamps", "1",
+            "-segment_list", list_path, "-segment_list_type", "csv",
+            pattern
+        ])
+        if result.returncode != 0:
+            raise RuntimeError(f"Keyframe split failed: {result.stderr.strip()[-300:]}")
+
+        segments = []
+        with open(list_path, newline="") as f:
+            for row in csv.reader(f):
+                if len(row) >= 2:
+                    segments.append((os.path.join(job_dir, row[0]), float(row[1])))
+        return segments
+
+    def _segment_command(self, segment_path: str, output_path: str, graph: CompiledFilterGraph, threads: int) -> List[str]:
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", segment_path,
+            "-filter_complex", graph.filter_complex,
+            "-map", f"[{graph.video_label}]", "-an",
+            "-c:v", self.codec, "-threads", str(threads),
+        ]
+        if self.codec == "libx264":
+            cmd += ["-preset", "veryfast", "-crf", "21"]
+        return cmd + [output_path]
+
+    async def render(
+        self,
+        input_path: str,
+        output_path: str,
+        duration: float,
+        has_audio: bool,
+        enabled_filters: Optional[List[str]] = None,
+        strategy: Optional[Dict] = None,
+        workers: int = 4
+    ) -> str:
+        """
+        Renders `input_path` into `output_path` using up to `workers` concurrent
+        ffmpeg processes. Raises RuntimeError on any failed stage.
+        """
+        job_dir = os.path.join(self.work_dir, uuid.uuid4().hex)
+        os.makedirs(job_dir, exist_ok=True)
+        # One seed per job so every segment gets the same speed/zoom/overlay choices
+        seed = uuid.uuid4().int & 0xFFFFFFFF
+
+        try:
+            segments = await asyncio.to_thread(self.split_at_keyframes, input_path, workers, duration, job_dir)
+            if not segments:
+                raise RuntimeError("Keyframe split produced no segments")
+            logger.info(f"[SegmentRenderer] Split into {len(segments)} segments, rendering with {workers} workers")
+
+            threads = max(1, (os.cpu_count() or workers) // workers)
+            semaphore = asyncio.Semaphore(workers)
+
+            async def render_one(index: int, segment_path: str, start: float) -> str:
+                graph = self.compiler.compile(
+                    enabled_filters=enabled_filters,
+                    strategy=strategy,
+                    duration=duration,
+                    has_audio=False,
+                    seed=seed,
+                    time_offset=start
+                )
+                out = os.path.join(job_dir, f"out_{index:03d}.mp4")
+                async with semaphore:
+                    result = await asyncio.to_thread(self._run, self._segment_command(segment_path, out, graph, threads))
+                if result.returncode != 0:
+                    raise RuntimeError(f"Segment {index} failed: {result.stderr.strip()[-300:]}")
+                return out
+
+            rendered = await asyncio.gather(*[
+                render_one(i, path, start) for i, (path, start) in enumerate(segments)
+            ])
+
+            # Stream-copy concat of the rendered video segments
+            concat_list = os.path.join(job_dir, "concat.txt")
+            with open(concat_list, "w") as f:
+                for path in rendered:
+                    f.write(f"file '{os.path.abspath(path)}'\n")
+
+            joined = os.path.join(job_dir, "joined.mp4")
+            result = await asyncio.to_thread(self._run, [
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-f", "concat", "-safe", "0", "-i", concat_list,
+                "-c", "copy", joined
+            ])
+            if result.returncode != 0:
+                raise RuntimeError(f"Concat failed: {result.stderr.strip()[-300:]}")
+
+            if not has_audio:
+                shutil.move(joined, output_path)
+                return output_path
+
+            # Audio is retimed once over the whole source instead of per segment
+            speed = self.compiler.compile(enabled_filters, strategy, duration, has_audio=False, seed=seed).speed
+            audio_filter = f"atempo={speed}" if speed != 1.0 else "anull"
+            result = await asyncio.to_thread(self._run, [
+                "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                "-i", joined, "-i", input_path,
+                "-filter_complex", f"[1:a]{audio_filter}[aout]",
+                "-map", "0:v", "-map", "[aout]",
+                "-c:v", "copy", "-c:a", "aac", "-b:a", "160k",
+                "-shortest", "-movflags", "+faststart", output_path
+            ])
+            if result.returncode != 0:
+                raise RuntimeError(f"Audio mux failed: {result.stderr.strip()[-300:]}")
+            return output_path
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
@@ -2,10 +2,12 @@ from api.utils.celery import celery_app
 
 from .processor import VideoProcessor
 from .downloader import base_video_downloader
+from .progress import JobProgressReporter
 from services.optimization.youtube_publisher import base_youtube_publisher
 from services.optimization.service import base_optimization_service
 import asyncio
 import logging
+from functools import partial
 from api.config import settings
 
 # Bridge to use async code in synchronous Celery worker
@@ -24,7 +26,7 @@ def cleanup_local_files(*paths):
                 logging.error(f"[Cleanup] Failed to delete {path}: {e}")
 
 @celery_app.task(name="video.download_and_process", bind=True)
-def download_and_process_task(self, source_url: str, niche: str, platform: str, preview_only: bool = False, style: str = "Default", quality_tier: str = "standard"):
+def download_and_process_task(self, source_url: str, niche: str, platform: str, preview_only: bool = False, style: str = "Default", quality_tier: str = "standard", user_id: int = None):
     """
     Main background task to transform and publish content.
     
@@ -34,31 +36,15 @@ def download_and_process_task(self, source_url: str, niche: str, platform: str,
     - premium: Tier 3 full processing (sound + motion graphics)
     """
     from api.utils.database import SessionLocal
-    from api.utils.models import VideoJobDB
+    from api.routes.ws import notify_job_update_sync
     import uuid
     import asyncio
     
     task_id = self.request.id
     db = SessionLocal()
     
-    def update_job(status=None, progress=None, output_path=None):
-        # Fresh session for each status update to avoid context leaks in prefork
-        with SessionLocal() as local_db:
-            job = local_db.query(VideoJobDB).filter(VideoJobDB.id == task_id).first()
-            if job:
-                if status: job.status = status
-                if progress is not None: job.progress = progress
-                if output_path: job.output_path = output_path
-                local_db.commit()
-                
-                # Real-time WebSocket Notification
-                from api.routes.ws import notify_job_update_sync
-                notify_job_update_sync({
-                    "id": task_id,
-                    "status": job.status,
-                    "progress": job.progress,
-                    "output_path": job.output_path
-                })
+    # Live state in Redis, throttled WebSocket deltas, DB writes at terminal states
+    update_job = JobProgressReporter(task_id, "video.download_and_process", notify=partial(notify_job_update_sync, user_id=user_id)).update
 
     try:
         # 1. Download
@@ -72,7 +58,9 @@ def download_and_process_task(self, source_url: str, niche: str, platform: str,
             }
 
         update_job(status="Downloading", progress=10)
-        video_path = run_async(base_video_downloader.download_video(source_url))
+        # Long-form sources: fetch only the most-replayed sections instead of the whole file
+        hook_ranges = base_video_downloader.hook_ranges(source_url)
+        video_path = run_async(base_video_downloader.download_video(source_url, ranges=hook_ranges or None))
         if not video_path:
             update_job(status="Failed", progress=0)
             return {"status": "error", "message": "Download failed"}
@@ -217,28 +205,14 @@ def generate_video_task(self, prompt: str, engine: str, style: str, aspect_ratio
     Background task for AI Video Synthesis (T2V).
     """
     from api.utils.database import SessionLocal
-    from api.utils.models import VideoJobDB
+    from api.routes.ws import notify_job_update_sync
     from .synthesis_service import generative_service
     import uuid
     
     task_id = self.request.id
     db = SessionLocal()
     
-    def update_job(status=None, progress=None, output_path=None):
-        job = db.query(VideoJobDB).filter(VideoJobDB.id == task_id).first()
-        if job:
-            if status: job.status = status
-            if progress is not None: job.progress = progress
-            if output_path: job.output_path = output_path
-            db.commit()
-            
-            from api.routes.ws import notify_job_update_sync
-            notify_job_update_sync({
-                "id": task_id,
-                "status": job.status,
-                "progress": job.progress,
-                "output_path": job.output_path
-            })
+    update_job = JobProgressReporter(task_id, "video.generate", notify=partial(notify_job_update_sync, user_id=user_id)).update
 
     try:
         # 1. Synthesis
@@ -283,7 +257,7 @@ def generate_story_task(self, prompt: str, engine: str, style: str, user_id: int
     Orchestrates the synthesis of a multi-scene narrative story.
     """
     from api.utils.database import SessionLocal
-    from api.utils.models import VideoJobDB
+    from api.routes.ws import notify_job_update_sync
     from services.decision_engine.service import base_strategy_service
     from services.video_engine.synthesis_service import generative_service
     from services.video_engine.voiceover import base_voiceover_service
@@ -293,21 +267,7 @@ def generate_story_task(self, prompt: str, engine: str, style: str, user_id: int
     task_id = self.request.id
     db = SessionLocal()
     
-    def update_job(status=None, progress=None, output_path=None):
-        job = db.query(VideoJobDB).filter(VideoJobDB.id == task_id).first()
-        if job:
-            if status: job.status = status
-            if progress is not None: job.progress = progress
-            if output_path: job.output_path = output_path
-            db.commit()
-            
-            from api.routes.ws import notify_job_update_sync
-            notify_job_update_sync({
-                "id": task_id,
-                "status": job.status,
-                "progress": job.progress,
-                "output_path": job.output_path
-            })
+    update_job = JobProgressReporter(task_id, "video.generate_story", notify=partial(notify_job_update_sync, user_id=user_id)).update
 
     try:
         # 1. Scripting Agent
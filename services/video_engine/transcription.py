@@ -12,8 +12,7 @@ class TranscriptionService:
         Returns a fallback transcript if local processing fails.
         """
         try:
-            # We'd typically extract audio from video_path here
-            # But Fast-Whisper (via ffmpeg) can often handle it.
+            # The engine extracts 16 kHz mono audio once and caches results by audio hash
             return await ai_worker.transcribe(video_path)
         except Exception as e:
             print(f"[OS-Transcription] ERROR: {e}. Falling back to visual-only mode.")
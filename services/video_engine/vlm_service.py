@@ -8,6 +8,8 @@ import base64
 from typing import List, Dict, Optional
 from api.utils.vault import get_secret
 from api.config import settings
+from .probe import probe_service
+from .frame_sampler import frame_sampler
 
 class VLMService:
     def __init__(self):
@@ -32,25 +34,21 @@ class VLMService:
             self.groq_client = None
 
     def _sample_keyframes(self, video_path: str, num_frames: int = 5) -> List[str]:
-        """Samples keyframes and returns paths."""
+        """Samples evenly spaced keyframes (seeking across long gaps) and returns paths."""
         temp_dir = "temp_frames"
         os.makedirs(temp_dir, exist_ok=True)
-        cap = cv2.VideoCapture(video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        meta = probe_service.probe(video_path)
+        total_frames = meta.frame_count if meta else 0
         if total_frames <= 0:
-            cap.release()
             return []
 
-        interval = total_frames // num_frames
+        indices = frame_sampler.evenly_spaced(total_frames, num_frames)
         frame_paths = []
-        for i in range(num_frames):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, i * interval)
-            ret, frame = cap.read()
-            if ret:
-                path = os.path.join(temp_dir, f"frame_{i}.jpg")
-                cv2.imwrite(path, frame)
-                frame_paths.append(path)
-        cap.release()
+        # Vision APIs downsample anyway; 720p keeps the upload small
+        for i, sampled in enumerate(frame_sampler.iter_frames(video_path, frame_indices=indices, max_height=720)):
+            path = os.path.join(temp_dir, f"frame_{i}.jpg")
+            cv2.imwrite(path, sampled.image)
+            frame_paths.append(path)
         return frame_paths
 
     async def analyze_video_content(self, video_path: str) -> Dict: